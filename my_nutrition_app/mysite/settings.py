@@ -37,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'nutrition.middleware.MetricsMiddleware',
+    'nutrition.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -51,7 +53,7 @@ ROOT_URLCONF = 'mysite.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'nutrition.template_backend.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -79,6 +81,45 @@ DATABASES = {
 }
 
 
+# Cache (OpenFoodFacts atbildes u.c.); produkcijā var aizstāt ar Redis/Memcached
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'nutrition',
+    }
+}
+
+HOME_FRAGMENT_TTL = 24 * 60 * 60     # `home` ierakstu saraksta un kopsummu fragmenti (s); versija maina atslēgu
+OFF_CACHE_TTL = 6 * 60 * 60          # pozitīvas OFF atbildes (s)
+OFF_CACHE_NEGATIVE_TTL = 10 * 60     # "Product not found" (s)
+OFF_CACHE_STALE_TTL = 24 * 60 * 60   # cik ilgi pēc TTL atdot novecojušu atbildi, atjaunojot fonā
+OFF_SINGLEFLIGHT_WAIT = 10           # cik ilgi cits worker gaida identiska OFF pieprasījuma rezultātu (s)
+
+# OpenFoodFacts HTTP klients (`nutrition.off.OffClient`)
+OFF_BASE_URL = 'https://world.openfoodfacts.org'
+OFF_TIMEOUT = 6      # sekundes vienam mēģinājumam
+OFF_RETRIES = 2      # papildu mēģinājumi pārejošām kļūdām
+OFF_POOL_SIZE = 10   # keep-alive savienojumi pūlā
+
+# Svītrkodu paketes pieprasījums (`api/product-lookup/batch/`)
+OFF_BATCH_MAX = 50           # maksimālais svītrkodu skaits vienā pieprasījumā
+OFF_BATCH_CONCURRENCY = 8    # kopīgā pūla izmērs: vienlaicīgi OFF pieprasījumi visām paketēm kopā
+OFF_BATCH_DEADLINE = 8       # kopējais termiņš visai paketei (s)
+
+# Pieprasījumu veiktspējas mērījumi (`nutrition.middleware.ServerTimingMiddleware`)
+SERVER_TIMING_SAMPLE_RATE = 1.0   # mērīto pieprasījumu daļa (0..1); produkcijā, piem., 0.05
+SERVER_TIMING_HEADER = True       # atdot `Server-Timing` galveni (False — tikai log rinda)
+
+# Prometheus metrikas (`/metrics`, `nutrition.metrics`)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']   # None — atļaut visiem (ierobežot proxy līmenī)
+# Vairāku worker procesu režīms (gunicorn): kopīga direktorija, kuru iztīra pirms starta.
+# Ja None, tiek izmantots vides mainīgais PROMETHEUS_MULTIPROC_DIR (ja tāds ir).
+METRICS_MULTIPROC_DIR = None
+METRICS_FLUSH_INTERVAL = 5   # cik bieži worker ieraksta savas metrikas direktorijā (s)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -126,6 +167,14 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# `collectstatic`: jaukti nosaukumi (`home.<hash>.js`) + `.gz`/`.br` kopijas (`nutrition.storage`)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'nutrition.storage.CompressedManifestStaticFilesStorage'},
+}
+# Vai Django pats atdod STATIC_ROOT failus (`views.static_asset`); produkcijā parasti to dara nginx
+SERVE_STATIC = DEBUG
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,8 +1,9 @@
 
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from django.views.i18n import JavaScriptCatalog
 from nutrition import views
 
@@ -15,4 +16,8 @@ urlpatterns = [
     path('i18n/', include('django.conf.urls.i18n')),
     # JavaScript translations catalog (used by client-side gettext calls)
     path('jsi18n/', JavaScriptCatalog.as_view(), name='javascript-catalog'),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    # Prometheus metrikas (`nutrition.metrics`)
+    path('metrics', views.prometheus_metrics, name='metrics'),
+    # STATIC_ROOT faili ar `.br`/`.gz` kopijām (tikai, ja SERVE_STATIC)
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), views.static_asset, name='static_asset'),
+]
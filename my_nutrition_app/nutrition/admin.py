@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, FoodEntry, Profile, Entry
+from .models import Product, FoodEntry, Profile, Entry, DailyTotals, HistoryImport
 
 
 """
@@ -14,8 +14,8 @@ un kādus filtrus piedāvāt (`list_filter`).
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     # Rāda svarīgākos laukus produktu sarakstā
-    list_display = ('name', 'calories_per_100g', 'protein_per_100g', 'fat_per_100g', 'carbs_per_100g')
-    search_fields = ('name',)
+    list_display = ('name', 'barcode', 'calories_per_100g', 'protein_per_100g', 'fat_per_100g', 'carbs_per_100g')
+    search_fields = ('name', 'barcode')
     list_filter = ('calories_per_100g',)
 
 
@@ -23,6 +23,8 @@ class ProductAdmin(admin.ModelAdmin):
 class FoodEntryAdmin(admin.ModelAdmin):
     # FoodEntry admin skatā ērti redzams lietotājs, produkts, daudzums un laiks
     list_display = ('user', 'product', 'amount', 'created_at', 'calories')
+    # `calories` un FK kolonnas lasa produktu/lietotāju — ielādē ar JOIN, nevis vaicājumu katrai rindai
+    list_select_related = ('user', 'product')
     list_filter = ('created_at',)
     search_fields = ('product__name',)
     readonly_fields = ('created_at',)
@@ -32,6 +34,7 @@ class FoodEntryAdmin(admin.ModelAdmin):
 class ProfileAdmin(admin.ModelAdmin):
     # Profilu admin saraksts — viegli pārskatīt svaru/augumu/mērķi
     list_display = ('user', 'age', 'weight', 'height', 'goal')
+    list_select_related = ('user',)
     search_fields = ('user__username',)
     list_filter = ('goal', 'sex')
 
@@ -40,5 +43,26 @@ class ProfileAdmin(admin.ModelAdmin):
 class EntryAdmin(admin.ModelAdmin):
     # Pielāgoto ierakstu saraksts adminā
     list_display = ('user', 'name', 'amount', 'kcal', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('user', 'created_at')
     search_fields = ('name',)
+
+
+@admin.register(DailyTotals)
+class DailyTotalsAdmin(admin.ModelAdmin):
+    # Rollup rindas tiek uzturētas automātiski — adminā tikai apskatei
+    list_display = ('user', 'day', 'kcal', 'protein', 'fat', 'carbs', 'entry_count')
+    list_select_related = ('user',)
+    list_filter = ('day',)
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'day', 'kcal', 'protein', 'fat', 'carbs', 'entry_count')
+
+
+@admin.register(HistoryImport)
+class HistoryImportAdmin(admin.ModelAdmin):
+    # Vēstures importa darbi un to progress
+    list_display = ('user', 'source', 'format', 'rows', 'imported', 'failed', 'finished', 'updated_at')
+    list_select_related = ('user',)
+    list_filter = ('finished', 'format')
+    search_fields = ('user__username', 'source')
+    readonly_fields = ('offset', 'rows', 'imported', 'failed', 'errors')
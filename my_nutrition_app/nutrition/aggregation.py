@@ -0,0 +1,92 @@
+import datetime as dt
+
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyTotals, Entry, FoodEntry
+
+
+"""
+Datubāzes pusē veikta ierakstu agregācija pa dienām.
+
+`FoodEntry`×`Product` un `Entry` tabulas tiek sagrupētas pēc vietējās dienas
+(`TruncDate` izmanto aktīvo laika joslu) vienā `UNION ALL` vaicājumā, tāpēc
+vaicājumu skaits nav atkarīgs no ierakstu skaita un rezultātā ir ne vairāk
+kā 2 rindas uz (lietotājs, diena).
+"""
+
+NUTRIENTS = ('kcal', 'protein', 'fat', 'carbs')
+
+# FoodEntry uzturvielas = amount * <per_100g> / 100 (sk. FoodEntry.calories())
+FOOD_COLUMNS = {
+    'kcal': 'calories_per_100g',
+    'protein': 'protein_per_100g',
+    'fat': 'fat_per_100g',
+    'carbs': 'carbs_per_100g',
+}
+
+
+def day_bounds(start, end):
+    """Aware datetime robežas vietējām dienām [start, end] (ieskaitot)."""
+    start_dt = timezone.make_aware(dt.datetime.combine(start, dt.time.min))
+    end_dt = timezone.make_aware(dt.datetime.combine(end, dt.time.max))
+    return start_dt, end_dt
+
+
+def _food_rows(qs):
+    sums = {
+        f'sum_{name}': Sum(F('amount') * F(f'product__{column}') / Value(100.0), output_field=FloatField())
+        for name, column in FOOD_COLUMNS.items()
+    }
+    return (qs.order_by()
+              .annotate(day=TruncDate('created_at'))
+              .values('user_id', 'day')
+              .annotate(**sums, n=Count('id')))
+
+
+def _entry_rows(qs):
+    sums = {f'sum_{name}': Sum(name, output_field=FloatField()) for name in NUTRIENTS}
+    return (qs.order_by()
+              .annotate(day=TruncDate('created_at'))
+              .values('user_id', 'day')
+              .annotate(**sums, n=Count('id')))
+
+
+def aggregate_by_day(food_qs, entry_qs):
+    """
+    Sagrupē abus ierakstu tipus pa (lietotājs, diena) vienā SQL vaicājumā.
+
+    Atgriež {(user_id, date): {'kcal', 'protein', 'fat', 'carbs', 'count'}}.
+    """
+    combined = _food_rows(food_qs).union(_entry_rows(entry_qs), all=True)
+    result = {}
+    for row in combined:
+        bucket = result.setdefault((row['user_id'], row['day']), dict.fromkeys(NUTRIENTS, 0.0))
+        for name in NUTRIENTS:
+            bucket[name] += row[f'sum_{name}'] or 0.0
+        bucket['count'] = bucket.get('count', 0) + row['n']
+    return result
+
+
+def daily_calories(user, start, end):
+    """
+    Atgriež {date: kcal} katrai dienai intervālā [start, end] (trūkstošās dienas = 0.0).
+
+    Pieslēgtam lietotājam lasa `DailyTotals` rollup rindas; anonīmam — sagrupē
+    publiskos `FoodEntry` ierakstus datubāzē. Abos gadījumos tas ir viens vaicājums.
+    """
+    days = (end - start).days + 1
+    daily = {start + dt.timedelta(days=i): 0.0 for i in range(days)}
+    if user is not None and user.is_authenticated:
+        rows = DailyTotals.objects.filter(user=user, day__gte=start, day__lte=end).values_list('day', 'kcal')
+        for day, kcal in rows:
+            daily[day] = kcal
+        return daily
+
+    start_dt, end_dt = day_bounds(start, end)
+    food_qs = FoodEntry.objects.filter(user__isnull=True, created_at__gte=start_dt, created_at__lte=end_dt)
+    for (_, day), totals in aggregate_by_day(food_qs, Entry.objects.none()).items():
+        if day in daily:
+            daily[day] += totals['kcal']
+    return daily
@@ -13,3 +13,9 @@ class NutritionConfig(AppConfig):
     # Noklusējuma lauka tips modeļiem (BigAutoField labāk lielākiem ID diapazoniem)
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nutrition'
+
+    def ready(self):
+        # Pirms pirmā DB savienojuma: katrs savienojums (arī `sync_to_async` pavedienos)
+        # saņem vaicājumu novērotāju, ko izmanto `nutrition.middleware`
+        from . import timing
+        timing.install_query_hook()
@@ -0,0 +1,317 @@
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from django.utils._os import safe_join
+
+
+"""
+Statisko failu apvienošana un minificēšana.
+
+Lapas iepriekš ielādēja `style.css` un katru JS failu atsevišķi un
+neminificētu. `build` (komanda `build_static_assets`) uzbūvē `BUNDLES`:
+`common.js` + lapas skripts vienā failā, visam noņemti komentāri un liekās
+atstarpes. Rezultāts tiek ierakstīts `nutrition/static/nutrition/dist/` un
+iekļauts repozitorijā, tāpēc darbībai nav vajadzīgs ne Node, ne papildu
+Python pakotnes. Failu nosaukumu jaukšanu (`home.<hash>.js`) un `.gz`/`.br`
+kopijas veido `collectstatic` ar `nutrition.storage.CompressedManifestStaticFilesStorage`.
+
+Minificētājs ir apzināti konservatīvs: virknes, šablonu virknes un regulārās
+izteiksmes tiek kopētas neskartas, un rindu pārnesumi starp tokeniem paliek
+(automātiskā semikolu ievietošana nemainās) — tiek izmestas tikai atkāpes,
+tukšās rindas un komentāri.
+
+Pēc izmaiņām `static/nutrition/js/` vai `style.css` saišķi jāpārbūvē;
+`build_static_assets --check` to pārbauda.
+"""
+
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+OUTPUT_DIR = STATIC_DIR / 'nutrition' / 'dist'
+# Ceļš statisko failu nosaukumtelpā (STATIC_URL + šis + faila nosaukums)
+STATIC_PREFIX = 'nutrition/dist/'
+
+# saišķa nosaukums → avota faili (statiskie ceļi), tādā secībā, kādā tie jāizpilda
+BUNDLES = {
+    'home.js': ['nutrition/js/common.js', 'nutrition/js/home.js'],
+    'progress.js': ['nutrition/js/common.js', 'nutrition/js/progress.js'],
+    'style.css': ['nutrition/style.css'],
+}
+
+# Jauktiem (saturā balstītiem) nosaukumiem — tāpat kā `finalized.CACHE_CONTROL`
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# `home.1a2b3c4d5e6f.js` (ManifestStaticFilesStorage: md5 12 zīmes)
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+# Kodējumi, kuriem `collectstatic` var izveidot kopiju, prioritātes secībā
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                      'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+_CSS_TIGHT_AFTER = ('{', '}', ';', ':', ',', '>')
+_CSS_TIGHT_BEFORE = ('{', '}', ';', ',', '>')
+
+
+def _is_word(c):
+    return c.isalnum() or c in '_$\\' or c > '\x7f'
+
+
+def _skip_string(source, i):
+    # source[i] ir pēdiņa; atgriež indeksu aiz noslēdzošās pēdiņas
+    quote, j, n = source[i], i + 1, len(source)
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == '\n' and quote != '`':
+            break
+        j += 1
+    raise ValueError('Unterminated string literal at offset %d' % i)
+
+
+def _skip_template(source, i):
+    # source[i] ir '`'; `${ ... }` izteiksmēm seko līdzi iekavu dziļumam
+    j, n = i + 1, len(source)
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+        elif c == '`':
+            return j + 1
+        elif source.startswith('${', j):
+            j = _skip_expression(source, j + 2)
+        else:
+            j += 1
+    raise ValueError('Unterminated template literal at offset %d' % i)
+
+
+def _skip_expression(source, j):
+    depth, n = 1, len(source)
+    while j < n:
+        c = source[j]
+        if c in '\'"':
+            j = _skip_string(source, j)
+        elif c == '`':
+            j = _skip_template(source, j)
+        elif source.startswith('/*', j):
+            end = source.find('*/', j + 2)
+            j = n if end < 0 else end + 2
+        elif c == '{':
+            depth += 1
+            j += 1
+        elif c == '}':
+            depth -= 1
+            j += 1
+            if depth == 0:
+                return j
+        else:
+            j += 1
+    raise ValueError('Unterminated template expression at offset %d' % j)
+
+
+def _skip_regex(source, i):
+    # Atgriež indeksu aiz regulārās izteiksmes (ar karodziņiem) vai None, ja tā nav regulārā izteiksme
+    j, n, in_class = i + 1, len(source), False
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            return None
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < n and _is_word(source[j]):
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _regex_allowed(previous):
+    # `/` pēc operatora vai atslēgvārda sāk regulāro izteiksmi, pēc vērtības — dalīšanu
+    return previous is None or previous[-1] in '(,=:[!&|?{};+-*%<>~^' or previous in _JS_REGEX_KEYWORDS
+
+
+def _needs_space(left, right):
+    # Atstarpe paliek tikai tur, kur bez tās mainītos tokeni (`var x`, `a - -b`, `a / /re/`)
+    return (_is_word(left) and _is_word(right)) or (left == right and left in '+-/') or (left == '/' and right == '*')
+
+
+def minify_js(source):
+    """Noņem komentārus, atkāpes un tukšās rindas; tokenu secība un rindu pārnesumi paliek."""
+    out = []
+    previous = None  # pēdējais izvadītais tokens
+    pending = ''     # atstarpe pirms nākamā tokena: '', ' ' vai '\n'
+    i, n = 0, len(source)
+
+    def emit(token):
+        nonlocal previous, pending
+        if previous is not None:
+            if pending == '\n':
+                out.append('\n')
+            elif pending and _needs_space(previous[-1], token[0]):
+                out.append(' ')
+        out.append(token)
+        previous, pending = token, ''
+
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            j = i
+            while j < n and source[j].isspace():
+                j += 1
+            pending = '\n' if '\n' in source[i:j] or pending == '\n' else ' '
+            i = j
+        elif source.startswith('//', i):
+            j = source.find('\n', i)
+            i = n if j < 0 else j
+            pending = pending or ' '
+        elif source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            if j < 0:
+                raise ValueError('Unterminated comment at offset %d' % i)
+            pending = '\n' if '\n' in source[i:j] or pending == '\n' else (pending or ' ')
+            i = j + 2
+        elif c in '\'"':
+            j = _skip_string(source, i)
+            emit(source[i:j])
+            i = j
+        elif c == '`':
+            j = _skip_template(source, i)
+            emit(source[i:j])
+            i = j
+        elif c == '/' and _regex_allowed(previous) and _skip_regex(source, i) is not None:
+            j = _skip_regex(source, i)
+            emit(source[i:j])
+            i = j
+        elif _is_word(c):
+            j = i
+            while j < n and _is_word(source[j]):
+                j += 1
+            emit(source[i:j])
+            i = j
+        else:
+            emit(c)
+            i += 1
+    return ''.join(out)
+
+
+def minify_css(source):
+    """Noņem komentārus un atstarpes ap `{ } ; , >` un aiz `:`; virknes paliek neskartas."""
+    out = []
+    pending = False
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            pending = True
+            i += 1
+            continue
+        if source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            if j < 0:
+                raise ValueError('Unterminated comment at offset %d' % i)
+            pending = True
+            i = j + 2
+            continue
+        if c in '\'"':
+            j = _skip_string(source, i)
+            token = source[i:j]
+        else:
+            j, token = i + 1, c
+        if token == '}' and out and out[-1] == ';':
+            out.pop()
+        # ':' priekšā atstarpe paliek: `a :hover` un `a:hover` ir dažādi selektori
+        if pending and out and out[-1] not in _CSS_TIGHT_AFTER and token not in _CSS_TIGHT_BEFORE:
+            out.append(' ')
+        out.append(token)
+        pending = False
+        i = j
+    return ''.join(out)
+
+
+def _source(static_path):
+    return (STATIC_DIR / static_path).read_text(encoding='utf-8')
+
+
+def render(bundle):
+    """Saišķa `bundle` saturs (teksts)."""
+    sources = BUNDLES[bundle]
+    if bundle.endswith('.css'):
+        body = '\n'.join(minify_css(_source(path)) for path in sources)
+    else:
+        # katrs fails beidzas ar ';' — nākamā faila `(function(){` netiek uztverts kā izsaukums
+        parts = [minify_js(_source(path)).rstrip() for path in sources]
+        body = '\n'.join(part if part.endswith(';') else part + ';' for part in parts)
+    header = '/* %s%s: %s. Generated by build_static_assets, do not edit. */\n' % (
+        STATIC_PREFIX, bundle, ' + '.join(sources))
+    return header + body + '\n'
+
+
+def build(output_dir=OUTPUT_DIR):
+    """Uzbūvē visus saišķus; atgriež {statiskais_ceļš: (avota_baiti, saišķa_baiti)}."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sizes = {}
+    for bundle in BUNDLES:
+        content = render(bundle).encode('utf-8')
+        path = output_dir / bundle
+        if not path.exists() or path.read_bytes() != content:
+            path.write_bytes(content)
+        original = sum((STATIC_DIR / source).stat().st_size for source in BUNDLES[bundle])
+        sizes[STATIC_PREFIX + bundle] = (original, len(content))
+    return sizes
+
+
+def outdated(output_dir=OUTPUT_DIR):
+    """Saišķi, kuru uzbūvētais fails neatbilst pašreizējiem avotiem (vai nav uzbūvēts)."""
+    output_dir = Path(output_dir)
+    stale = []
+    for bundle in BUNDLES:
+        path = output_dir / bundle
+        if not path.exists() or path.read_bytes() != render(bundle).encode('utf-8'):
+            stale.append(bundle)
+    return stale
+
+
+def accepted_encodings(header):
+    """`Accept-Encoding` galvenes kodējumi (mazajiem burtiem), izņemot tos ar q=0."""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _sep, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _sep, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def encoded_variant(root, path, accept_encoding):
+    """
+    Labākā iepriekš saspiestā kopija `path` failam STATIC_ROOT direktorijā.
+
+    Atgriež (relatīvais_ceļš, kodējums) — piem. ('x.js.br', 'br') — vai (path, None).
+    """
+    accepted = accepted_encodings(accept_encoding)
+    path = posixpath.normpath(path).lstrip('/')
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(safe_join(root, path + suffix)):
+            return path + suffix, encoding
+    return path, None
+
+
+def is_hashed(path):
+    return bool(HASHED_NAME.search(posixpath.basename(path)))
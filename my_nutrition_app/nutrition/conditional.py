@@ -0,0 +1,108 @@
+import datetime as dt
+import functools
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+"""
+Nosacījuma GET atbildes (ETag / Last-Modified → 304) `home`, `progress` un
+`api_daily_calories` skatiem.
+
+Katram lietotājam (un publiskajiem ierakstiem) kešatmiņā ir "watermark" —
+pēdējās izmaiņas laiks. To atjaunina katra ierakstu rakstīšana
+(`rollup.apply_delta`) un profila saglabāšana. Ja klienta `If-None-Match`
+sakrīt, skats netiek izsaukts vispār — nav ne agregācijas vaicājumu, ne
+renderēšanas; izmaksas ir viens kešatmiņas nolasījums.
+
+ETag ietver watermark ar mikrosekunžu precizitāti, vietējo dienu (pusnaktī
+"šodiena" mainās bez rakstīšanas), valodu un pieprasījuma URL. `Last-Modified`
+ir sekunžu precizitātē, tāpēc tas ir tikai rezerves variants klientiem bez ETag.
+Vairāku worker procesu gadījumā kešatmiņai jābūt kopīgai (Redis/Memcached),
+tāpat kā `nutrition.fragments` versijām.
+"""
+
+WATERMARK_TTL = 30 * 24 * 60 * 60
+
+
+def _key(user_id):
+    return 'nutrition:watermark:%s' % (user_id or 'public')
+
+
+def _user_id(request):
+    return request.user.pk if request.user.is_authenticated else None
+
+
+def get(user_id):
+    """Pēdējās izmaiņas laiks (UNIX sekundes). Ja nav zināms — "tagad" (droši: klients pārlādē)."""
+    key = _key(user_id)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time(), timeout=WATERMARK_TTL)
+        value = cache.get(key)
+    return value if value is not None else time.time()
+
+
+def _set(user_id):
+    cache.set(_key(user_id), time.time(), timeout=WATERMARK_TTL)
+
+
+def touch(user_id):
+    """Atzīmē lietotāja datus kā mainītus — uzreiz un vēlreiz pēc commit (kā `fragments.invalidate`)."""
+    _set(user_id)
+    transaction.on_commit(lambda: _set(user_id))
+
+
+def etag(request, *args, **kwargs):
+    user_id = _user_id(request)
+    parts = [
+        str(user_id or 'public'),
+        repr(get(user_id)),
+        timezone.localdate().isoformat(),
+        getattr(request, 'LANGUAGE_CODE', ''),
+        request.get_full_path(),
+    ]
+    if user_id is None:
+        # anonīmā lietotāja ieteikums nāk no sesijas profila, nevis no DB
+        parts.append(json.dumps(request.session.get('profile'), sort_keys=True, default=str))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def page_etag(request, *args, **kwargs):
+    """`etag` HTML lapām ar {% csrf_token %} formām: iekļauj arī CSRF noslēpumu."""
+    secret = request.META.get('CSRF_COOKIE') or ''
+    return etag(request) + hashlib.sha1(secret.encode('utf-8')).hexdigest()[:8]
+
+
+def last_modified(request, *args, **kwargs):
+    # ne agrāk par šodienas pusnakti: jaunā dienā "šodienas" dati mainās arī bez rakstīšanas
+    changed = dt.datetime.fromtimestamp(get(_user_id(request)), tz=dt.timezone.utc)
+    midnight = timezone.make_aware(dt.datetime.combine(timezone.localdate(), dt.time.min))
+    return max(changed, midnight)
+
+
+def conditional(etag_func=etag):
+    """
+    Dekorators: atbild 304, ja klienta kešatmiņas versija ir aktuāla.
+
+    `Cache-Control: private, no-cache` liek pārlūkam saglabāt atbildi, bet
+    katru reizi to pārbaudīt (If-None-Match), nevis heuristiski rādīt novecojušu.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified)(view)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,115 @@
+import csv
+import heapq
+import io
+import json
+import zlib
+
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.utils import timezone
+
+from .aggregation import FOOD_COLUMNS, NUTRIENTS, day_bounds
+from .models import Entry, FoodEntry
+
+
+"""
+Lietotāja ierakstu vēstures eksports (CSV / NDJSON, pēc izvēles gzip).
+
+Rindas tiek lasītas ar `values_list(...).iterator(chunk_size=...)` — bez modeļu
+objektiem un bez visa rezultāta ielādes atmiņā — un abi ierakstu tipi tiek
+apvienoti hronoloģiski ar `heapq.merge`. Kodētāji atdod gabalus pa
+`FLUSH_BYTES`, tāpēc atmiņas patēriņš nav atkarīgs no ierakstu skaita.
+Izmanto gan `export_history` skats, gan `export_history` komanda.
+"""
+
+COLUMNS = ('origin', 'id', 'user', 'created_at', 'name', 'amount') + NUTRIENTS
+FORMATS = ('csv', 'ndjson')
+CHUNK_SIZE = 2000
+# Cik lielus gabalus (baitos/simbolos) atdot straumei
+FLUSH_BYTES = 64 * 1024
+
+
+def _filtered(qs, user, start, end):
+    if user is not None:
+        qs = qs.filter(user=user)
+    if start is not None:
+        qs = qs.filter(created_at__gte=day_bounds(start, start)[0])
+    if end is not None:
+        qs = qs.filter(created_at__lte=day_bounds(end, end)[1])
+    return qs.order_by('created_at', 'id')
+
+
+def food_rows(user=None, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """`FoodEntry`×`Product` rindas; uzturvielas aprēķina datubāze (amount * per_100g / 100)."""
+    nutrients = {
+        f'v_{name}': ExpressionWrapper(F('amount') * F(f'product__{column}') / Value(100.0), output_field=FloatField())
+        for name, column in FOOD_COLUMNS.items()
+    }
+    qs = _filtered(FoodEntry.objects.all(), user, start, end).annotate(**nutrients)
+    for pk, username, created_at, name, amount, *values in qs.values_list(
+            'id', 'user__username', 'created_at', 'product__name', 'amount',
+            *(f'v_{n}' for n in NUTRIENTS)).iterator(chunk_size=chunk_size):
+        yield (created_at, 'food', pk, username or '', name, amount, *values)
+
+
+def entry_rows(user=None, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Pielāgoto `Entry` ierakstu rindas."""
+    qs = _filtered(Entry.objects.all(), user, start, end)
+    for pk, username, created_at, name, amount, *values in qs.values_list(
+            'id', 'user__username', 'created_at', 'name', 'amount', *NUTRIENTS).iterator(chunk_size=chunk_size):
+        yield (created_at, 'entry', pk, username, name, amount, *values)
+
+
+def rows(user=None, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """
+    Visas rindas hronoloģiskā secībā kā `COLUMNS` kārtas.
+
+    `user` — None nozīmē visus lietotājus (arī publiskos `FoodEntry`);
+    `start`/`end` — vietējās dienas (ieskaitot).
+    """
+    merged = heapq.merge(food_rows(user, start, end, chunk_size), entry_rows(user, start, end, chunk_size),
+                         key=lambda r: (r[0], r[1], r[2]))
+    for created_at, origin, pk, username, name, amount, *values in merged:
+        yield (origin, pk, username, timezone.localtime(created_at).isoformat(), name, amount,
+               *(round(float(v or 0.0), 3) for v in values))
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_ndjson(rows):
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + '\n'
+        parts.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(parts)
+            parts, size = [], 0
+    yield ''.join(parts)
+
+
+def gzip_chunks(chunks):
+    """Saspiež baitu gabalu straumi gzip formātā, neuzkrājot to atmiņā."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip galvene
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(rows, fmt='csv', compress=False):
+    """Atgriež baitu gabalu iteratoru `rows` kodējumam `fmt` formātā."""
+    encoder = encode_ndjson if fmt == 'ndjson' else encode_csv
+    chunks = (text.encode('utf-8') for text in encoder(rows) if text)
+    return gzip_chunks(chunks) if compress else chunks
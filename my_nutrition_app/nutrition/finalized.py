@@ -0,0 +1,116 @@
+import datetime as dt
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from . import aggregation
+
+
+"""
+"Slēgtās" (pabeigtās) dienas kaloriju sērijām.
+
+Vietējā diena, kas jau beigusies, gandrīz nekad nemainās, tāpēc tās kopsummas
+tiek "iesaldētas" kešatmiņā: `daily_calories` pieprasījumā no datubāzes lasa
+tikai šodienu, bet visas iepriekšējās dienas ņem no iesaldētā ieraksta.
+Reta vēlā labošana (ieraksts pagātnes dienā, imports, `rebuild_daily_totals`)
+iet caur `invalidate` / `invalidate_all` (izsauc `nutrition.rollup`), kas maina
+lietotāja "epoch" — vecie iesaldētie ieraksti vairs netiek lasīti.
+
+Slēgtu dienu intervālu var iegūt arī kā nemainīgu resursu
+`api/daily_calories/<start>/<end>/<digest>/`: `digest` ir HMAC no lietotāja un
+datiem, tāpēc URL mainās tikai tad, ja mainās saturs, un to nevar uzminēt —
+atbildi drīkst kešot pārlūks un reverse proxy uz visiem laikiem (`immutable`).
+"""
+
+# Iesaldētie intervāli; pēc TTL vienkārši tiek aprēķināti no jauna
+FROZEN_TTL = 7 * 24 * 60 * 60
+EPOCH_TTL = 30 * 24 * 60 * 60
+# Ne vairāk dienu vienā nemainīgā resursā (kā `api_daily_calories`)
+MAX_DAYS = 365
+
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _user_id(user):
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def _epoch_key(user_id):
+    return 'nutrition:finalized-epoch:%s' % (user_id or 'public')
+
+
+def _epoch(user_id):
+    # Divas daļas: visu lietotāju (`invalidate_all`) un konkrētā lietotāja epoch
+    keys = [_epoch_key('*'), _epoch_key(user_id)]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, time.time_ns(), timeout=EPOCH_TTL)
+            values[key] = cache.get(key)
+    return '%s.%s' % tuple(values[key] for key in keys)
+
+
+def _bump(user_id):
+    cache.set(_epoch_key(user_id), time.time_ns(), timeout=EPOCH_TTL)
+
+
+def invalidate(user_id):
+    """Atsauc lietotāja iesaldētās dienas (uzreiz un vēlreiz pēc commit, kā `fragments.invalidate`)."""
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def invalidate_all():
+    _bump('*')
+    transaction.on_commit(lambda: _bump('*'))
+
+
+def last_closed_day():
+    return timezone.localdate() - dt.timedelta(days=1)
+
+
+def _days(start, end):
+    return [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def daily_calories(user, start, end):
+    """
+    Tas pats, kas `aggregation.daily_calories`, bet slēgtās dienas ņem no iesaldētā ieraksta.
+
+    Kešatmiņas trāpījumā datubāzē tiek lasīta tikai šodiena; netrāpījumā —
+    viss intervāls vienā vaicājumā (kā iepriekš), un slēgtā daļa tiek iesaldēta.
+    """
+    closed_end = min(end, last_closed_day())
+    if closed_end < start:
+        return aggregation.daily_calories(user, start, end)
+
+    user_id = _user_id(user)
+    # epoch nolasa pirms vaicājuma: ja starplaikā notiek invalidācija, rezultāts nonāk jau novecojušā atslēgā
+    key = 'nutrition:finalized:%s:%s:%s:%s' % (user_id or 'public', _epoch(user_id), start.isoformat(), closed_end.isoformat())
+    frozen = cache.get(key)
+    if frozen is None:
+        daily = aggregation.daily_calories(user, start, end)
+        cache.set(key, [daily[day] for day in _days(start, closed_end)], timeout=FROZEN_TTL)
+        return daily
+
+    daily = dict(zip(_days(start, closed_end), frozen))
+    if end > closed_end:
+        daily.update(aggregation.daily_calories(user, closed_end + dt.timedelta(days=1), end))
+    return daily
+
+
+def digest(user, start, end, calories):
+    """Satura HMAC nemainīgā resursa URL (lietotājs + intervāls + vērtības)."""
+    value = '%s|%s|%s|%s' % (_user_id(user) or 'public', start.isoformat(), end.isoformat(), json.dumps(calories))
+    return salted_hmac('nutrition.finalized', value, algorithm='sha256').hexdigest()[:24]
+
+
+def range_url(user, start, end, calories):
+    """Nemainīgā resursa ceļš slēgtu dienu intervālam [start, end] ar jau zināmām vērtībām."""
+    return reverse('nutrition:api_daily_calories_range',
+                   args=[start.isoformat(), end.isoformat(), digest(user, start, end, calories)])
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+"""
+Versijas skaitītājs `home` ierakstu saraksta veidnes fragmentiem.
+
+Katram (lietotājs, diena) pārim kešatmiņā ir versijas numurs. `home.html`
+izmanto to `{% cache %}` atslēgā, tāpēc atkārtots apmeklējums neizpilda ne
+ierakstu vaicājumus, ne saraksta renderēšanu. Rakstīšanas ceļi (`rollup.apply_delta`,
+caur kuru iet pievienošana, rediģēšana, dzēšana, paketes API un imports)
+izsauc `invalidate`, kas palielina versiju — vecie fragmenti vienkārši vairs
+netiek lasīti un izbeidzas pēc TTL. Izmaiņas caur Django admin versiju nemaina.
+"""
+
+# Cik ilgi glabā versijas atslēgu; diena beidzas ātrāk, tāpēc pietiek ar 2 dienām
+VERSION_TTL = 2 * 24 * 60 * 60
+
+
+def _key(user_id, day):
+    # Anonīmie lietotāji redz publiskos ierakstus (user is null) — tiem viena kopīga versija
+    return 'nutrition:entries-version:%s:%s' % (user_id or 'public', day.isoformat())
+
+
+def _initial():
+    # Laika zīmogs, nevis 1: ja versijas atslēga tiek izmesta no kešatmiņas,
+    # jaunā versija nesakritīs ar vēl saglabātiem veciem fragmentiem
+    return time.time_ns() // 1000
+
+
+def version(user_id, day):
+    """Pašreizējā (lietotājs, diena) versija; ja tādas nav — izveido."""
+    key = _key(user_id, day)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _initial(), timeout=VERSION_TTL)
+        value = cache.get(key)
+    return value if value is not None else _initial()
+
+
+def bump(user_id, day):
+    key = _key(user_id, day)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial(), timeout=VERSION_TTL)
+
+
+def invalidate(user_id, day):
+    """
+    Atzīmē (lietotājs, diena) fragmentus kā novecojušus.
+
+    Versija tiek palielināta uzreiz un vēlreiz pēc transakcijas apstiprināšanas:
+    pieprasījums, kas starplaikā nolasīja vēl neapstiprinātos (vecos) datus,
+    varēja tos iekešot ar jau jauno versiju.
+    """
+    bump(user_id, day)
+    transaction.on_commit(lambda: bump(user_id, day))
+
+
+def fragment_key(user, day):
+    """Vērtība `{% cache %}` atslēgai: lietotājs, diena un versija vienā virknē."""
+    user_id = user.pk if user.is_authenticated else None
+    return '%s:%s:%s' % (user_id or 'public', day.isoformat(), version(user_id, day))
+
+
+def ttl():
+    return getattr(settings, 'HOME_FRAGMENT_TTL', 24 * 60 * 60)
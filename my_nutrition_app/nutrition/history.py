@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+
+from django.db import transaction
+
+from . import ingest, rollup, validation
+from .models import Entry
+
+
+"""
+Ierakstu vēstures imports no citiem trackeriem (CSV vai NDJSON, arī .gz) `Entry` tabulā.
+
+Fails tiek lasīts straumējot (rinda pēc rindas), derīgās rindas tiek ievietotas
+ar `bulk_create` partijās, un katra partija ir atsevišķa īsa transakcija —
+SQLite rakstīšanas slēdzene netiek turēta visu importa laiku. Kopā ar partiju
+tajā pašā transakcijā tiek saglabāts `HistoryImport` progress (baitu offsets,
+skaitītāji, kļūdas), tāpēc pēc avārijas imports atsākas no pēdējās saglabātās
+partijas. CSV kolonnas sakrīt ar `nutrition.export` (plus `api_add_entry` lauku
+nosaukumi); laiks — `created_at` vai `date`.
+"""
+
+FORMATS = ('csv', 'ndjson')
+BATCH_SIZE = 1000
+# Cik kļūdu saglabāt darbā (kopējais skaits ir `failed`)
+MAX_ERRORS = 100
+
+
+def guess_format(name):
+    name = name[:-3] if name.endswith('.gz') else name
+    return 'csv' if name.endswith(('.csv', '.tsv')) else 'ndjson'
+
+
+def open_binary(fh, name):
+    """Atgriež binārā režīma plūsmu; `.gz` faili tiek atspiesti straumējot."""
+    return gzip.GzipFile(fileobj=fh, mode='rb') if name.endswith('.gz') else fh
+
+
+def fingerprint(chunks):
+    """{'size', 'checksum'} no faila baitiem (tādiem, kā augšupielādēti — .gz vēl saspiests)."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+    return {'size': size, 'checksum': digest.hexdigest()}
+
+
+def same_file(job, source, fmt, file_fingerprint):
+    """
+    Vai `job` drīkst atsākt ar šo failu.
+
+    Atsākšana izlaiž pirmos `job.offset` baitus, tāpēc citam failam (vai tam
+    pašam ar citu formātu) rindas tiktu pazaudētas vai sabojātas.
+    """
+    return (job.source, job.format, job.size, job.checksum) == (
+        source, fmt, file_fingerprint['size'], file_fingerprint['checksum'])
+
+
+def iter_records(fh, fmt, offset=0):
+    """
+    Ģenerē (offset_pēc_ieraksta, ieraksts | None) no faila.
+
+    None — rindu neizdevās nolasīt (bojāts JSON). CSV galvene tiek nolasīta
+    vienmēr, arī atsākot no `offset`.
+    """
+    if fmt == 'csv':
+        return ingest.iter_csv_rows(fh, offset)
+    return ingest.iter_jsonl_records(ingest.iter_lines(fh, offset))
+
+
+def parse_record(record):
+    """Atgriež (lauki ar `created_at`, None) vai (None, kļūdas_kods) vienai rindai."""
+    if record is None:
+        return None, 'invalid_row'
+    fields, error = validation.entry_fields(record)
+    if error:
+        return None, error
+    created_at = validation.parse_timestamp(record.get('created_at') or record.get('date'))
+    if created_at is None:
+        return None, 'invalid_created_at'
+    fields['created_at'] = created_at
+    return fields, None
+
+
+def _flush(job, entries, offset, rows, failed, errors):
+    # Partija + progress vienā transakcijā: pēc avārijas nekas netiek dublēts vai pazaudēts
+    with transaction.atomic():
+        if entries:
+            entries = Entry.objects.bulk_create(entries)
+            rollup.record_entries(entries)
+        job.offset = offset
+        job.rows += rows
+        job.imported += len(entries)
+        job.failed += failed
+        job.errors = (job.errors + errors)[:MAX_ERRORS]
+        job.save(update_fields=['offset', 'rows', 'imported', 'failed', 'errors', 'updated_at'])
+
+
+def run(job, fh, batch_size=BATCH_SIZE, progress=None):
+    """
+    Importē `fh` (binārā, jau atspiestā plūsma) darbam `job`, sākot no `job.offset`.
+
+    `progress(job)` tiek izsaukts pēc katras partijas. Atgriež `job`.
+    """
+    entries, errors = [], []
+    rows = failed = 0
+    offset = job.offset
+    for offset, record in iter_records(fh, job.format, job.offset):
+        rows += 1
+        fields, error = parse_record(record)
+        if error:
+            failed += 1
+            errors.append({'row': job.rows + rows, 'error': error})
+        else:
+            entries.append(Entry(user_id=job.user_id, **fields))
+        if rows >= batch_size:
+            _flush(job, entries, offset, rows, failed, errors)
+            if progress:
+                progress(job)
+            entries, errors = [], []
+            rows = failed = 0
+    _flush(job, entries, offset, rows, failed, errors)
+    job.finished = True
+    job.save(update_fields=['finished', 'updated_at'])
+    if progress:
+        progress(job)
+    return job
+
+
+def summary(job):
+    """JSON-draudzīgs darba stāvoklis (progresa atskaitei)."""
+    return {
+        'id': job.pk,
+        'source': job.source,
+        'format': job.format,
+        'rows': job.rows,
+        'imported': job.imported,
+        'failed': job.failed,
+        'errors': job.errors,
+        'finished': job.finished,
+    }
@@ -0,0 +1,62 @@
+import csv
+import json
+
+
+"""
+Kopīgie rīki rindu failu (JSONL/NDJSON, CSV/TSV) straumējošai lasīšanai.
+
+Izmanto gan OFF kataloga imports (`import_off_catalog`), gan ierakstu
+vēstures imports (`nutrition.history`). Plūsma tiek lasīta binārā režīmā, un
+katrs ieraksts tiek atgriezts kopā ar baitu offsetu aiz tā (nesaspiestajā
+plūsmā) — to saglabā kā atsākšanas punktu.
+"""
+
+
+def iter_lines(fh, offset=0):
+    """Ģenerē (offset_pēc_rindas, rinda_baitos), sākot no `offset`."""
+    if offset:
+        fh.seek(offset)  # GzipFile atbalsta seek uz priekšu (atspiežot)
+    for line in fh:
+        offset += len(line)
+        yield offset, line
+
+
+def iter_jsonl_records(lines):
+    """Ģenerē (offset, vārdnīca | None) no JSONL rindām; None — bojāta rinda, tukšās rindas izlaiž."""
+    for offset, line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield offset, record
+
+
+def iter_csv_rows(fh, offset=0):
+    """
+    Ģenerē (offset, {kolonna: vērtība}) no CSV/TSV plūsmas.
+
+    Galvene tiek nolasīta vienmēr, arī atsākot no `offset`; atdalītājs —
+    tabulācija, ja tā ir galvenē, citādi komats. `csv.reader` lasa visu plūsmu,
+    tāpēc pēdiņās ielikts lauks ar rindas pārnesumu paliek viens ieraksts;
+    offsets tiek atgriezts tikai ieraksta beigās (nekad ieraksta vidū).
+    """
+    header = fh.readline()
+    offset = max(offset, len(header))
+    text = header.decode('utf-8-sig', errors='replace').rstrip('\r\n')
+    delimiter = '\t' if '\t' in text else ','
+    columns = next(csv.reader([text], delimiter=delimiter), [])
+    end = offset
+
+    def lines():
+        # csv.reader pieprasa nākamo rindu tikai tad, kad tā vajadzīga, tāpēc `end`
+        # pēc ieraksta nolasīšanas ir tieši tā beigas
+        nonlocal end
+        for end, line in iter_lines(fh, offset):
+            yield line.decode('utf-8', errors='replace')
+
+    for values in csv.reader(lines(), delimiter=delimiter):
+        if values:
+            yield end, dict(zip(columns, values))
@@ -0,0 +1,109 @@
+import bisect
+import threading
+
+
+"""
+Vienkārši, pavediendroši procesa metrikas primitīvi (skaitītāji un histogrammas).
+
+Vērtības tiek glabātas pa etiķešu (labels) kombinācijām, piem.
+`off_request_seconds{endpoint="product", outcome="ok"}`. Visas metrikas tiek
+reģistrētas `REGISTRY`, no kura tās var nolasīt testi vai eksportētāji
+(`nutrition.metrics` — Prometheus teksta formāts). `dump()` atgriež metrikas
+stāvokli JSON formā, lai to varētu apvienot starp worker procesiem.
+"""
+
+# Noklusējuma latentuma robežas sekundēs (līdzīgi Prometheus klientam)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = {}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Counter:
+    """Monotoni augošs skaitītājs ar etiķetēm."""
+
+    def __init__(self, name, help_text=''):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY[name] = self
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        """Atgriež [(labels_dict, vērtība), ...]."""
+        with self._lock:
+            return [(dict(k), v) for k, v in self._values.items()]
+
+    def dump(self):
+        return {'type': 'counter', 'help': self.help, 'samples': [[labels, v] for labels, v in self.samples()]}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Histogramma ar fiksētām (kumulatīvām) robežām, summu un skaitu katrai etiķešu kopai."""
+
+    def __init__(self, name, help_text='', buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY[name] = self
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def snapshot(self, **labels):
+        """Atgriež {'buckets': [(robeža, kumulatīvais_skaits), ...], 'sum', 'count'}."""
+        with self._lock:
+            state = self._values.get(_label_key(labels))
+            if state is None:
+                return {'buckets': [(b, 0) for b in self.buckets] + [(float('inf'), 0)], 'sum': 0.0, 'count': 0}
+            return self._snapshot(state)
+
+    def _snapshot(self, state):
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+            running += count
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'sum': state['sum'], 'count': state['count']}
+
+    def samples(self):
+        """Atgriež [(labels_dict, snapshot), ...]."""
+        with self._lock:
+            return [(dict(k), self._snapshot(v)) for k, v in self._values.items()]
+
+    def dump(self):
+        """Neapstrādāts stāvoklis: skaiti pa robežām (ne kumulatīvi), summa un skaits."""
+        with self._lock:
+            samples = [[dict(k), {'counts': list(v['counts']), 'sum': v['sum'], 'count': v['count']}]
+                       for k, v in self._values.items()]
+        return {'type': 'histogram', 'help': self.help, 'buckets': list(self.buckets), 'samples': samples}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
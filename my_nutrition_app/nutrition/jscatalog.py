@@ -0,0 +1,97 @@
+import functools
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils import translation
+from django.views.i18n import JavaScriptCatalog
+
+
+"""
+Iepriekš uzbūvēti JavaScript tulkojumu katalogi.
+
+`/jsi18n/` (`JavaScriptCatalog`) katru pieprasījumu no jauna salasa
+`djangojs.po`/`.mo` un atgriež JS, ko pārlūks labi kešot nevar. `build`
+(komanda `build_js_catalogs`) to pašu JS ieraksta statiskajos failos —
+`nutrition/static/nutrition/jsi18n/<valoda>.<hash>.js` katrai `LANGUAGES`
+valodai — un `manifest.json` ar aktuālo faila nosaukumu. Veidnes tag
+`{% js_catalog_url %}` atgriež jaukto failu (ilgi kešojams statisks resurss);
+ja katalogs vēl nav uzbūvēts, tas atgriež `/jsi18n/` kā iepriekš.
+
+Pēc `compilemessages` katalogi jāpārbūvē; `build_js_catalogs --check` to pārbauda.
+"""
+
+OUTPUT_DIR = Path(__file__).resolve().parent / 'static' / 'nutrition' / 'jsi18n'
+# Ceļš statisko failu nosaukumtelpā (STATIC_URL + šis + faila nosaukums)
+STATIC_PREFIX = 'nutrition/jsi18n/'
+MANIFEST = 'manifest.json'
+
+
+def languages():
+    return [code for code, _name in settings.LANGUAGES]
+
+
+def render(language):
+    """Tas pats JS, ko `/jsi18n/` atgrieztu valodai `language` (baiti)."""
+    with translation.override(language):
+        response = JavaScriptCatalog().get(HttpRequest())
+    return response.content
+
+
+def file_name(language, content):
+    # md5 12 zīmes — tāpat kā Django ManifestStaticFilesStorage
+    return '%s.%s.js' % (language, hashlib.md5(content).hexdigest()[:12])
+
+
+def build(output_dir=OUTPUT_DIR):
+    """Uzbūvē katalogus visām valodām, izdzēš vecās versijas; atgriež manifestu {valoda: statiskais_ceļš}."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for language in languages():
+        content = render(language)
+        name = file_name(language, content)
+        path = output_dir / name
+        if not path.exists():
+            path.write_bytes(content)
+        for old in output_dir.glob('%s.*.js' % language):
+            if old.name != name:
+                old.unlink()
+        manifest[language] = STATIC_PREFIX + name
+    (output_dir / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    _manifest.cache_clear()
+    return manifest
+
+
+def outdated(output_dir=OUTPUT_DIR):
+    """Valodas, kuru uzbūvētais katalogs neatbilst pašreizējiem tulkojumiem (vai nav uzbūvēts)."""
+    output_dir = Path(output_dir)
+    manifest = read_manifest(output_dir)
+    stale = []
+    for language in languages():
+        name = file_name(language, render(language))
+        if manifest.get(language) != STATIC_PREFIX + name or not (output_dir / name).exists():
+            stale.append(language)
+    return stale
+
+
+def read_manifest(output_dir=OUTPUT_DIR):
+    try:
+        return json.loads((Path(output_dir) / MANIFEST).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+@functools.lru_cache(maxsize=1)
+def _manifest():
+    return read_manifest()
+
+
+def static_path(language):
+    """Uzbūvētā kataloga statiskais ceļš valodai (piem. 'lv-lv' → 'lv') vai None."""
+    manifest = _manifest()
+    if not language:
+        return None
+    return manifest.get(language) or manifest.get(language.split('-')[0])
@@ -0,0 +1,250 @@
+import base64
+import datetime as dt
+import heapq
+import json
+
+from django.db.models import F, Q, Value
+from django.utils import timezone
+
+from . import aggregation, finalized
+from .models import Entry, FoodEntry
+
+
+"""
+Dienas "virsgrāmata" (ledger) — viena vieta, kur `home`, `progress` un
+`api_daily_calories` iegūst dienu intervālus, ierakstu sarakstus un kopsummas.
+
+`FoodEntry` uzturvielas tiek aprēķinātas SQL pusē (anotācijas), produkta
+nosaukums nāk ar `select_related('product')`, un `.only()` nolasa tikai
+attēlošanai vajadzīgās kolonnas. Vienas dienas saraksts = ne vairāk kā 2 vaicājumi.
+
+`history_page` — visas vēstures pārlūkošana ar kursoru (keyset) lapošanu:
+katra lapa ir 2 indeksēti vaicājumi neatkarīgi no tā, cik dziļi lietotājs ir ritinājis.
+"""
+
+# Kolonnas, kuras nolasa saraksta attēlošanai
+_FOOD_ONLY = ('id', 'user_id', 'amount', 'initial_amount', 'created_at', 'product__name')
+_ENTRY_ONLY = ('id', 'user_id', 'name', 'amount', 'kcal', 'protein', 'fat', 'carbs', 'created_at')
+
+
+class LedgerEntry:
+    """Viens attēlojams ieraksts (FoodEntry vai Entry) ar aprēķinātām vērtībām."""
+    __slots__ = ('pk', 'name', 'amount', 'initial_amount', 'kcal', 'protein', 'fat', 'carbs',
+                 'origin', 'created_at')
+
+    def __init__(self, pk, name, amount, initial_amount, kcal, protein, fat, carbs, origin, created_at):
+        self.pk = pk
+        self.name = name
+        self.amount = amount
+        self.initial_amount = initial_amount
+        self.kcal = kcal
+        self.protein = protein
+        self.fat = fat
+        self.carbs = carbs
+        self.origin = origin  # 'food' vai 'entry'
+        self.created_at = created_at
+
+    @property
+    def id(self):
+        return self.pk
+
+    def __repr__(self):
+        return f"<LedgerEntry {self.origin}:{self.pk} {self.name} {self.kcal} kcal>"
+
+
+class DayLedger:
+    """Vienas dienas ierakstu saraksts un noapaļotas kopsummas."""
+    __slots__ = ('day', 'entries', 'totals')
+
+    def __init__(self, day, entries, totals):
+        self.day = day
+        self.entries = entries
+        self.totals = totals  # {'calories', 'protein', 'fat', 'carbs'}
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def today():
+    """Šodienas vietējā (TIME_ZONE) diena — tā pati, pēc kuras grupē ierakstus."""
+    return timezone.localdate()
+
+
+def window(days, end=None):
+    """Atgriež (start, end) datumus pēdējām `days` dienām, ieskaitot `end` (noklusējums — šodiena)."""
+    end = end or today()
+    return end - dt.timedelta(days=days - 1), end
+
+
+def _owner_filter(user):
+    # Pieslēgtam lietotājam — viņa ieraksti; anonīmam — publiskie (user is null)
+    if user is not None and user.is_authenticated:
+        return {'user': user}
+    return {'user__isnull': True}
+
+
+def _with_food_values(qs):
+    # Produkta nosaukums + SQL pusē aprēķinātas uzturvielas (`<n>_value`)
+    nutrients = {
+        f'{name}_value': F('amount') * F(f'product__{column}') / Value(100.0)
+        for name, column in aggregation.FOOD_COLUMNS.items()
+    }
+    return qs.select_related('product').only(*_FOOD_ONLY).annotate(**nutrients)
+
+
+def _food_queryset(user, start_dt, end_dt):
+    qs = FoodEntry.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt, **_owner_filter(user))
+    return _with_food_values(qs).order_by('created_at', 'id')
+
+
+def _entry_queryset(user, start_dt, end_dt):
+    if user is None or not user.is_authenticated:
+        return Entry.objects.none()
+    return (Entry.objects
+            .filter(user=user, created_at__gte=start_dt, created_at__lte=end_dt)
+            .only(*_ENTRY_ONLY))  # Entry.Meta.ordering: jaunākie vispirms
+
+
+def day_ledger(user, day=None):
+    """
+    Sagatavo `DayLedger` lietotāja (vai publiskajiem) dienas ierakstiem.
+
+    Secība: vispirms `FoodEntry`, tad `Entry` (kā iepriekš `home` skatā).
+    """
+    day = day or today()
+    start_dt, end_dt = aggregation.day_bounds(day, day)
+
+    entries = []
+    totals = {'calories': 0.0, 'protein': 0.0, 'fat': 0.0, 'carbs': 0.0}
+
+    for fe in _food_queryset(user, start_dt, end_dt):
+        values = _food_values(fe)
+        entries.append(_food_entry(fe, values))
+        _accumulate(totals, values)
+
+    for ce in _entry_queryset(user, start_dt, end_dt):
+        values = _entry_values(ce)
+        entries.append(_custom_entry(ce, values))
+        _accumulate(totals, values)
+
+    return DayLedger(day, entries, {k: round(v, 2) for k, v in totals.items()})
+
+
+def _food_values(fe):
+    return (fe.kcal_value or 0.0, fe.protein_value or 0.0, fe.fat_value or 0.0, fe.carbs_value or 0.0)
+
+
+def _entry_values(ce):
+    return (ce.kcal or 0.0, ce.protein or 0.0, ce.fat or 0.0, ce.carbs or 0.0)
+
+
+def _food_entry(fe, values=None):
+    values = values or _food_values(fe)
+    return LedgerEntry(fe.pk, fe.product.name, fe.amount, fe.initial_amount,
+                       *(round(v, 2) for v in values), 'food', fe.created_at)
+
+
+def _custom_entry(ce, values=None):
+    values = values or _entry_values(ce)
+    return LedgerEntry(ce.pk, ce.name, ce.amount, ce.amount,
+                       *(round(v, 2) for v in values), 'entry', ce.created_at)
+
+
+def _accumulate(totals, values):
+    for key, value in zip(('calories', 'protein', 'fat', 'carbs'), values):
+        totals[key] += value
+
+
+def daily_calories(user, days, end=None):
+    """
+    Atgriež (dates, calories) sarakstus pēdējām `days` dienām grafikiem/API.
+
+    `dates` — 'YYYY-MM-DD' virknes, `calories` — noapaļotas līdz 2 zīmēm.
+    """
+    start, end = window(days, end)
+    # slēgtās (pagājušās) dienas nāk no iesaldētā ieraksta, no DB tiek lasīta tikai šodiena
+    daily = finalized.daily_calories(user, start, end)
+    dates = [d.strftime('%Y-%m-%d') for d in daily]
+    calories = [round(kcal, 2) for kcal in daily.values()]
+    return dates, calories
+
+
+# Lapas izmērs vēstures API (noklusējums / maksimums)
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(entry):
+    """Necaurredzams kursors "pēc šī ieraksta": (created_at, origin, id)."""
+    raw = json.dumps([entry.created_at.isoformat(), entry.origin, entry.pk])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Atgriež (created_at, origin, id) vai izmet ValueError, ja kursors nav derīgs."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, origin, pk = json.loads(raw)
+        created_at = dt.datetime.fromisoformat(created_at)
+    except Exception as ex:
+        raise ValueError('invalid cursor') from ex
+    if origin not in ('food', 'entry') or not isinstance(pk, int) or timezone.is_naive(created_at):
+        raise ValueError('invalid cursor')
+    return created_at, origin, pk
+
+
+def _after(cursor, origin):
+    """
+    Keyset nosacījums "pēc kursora" secībā (created_at, origin, id) dilstoši.
+
+    `created_at__lte` tiek pievienots vienmēr, lai SQLite izmantotu
+    (user, created_at) indeksa diapazonu arī ar OR nosacījumu.
+    """
+    created_at, cursor_origin, pk = cursor
+    if origin < cursor_origin:
+        return Q(created_at__lte=created_at)
+    if origin > cursor_origin:
+        return Q(created_at__lt=created_at)
+    return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+
+
+def history_page(user, cursor=None, limit=PAGE_SIZE, start=None, end=None, origin=None, q=None):
+    """
+    Viena vēstures lapa (jaunākie vispirms) no abām ierakstu tabulām.
+
+    `cursor` — `decode_cursor` rezultāts vai None (pirmā lapa); `start`/`end` —
+    vietējās dienas; `origin` — 'food' / 'entry' / None; `q` — nosaukuma fragments.
+    Atgriež ([LedgerEntry, ...], nākamās_lapas_kursors | None).
+    """
+    limit = max(1, min(MAX_PAGE_SIZE, limit))
+    common = Q()
+    if start is not None:
+        common &= Q(created_at__gte=aggregation.day_bounds(start, start)[0])
+    if end is not None:
+        common &= Q(created_at__lte=aggregation.day_bounds(end, end)[1])
+
+    sources = []
+    if origin in (None, 'food'):
+        qs = FoodEntry.objects.filter(common, **_owner_filter(user))
+        if q:
+            qs = qs.filter(product__name__icontains=q)
+        if cursor is not None:
+            qs = qs.filter(_after(cursor, 'food'))
+        sources.append(_food_entry(fe) for fe in _with_food_values(qs).order_by('-created_at', '-id')[:limit + 1])
+    if origin in (None, 'entry') and user is not None and user.is_authenticated:
+        qs = Entry.objects.filter(common, user=user)
+        if q:
+            qs = qs.filter(name__icontains=q)
+        if cursor is not None:
+            qs = qs.filter(_after(cursor, 'entry'))
+        sources.append(_custom_entry(ce) for ce in qs.only(*_ENTRY_ONLY).order_by('-created_at', '-id')[:limit + 1])
+
+    merged = heapq.merge(*sources, key=lambda e: (e.created_at, e.origin, e.pk), reverse=True)
+    page = [e for _, e in zip(range(limit + 1), merged)]
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
@@ -0,0 +1,59 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from nutrition import views
+
+
+"""
+Salīdzina `api_add_entry` caurlaidību: N atsevišķi pieprasījumi (viens INSERT un
+viena transakcija katram) pret vienu pieprasījumu ar N ierakstiem (`bulk_create`).
+
+Izmanto konfigurēto datubāzi un pagaidu lietotāju, kurš beigās tiek izdzēsts
+(kopā ar visiem viņa ierakstiem un `DailyTotals`).
+"""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark single vs bulk Entry inserts through api_add_entry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=500, help='Entries per mode.')
+        parser.add_argument('--batch-size', type=int, default=10, help='Entries per bulk request (a logged meal).')
+
+    def handle(self, *args, **options):
+        n, batch = options['entries'], max(1, options['batch_size'])
+        user = get_user_model().objects.create_user(username='bench-%d' % int(time.time() * 1000))
+        factory = RequestFactory()
+        items = [{'name': 'Bench %d' % i, 'amount': 150, 'kcal_per100': 120, 'protein_per100': 5,
+                  'fat_per100': 3, 'carbs_per100': 18} for i in range(n)]
+
+        def post(body):
+            request = factory.post('/nutrition/api/add-entry/', json.dumps(body), content_type='application/json')
+            request.user = user
+            response = views.api_add_entry(request)
+            assert response.status_code == 200, response.content
+
+        try:
+            started = time.perf_counter()
+            for item in items:
+                post(item)
+            single_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for i in range(0, n, batch):
+                post(items[i:i + batch])
+            bulk_seconds = time.perf_counter() - started
+        finally:
+            user.delete()
+
+        report = {
+            'entries': n,
+            'single': {'requests': n, 'seconds': round(single_seconds, 3), 'entries_per_s': round(n / single_seconds, 1)},
+            'bulk': {'requests': -(-n // batch), 'batch_size': batch, 'seconds': round(bulk_seconds, 3),
+                     'entries_per_s': round(n / bulk_seconds, 1)},
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from nutrition import off
+
+
+"""
+Salīdzina sinhrono (WSGI) un asinhrono (ASGI) svītrkodu pieprasījumu caurlaidību
+pret lokālu, lēni atbildošu OpenFoodFacts aizstājēju.
+
+Sinhronais ceļš: `--workers` pavedieni (kā WSGI worker pavedieni), katrs ar savu
+`django.test.Client` (WSGI handleris) sūta pieprasījumus uz `api_product_lookup`.
+Asinhronais ceļš: viena notikumu cilpa, visi pieprasījumi vienlaicīgi caur
+`AsyncClient` (ASGI handleris) uz `api_product_lookup_async`. Abos gadījumos tiek
+mērīts viss pieprasījuma ceļš — URL maršrutēšana un visa MIDDLEWARE kaudze (arī
+sync/async pielāgošana), nevis tikai skata funkcija. Katram pieprasījumam ir
+unikāls svītrkods, tāpēc kešatmiņa un lokālais katalogs rezultātus neietekmē.
+"""
+
+
+class _SlowOffHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        code = self.path.rsplit('/', 1)[-1].split('.', 1)[0]
+        body = json.dumps({'status': 1, 'code': code, 'product': {
+            'product_name': 'Stub %s' % code, 'nutriments': {'energy-kcal_100g': 100},
+        }}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sync (WSGI-style threads) vs async (ASGI event loop) product lookups against a slow local OFF stub.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Lookups per mode.')
+        parser.add_argument('--workers', type=int, default=8, help='Threads for the sync (WSGI) run.')
+        parser.add_argument('--delay', type=float, default=0.5, help='Stub response delay in seconds.')
+
+    def handle(self, *args, **options):
+        server = _StubServer(('127.0.0.1', 0), _SlowOffHandler)
+        server.delay = options['delay']
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = 'http://127.0.0.1:%d' % server.server_port
+        n = options['requests']
+        try:
+            # test klienti sūta Host: testserver
+            with override_settings(OFF_BASE_URL=base_url, OFF_RETRIES=0, OFF_POOL_SIZE=max(options['workers'], 100),
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                self._reset_clients()
+                sync_seconds = self._run_sync(n, options['workers'])
+                async_seconds = asyncio.run(self._run_async(n))
+        finally:
+            self._reset_clients()
+            server.shutdown()
+            server.server_close()
+
+        report = {
+            'requests': n,
+            'stub_delay_s': options['delay'],
+            'sync': {'workers': options['workers'], 'seconds': round(sync_seconds, 3), 'rps': round(n / sync_seconds, 1)},
+            'async': {'seconds': round(async_seconds, 3), 'rps': round(n / async_seconds, 1)},
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def _reset_clients(self):
+        # Klienti nolasa OFF_BASE_URL konstruktorā — pēc iestatījumu maiņas jāizveido no jauna
+        off._client = None
+        off._async_clients.clear()
+        cache.clear()
+
+    def _check(self, url, response):
+        if response.status_code != 200:
+            raise CommandError('%s returned %d' % (url, response.status_code))
+
+    def _run_sync(self, n, workers):
+        url = reverse('nutrition:api_product_lookup')
+        local = threading.local()
+
+        def one(i):
+            # Client nav paredzēts lietošanai no vairākiem pavedieniem — katram savs
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            self._check(url, local.client.get(url, {'barcode': 'sync-%d' % i}))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(one, range(n)))
+        return time.perf_counter() - started
+
+    async def _run_async(self, n):
+        url = reverse('nutrition:api_product_lookup_async')
+        client = AsyncClient()
+
+        async def one(i):
+            self._check(url, await client.get(url, {'barcode': 'async-%d' % i}))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        elapsed = time.perf_counter() - started
+        await off.get_async_client().aclose()
+        return elapsed
@@ -0,0 +1,104 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nutrition import seed
+from nutrition.models import Entry, FoodEntry
+
+
+"""
+Skatu latentuma un vaicājumu skaita benchmarks pie dažādiem datu apjomiem.
+
+Katram `--sizes` izmēram (vēstures dienas uz lietotāju) dati tiek ģenerēti ar
+`nutrition.seed`, un katrs skats tiek izsaukts `--iterations` reizes caur
+`django.test.Client` (pilna middleware virkne). Rezultāts — JSON ar p50/p95/p99
+(ms) un vaicājumu skaitu katram skatam, ko var saglabāt un salīdzināt starp
+versijām. Pēc noklusējuma darbojas atsevišķā testa datubāzē (kā testu runner),
+lai reālā datubāze netiktu skarta.
+"""
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Time home/progress/api_daily_calories/api_add_entry/edit_entry at several data sizes; prints JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='30,365,1095', help='Comma-separated days of history per user.')
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--entries-per-day', type=float, default=4)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--use-current-db', action='store_true',
+                            help='Benchmark against the configured database instead of a throwaway test database.')
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        old_name = None
+        if not options['use_current_db']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # `Client` sūta Host: testserver (kā testos)
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                report = {'iterations': options['iterations'], 'runs': [self._run(size, options) for size in sizes]}
+        finally:
+            seed.clear('bench')
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def _run(self, days, options):
+        seed.clear('bench')
+        counts = seed.seed(users=options['users'], products=200, days=days,
+                           entries_per_day=options['entries_per_day'], prefix='bench')
+        user = get_user_model().objects.filter(username__startswith='bench-user-').order_by('id').first()
+        client = Client()
+        client.force_login(user)
+        edit_id = FoodEntry.objects.filter(user=user).order_by('-created_at').values_list('id', flat=True).first()
+
+        calls = {
+            'home': lambda: client.get(reverse('nutrition:home')),
+            'progress': lambda: client.get(reverse('nutrition:progress')),
+            'api_daily_calories': lambda: client.get(reverse('nutrition:api_daily_calories'), {'days': 30}),
+            'api_add_entry': lambda: client.post(reverse('nutrition:api_add_entry'), json.dumps(
+                {'name': 'Bench', 'amount': 150, 'kcal_per100': 120}), content_type='application/json'),
+            'edit_entry': lambda: client.post(reverse('nutrition:edit_entry', args=[edit_id]), json.dumps(
+                {'amount': 120}), content_type='application/json'),
+        }
+        views = {name: self._measure(call, options['iterations']) for name, call in calls.items()}
+        Entry.objects.filter(user=user, name='Bench').delete()
+        return {'days': days, 'rows': counts, 'views': views}
+
+    def _measure(self, call, iterations):
+        call()  # iesildīšana (kešatmiņas, importi)
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = call()
+                timings.append((time.perf_counter() - started) * 1000.0)
+            if response.status_code >= 400:
+                # `python -O` izmestu assert — kļūdaina atbilde nedrīkst nonākt rezultātos
+                url = response.request['PATH_INFO']
+                raise CommandError('%s returned %d' % (url, response.status_code))
+            queries.append(len(ctx.captured_queries))
+        timings.sort()
+        return {
+            'p50_ms': round(_percentile(timings, 50), 2),
+            'p95_ms': round(_percentile(timings, 95), 2),
+            'p99_ms': round(_percentile(timings, 99), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(queries),
+        }
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrition import jscatalog
+
+
+class Command(BaseCommand):
+    """Ieraksta JavaScript tulkojumu katalogus statiskajos failos (`nutrition.jscatalog`)."""
+    help = 'Write a content-hashed JavaScript translation catalog for each language in LANGUAGES into static files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(jscatalog.OUTPUT_DIR),
+                            help='Directory for the catalogs (default: the nutrition app static dir).')
+        parser.add_argument('--check', action='store_true',
+                            help='Do not write anything; exit with an error if a catalog is missing or outdated.')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = jscatalog.outdated(options['output'])
+            if stale:
+                raise CommandError('Outdated JavaScript catalogs: %s. Run build_js_catalogs.' % ', '.join(stale))
+            self.stdout.write(self.style.SUCCESS('JavaScript catalogs are up to date.'))
+            return
+
+        manifest = jscatalog.build(options['output'])
+        for language, path in sorted(manifest.items()):
+            self.stdout.write('%-4s %s' % (language, path))
+        self.stdout.write(self.style.SUCCESS('Wrote %d catalog(s).' % len(manifest)))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrition import assets
+
+
+class Command(BaseCommand):
+    """Uzbūvē apvienotos, minificētos statiskos failus (`nutrition.assets`)."""
+    help = 'Bundle common.js with each page script and minify the bundles and style.css into nutrition/static/nutrition/dist/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(assets.OUTPUT_DIR),
+                            help='Directory for the bundles (default: the nutrition app static dir).')
+        parser.add_argument('--check', action='store_true',
+                            help='Do not write anything; exit with an error if a bundle is missing or outdated.')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = assets.outdated(options['output'])
+            if stale:
+                raise CommandError('Outdated static bundles: %s. Run build_static_assets.' % ', '.join(stale))
+            self.stdout.write(self.style.SUCCESS('Static bundles are up to date.'))
+            return
+
+        sizes = assets.build(options['output'])
+        for path, (original, bundled) in sorted(sizes.items()):
+            self.stdout.write('%-28s %7d -> %7d bytes' % (path, original, bundled))
+        self.stdout.write(self.style.SUCCESS('Wrote %d bundle(s). Run collectstatic to hash and compress them.' % len(sizes)))
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from nutrition import queryplan
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Pārbauda, ka `home`, `progress` un `api_daily_calories` vaicājumi neskenē ierakstu tabulas pilnībā."""
+    help = 'Run EXPLAIN QUERY PLAN on the queries of home/progress/api_daily_calories and fail on full table scans.'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN check is only implemented for SQLite.')
+        try:
+            # Pagaidu lietotājs transakcijā, kas beigās tiek atcelta — datubāze paliek nemainīta
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(username='__query_plan_check__')
+                report = queryplan.check(user)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        failures = 0
+        for name, who, sql, plan, scans in report:
+            status = 'FULL SCAN' if scans else 'ok'
+            self.stdout.write('%-20s %-10s %s' % (name, who, status))
+            for detail in plan:
+                self.stdout.write('    ' + detail)
+            failures += bool(scans)
+        if failures:
+            raise CommandError('%d quer(ies) fall back to a full table scan.' % failures)
+        self.stdout.write(self.style.SUCCESS('All %d queries use indexes.' % len(report)))
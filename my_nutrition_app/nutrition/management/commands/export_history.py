@@ -0,0 +1,52 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from nutrition import export
+
+
+class Command(BaseCommand):
+    """Eksportē ierakstu vēsturi (visu lietotāju vai viena) CSV/NDJSON formātā, straumējot."""
+    help = 'Stream FoodEntry and Entry history as CSV or NDJSON (optionally gzip-compressed).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Export only this username (default: all users, including public entries).')
+        parser.add_argument('--format', choices=export.FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--start', help='First local day to include (YYYY-MM-DD).')
+        parser.add_argument('--end', help='Last local day to include (YYYY-MM-DD).')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE, help='Rows fetched per database round-trip.')
+        parser.add_argument('-o', '--output', help='Output file (default: stdout).')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError('Unknown user: %s' % options['user'])
+        start, end = self._day(options['start']), self._day(options['end'])
+
+        rows = export.rows(user=user, start=start, end=end, chunk_size=options['chunk_size'])
+        chunks = export.stream(rows, options['format'], options['gzip'])
+        if options['output']:
+            with open(options['output'], 'wb') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+
+    def _day(self, value):
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError('Invalid date: %s (expected YYYY-MM-DD)' % value)
+        return day
@@ -0,0 +1,57 @@
+import functools
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrition import history
+from nutrition.models import HistoryImport
+
+
+class Command(BaseCommand):
+    """Importē lietotāja ierakstu vēsturi (CSV/NDJSON, arī .gz) `Entry` tabulā, ar atsākšanu."""
+    help = "Stream a CSV/NDJSON food-log history (optionally gzipped) into a user's Entry rows, resumably."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='History file: .csv/.tsv or .ndjson/.jsonl, optionally .gz')
+        parser.add_argument('--user', required=True, help='Username that will own the imported entries.')
+        parser.add_argument('--format', choices=history.FORMATS, help='Input format (guessed from the file name by default).')
+        parser.add_argument('--batch-size', type=int, default=history.BATCH_SIZE)
+        parser.add_argument('--resume', action='store_true',
+                            help="Continue this user's last unfinished import of the same file.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError('File not found: %s' % path)
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive.')
+        user = get_user_model().objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError('Unknown user: %s' % options['user'])
+        source = os.path.abspath(path)[-255:]
+        fmt = options['format'] or history.guess_format(path)
+        with open(path, 'rb') as fh:
+            file_fingerprint = history.fingerprint(iter(functools.partial(fh.read, 1 << 20), b''))
+
+        job = None
+        if options['resume']:
+            job = HistoryImport.objects.filter(user=user, source=source, finished=False).first()
+            if job is not None:
+                if not history.same_file(job, source, fmt, file_fingerprint):
+                    raise CommandError('The file or format changed since import %d started; '
+                                       'run without --resume to start a new import.' % job.pk)
+                self.stdout.write('Resuming import %d at byte %d (%d rows done).' % (job.pk, job.offset, job.rows))
+        if job is None:
+            job = HistoryImport.objects.create(user=user, source=source, format=fmt, **file_fingerprint)
+
+        with open(path, 'rb') as fh:
+            history.run(job, history.open_binary(fh, path), options['batch_size'], progress=self._progress)
+
+        for error in job.errors:
+            self.stderr.write('  row %(row)d: %(error)s' % error)
+        self.stdout.write(self.style.SUCCESS(
+            'Imported %d entr(ies), %d row(s) failed (import %d).' % (job.imported, job.failed, job.pk)))
+
+    def _progress(self, job):
+        self.stdout.write('  %d rows: %d imported, %d failed' % (job.rows, job.imported, job.failed))
@@ -0,0 +1,161 @@
+import gzip
+import hashlib
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from nutrition import ingest, off
+from nutrition.models import Product
+
+
+"""
+OpenFoodFacts kataloga imports no lokāla dump faila (JSONL vai CSV/TSV, arī .gz).
+
+Fails tiek apstrādāts kā ģeneratoru virkne: rindas → ieraksti → normalizēti
+produkti → partijas. Atmiņā vienlaikus ir tikai viena partija, tāpēc arī
+vairāku miljonu rindu dumpi importējas ierobežotā atmiņā. Pēc katras partijas
+checkpoint failā tiek saglabāts baitu offsets (nesaspiestajā plūsmā), lai ar
+`--resume` varētu turpināt no tās pašas vietas. Checkpoint satur arī faila
+ceļu, formātu, izmēru un sākuma kontrolsummu — citam failam atsākšana tiek atteikta.
+"""
+
+# Kolonnas, kuras OFF CSV dumpā satur `nutriments` vērtības
+_CSV_NUTRIMENTS = ('energy-kcal_100g', 'energy_100g', 'proteins_100g', 'fat_100g', 'carbohydrates_100g')
+_UPDATE_FIELDS = ['name', 'calories_per_100g', 'protein_per_100g', 'fat_per_100g', 'carbs_per_100g']
+# Cik baitu no faila sākuma iekļaut kontrolsummā (viss dumps var būt vairāki GB)
+_HEAD_BYTES = 1 << 20
+
+
+def file_fingerprint(path, fmt):
+    """Dump faila identitāte checkpointam: ceļš, formāts, izmērs un pirmā MiB sha256."""
+    with open(path, 'rb') as fh:
+        head = hashlib.sha256(fh.read(_HEAD_BYTES)).hexdigest()
+    return {'path': os.path.abspath(path), 'format': fmt, 'size': os.path.getsize(path), 'head_sha256': head}
+
+
+def _open(path):
+    # Binārais režīms: rindu garumi baitos = precīzs offsets checkpointam
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_csv_records(rows):
+    """Ģenerē (offset, OFF-veida vārdnīca) no CSV/TSV rindām (`ingest.iter_csv_rows`)."""
+    for offset, row in rows:
+        record = {k: row.get(k) for k in ('code', 'product_name', 'generic_name', 'brands')}
+        record['nutriments'] = {k: row.get(k) for k in _CSV_NUTRIMENTS if row.get(k)}
+        yield offset, record
+
+
+def iter_products(records):
+    """Ģenerē (offset, nesaglabāts `Product`) derīgiem ierakstiem ar svītrkodu un nosaukumu."""
+    for offset, record in records:
+        if record is None:
+            yield offset, None  # bojāta rinda
+            continue
+        barcode = str(record.get('code') or record.get('_id') or '').strip()[:64]
+        item = off.normalize_product(record)
+        if not barcode or not item['name']:
+            yield offset, None  # izlaists, bet offsets tāpat virzās uz priekšu
+            continue
+        yield offset, Product(
+            barcode=barcode,
+            name=item['name'][:200],
+            calories_per_100g=item['kcal'],
+            protein_per_100g=item['protein'],
+            fat_per_100g=item['fat'],
+            carbs_per_100g=item['carbs'],
+        )
+
+
+def iter_batches(products, batch_size):
+    """Ģenerē (offset, [Product, ...]) partijas; dublikāti partijā tiek apvienoti pēc svītrkoda."""
+    batch = {}
+    offset = 0
+    for offset, product in products:
+        if product is not None:
+            batch[product.barcode] = product
+        if len(batch) >= batch_size:
+            yield offset, list(batch.values())
+            batch = {}
+    yield offset, list(batch.values())
+
+
+def upsert(products):
+    """Ievieto vai atjaunina produktus vienā `INSERT ... ON CONFLICT(barcode) DO UPDATE`."""
+    if not products:
+        return 0
+    Product.objects.bulk_create(
+        products,
+        update_conflicts=True,
+        unique_fields=['barcode'],
+        update_fields=_UPDATE_FIELDS,
+    )
+    return len(products)
+
+
+class Command(BaseCommand):
+    """Importē OpenFoodFacts dump failu `Product` tabulā (upsert pēc svītrkoda)."""
+    help = 'Stream an OpenFoodFacts JSONL/CSV dump (optionally gzipped) into Product, resumably.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Local OFF dump: .jsonl, .csv/.tsv, optionally .gz')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Input format (guessed from the file name by default).')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint).')
+        parser.add_argument('--resume', action='store_true', help='Continue from the offset stored in the checkpoint.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError('File not found: %s' % path)
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive.')
+        fmt = options['format'] or self._guess_format(path)
+        checkpoint_path = options['checkpoint'] or path + '.checkpoint'
+        fingerprint = file_fingerprint(path, fmt)
+
+        start = 0
+        imported = 0
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as fh:
+                state = json.load(fh)
+            changed = [key for key, value in fingerprint.items() if state.get(key) != value]
+            if changed:
+                # offsets attiecas uz citu failu — turpinot, rindas tiktu izlaistas vai sabojātas
+                raise CommandError('Checkpoint %s belongs to a different file (%s differs); '
+                                   'run without --resume or use another --checkpoint.' % (checkpoint_path, ', '.join(changed)))
+            start = int(state.get('offset', 0))
+            imported = int(state.get('imported', 0))
+            self.stdout.write('Resuming at byte %d (%d products already imported).' % (start, imported))
+
+        with _open(path) as fh:
+            if fmt == 'csv':
+                records = iter_csv_records(ingest.iter_csv_rows(fh, start))
+            else:
+                records = ingest.iter_jsonl_records(ingest.iter_lines(fh, start))
+
+            for offset, batch in iter_batches(iter_products(records), options['batch_size']):
+                with transaction.atomic():
+                    imported += upsert(batch)
+                self._save_checkpoint(checkpoint_path, fingerprint, offset or start, imported)
+                if options['verbosity'] > 1:
+                    self.stdout.write('  byte %d: %d products' % (offset, imported))
+
+        self.stdout.write(self.style.SUCCESS('Imported %d product(s).' % imported))
+
+    def _guess_format(self, path):
+        name = path[:-3] if path.endswith('.gz') else path
+        if name.endswith(('.csv', '.tsv')):
+            return 'csv'
+        return 'jsonl'
+
+    def _save_checkpoint(self, checkpoint_path, fingerprint, offset, imported):
+        # Raksta pagaidu failā un pārsauc, lai avārija nepamestu pusierakstītu checkpointu
+        tmp = checkpoint_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(dict(fingerprint, offset=offset, imported=imported), fh)
+        os.replace(tmp, checkpoint_path)
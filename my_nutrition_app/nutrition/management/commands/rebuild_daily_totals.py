@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrition import rollup
+
+
+class Command(BaseCommand):
+    """Pārbūvē `DailyTotals` rollup tabulu no `FoodEntry`/`Entry` ierakstiem."""
+    help = 'Rebuild the per-user DailyTotals rollup from raw FoodEntry and Entry rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help='Rebuild only for this username (can be repeated).')
+
+    def handle(self, *args, **options):
+        users = None
+        if options['usernames']:
+            users = list(get_user_model().objects.filter(username__in=options['usernames']))
+            missing = set(options['usernames']) - {u.username for u in users}
+            if missing:
+                raise CommandError('Unknown user(s): %s' % ', '.join(sorted(missing)))
+        count = rollup.rebuild(users)
+        self.stdout.write(self.style.SUCCESS('Rebuilt %d daily total row(s).' % count))
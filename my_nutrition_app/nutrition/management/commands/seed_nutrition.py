@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrition import seed
+
+
+class Command(BaseCommand):
+    """Ģenerē sintētiskus lietotājus, produktus un vairāku gadu ierakstu vēsturi."""
+    help = 'Generate synthetic users, products and multi-year FoodEntry/Entry histories with bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--days', type=int, default=365, help='Days of history per user.')
+        parser.add_argument('--entries-per-day', type=float, default=4)
+        parser.add_argument('--public-days', type=int, default=30, help='Days of anonymous (public) FoodEntry history.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed = same data).')
+        parser.add_argument('--prefix', default='seed', help='Prefix for generated usernames and product barcodes.')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data with this prefix first.')
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['products'], options['days']) < 0 or options['products'] == 0:
+            raise CommandError('--users/--days must be >= 0 and --products > 0.')
+        if options['clear']:
+            removed = seed.clear(options['prefix'])
+            self.stdout.write('Removed %(users)d user(s) and %(products)d product(s).' % removed)
+        progress = self.stdout.write if options['verbosity'] > 1 else None
+        counts = seed.seed(
+            users=options['users'], products=options['products'], days=options['days'],
+            entries_per_day=options['entries_per_day'], public_days=options['public_days'],
+            rng_seed=options['seed'], prefix=options['prefix'], progress=progress,
+        )
+        self.stdout.write(json.dumps(counts))
@@ -0,0 +1,176 @@
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .instrumentation import REGISTRY
+
+
+"""
+Metriku eksports Prometheus teksta formātā (`/metrics`).
+
+Vienā procesā (runserver, viens worker) eksportē `instrumentation.REGISTRY`
+tieši. Vairāku procesu režīmā (gunicorn ar vairākiem worker) katram procesam
+ir savi skaitītāji, tāpēc, ja iestatīts `METRICS_MULTIPROC_DIR` (vai vides
+mainīgais `PROMETHEUS_MULTIPROC_DIR`), katrs process ik pa
+`METRICS_FLUSH_INTERVAL` sekundēm atomiski ieraksta savu stāvokli failā
+`<dir>/metrics_<pid>.json`, un `/metrics` saskaita visu failu vērtības.
+Beigušos worker faili paliek, tāpēc skaitītāji nesamazinās; direktoriju
+jāiztīra, startējot pakalpojumu (kā `prometheus_client` multiprocess režīmā).
+"""
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def multiproc_dir():
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', None) or os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+
+def snapshot():
+    """Šī procesa metriku stāvoklis: {nosaukums: metric.dump()}."""
+    return {name: metric.dump() for name, metric in list(REGISTRY.items())}
+
+
+def flush_due():
+    """Vai `flush()` tagad kaut ko rakstītu (lēta pārbaude, bez I/O)."""
+    if not multiproc_dir():
+        return False
+    return time.monotonic() - _last_flush >= getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+
+def flush(force=False):
+    """Ieraksta šī procesa stāvokli kopīgajā direktorijā (ne biežāk kā reizi intervālā)."""
+    global _last_flush
+    directory = multiproc_dir()
+    if not directory:
+        return
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    now = time.monotonic()
+    if not force and now - _last_flush < interval:
+        return
+    with _flush_lock:
+        _last_flush = now
+        path = os.path.join(directory, 'metrics_%d.json' % os.getpid())
+        try:
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.metrics_', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(snapshot(), fh)
+            os.replace(tmp, path)
+        except OSError as ex:
+            logger.warning("Could not write metrics to %s: %s", directory, ex)
+
+
+def _merge(target, data):
+    for name, metric in data.items():
+        current = target.get(name)
+        if current is None:
+            current = target[name] = dict(metric, samples={})
+        elif current['type'] != metric['type'] or current.get('buckets') != metric.get('buckets'):
+            # piem. izvietošanas laikā veca un jauna koda worker ar atšķirīgām robežām
+            logger.warning("Metric %s has conflicting definitions between processes", name)
+            continue
+        samples = current['samples']
+        for labels, value in metric['samples']:
+            key = tuple(sorted(labels.items()))
+            if metric['type'] == 'counter':
+                samples[key] = samples.get(key, 0) + value
+            else:
+                state = samples.get(key)
+                if state is None:
+                    samples[key] = {'counts': list(value['counts']), 'sum': value['sum'], 'count': value['count']}
+                else:
+                    state['counts'] = [a + b for a, b in zip(state['counts'], value['counts'])]
+                    state['sum'] += value['sum']
+                    state['count'] += value['count']
+
+
+def collect():
+    """
+    Atgriež apvienotās metrikas: {nosaukums: {'type', 'help', ['buckets'], 'samples': {labels_tuple: vērtība}}}.
+
+    Vairāku procesu režīmā vispirms ieraksta šī procesa stāvokli un nolasa visus failus.
+    """
+    merged = {}
+    directory = multiproc_dir()
+    if not directory:
+        _merge(merged, snapshot())
+        return merged
+    flush(force=True)
+    for path in sorted(glob.glob(os.path.join(directory, 'metrics_*.json'))):
+        try:
+            with open(path, encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as ex:
+            logger.warning("Skipping unreadable metrics file %s: %s", path, ex)
+            continue
+        _merge(merged, data)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, _escape(v)) for k, v in pairs)
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def _cache_hit_ratio(merged):
+    # Atvasināts rādītājs: trāpījumu daļa no visiem OFF kešatmiņas pieprasījumiem (pa `kind`)
+    lookups = merged.get('off_cache_lookups_total')
+    if not lookups:
+        return None
+    totals, hits = {}, {}
+    for key, value in lookups['samples'].items():
+        labels = dict(key)
+        kind = labels.get('kind', '')
+        totals[kind] = totals.get(kind, 0) + value
+        if labels.get('result') in ('hit', 'stale'):
+            hits[kind] = hits.get(kind, 0) + value
+    samples = {(('kind', kind),): hits.get(kind, 0) / total for kind, total in totals.items() if total}
+    return {'type': 'gauge', 'help': 'Share of OFF cache lookups served from cache (hit or stale).', 'samples': samples}
+
+
+def render(merged):
+    """Prometheus teksta formāts (0.0.4) no `collect()` rezultāta."""
+    ratio = _cache_hit_ratio(merged)
+    if ratio is not None:
+        merged = dict(merged, off_cache_hit_ratio=ratio)
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        lines.append('# HELP %s %s' % (name, metric['help'].replace('\\', '\\\\').replace('\n', '\\n')))
+        lines.append('# TYPE %s %s' % (name, metric['type']))
+        for key in sorted(metric['samples']):
+            value = metric['samples'][key]
+            if metric['type'] != 'histogram':
+                lines.append('%s%s %s' % (name, _labels(key), _number(value)))
+                continue
+            running = 0
+            for bound, count in zip(list(metric['buckets']) + [float('inf')], value['counts']):
+                running += count
+                lines.append('%s_bucket%s %d' % (name, _labels(key + (('le', _number(float(bound))),)), running))
+            lines.append('%s_sum%s %s' % (name, _labels(key), _number(float(value['sum']))))
+            lines.append('%s_count%s %d' % (name, _labels(key), value['count']))
+    return '\n'.join(lines) + '\n'
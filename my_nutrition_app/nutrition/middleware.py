@@ -0,0 +1,181 @@
+import json
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from . import metrics, timing
+from .instrumentation import Counter, Histogram
+
+
+"""
+Pieprasījumu veiktspējas middleware.
+
+`MetricsMiddleware` katram pieprasījumam pieskaita skata latentumu (pa skatu un
+statusa kodu) un DB vaicājumu skaitu Prometheus metrikām (`/metrics`).
+
+Abi darbojas gan WSGI, gan ASGI režīmā (`sync_capable` / `async_capable`), lai
+ASGI ķēde netiktu pārslēgta uz sinhrono režīmu un asinhronie skati paliktu
+notikumu ciklā. Vaicājumi tiek skaitīti ar `timing.observe_queries`, kas redz
+arī `sync_to_async` pavedienos izpildītos vaicājumus.
+
+`ServerTimingMiddleware` izlasītiem pieprasījumiem (`SERVER_TIMING_SAMPLE_RATE`,
+0..1) mēra DB vaicājumu skaitu un laiku (`timing.observe_queries`), veidņu
+renderēšanas laiku, OpenFoodFacts izsaukumu laiku un kopējo laiku. Rezultāts tiek atdots
+`Server-Timing` galvenē (redzams pārlūka devtools → Network → Timing) un
+ierakstīts kā viena JSON rinda loggerī `nutrition.middleware`.
+
+Kopējais laiks beidzas, kad skats atgriež atbildi — straumētu atbilžu
+(piem. eksporta) pārsūtīšana tajā neietilpst.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Request latency by view and status code.')
+REQUEST_QUERIES = Histogram('http_request_db_queries', 'DB queries per request by view.',
+                            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+DB_QUERIES = Counter('db_queries_total', 'DB queries executed while serving requests, by view.')
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+class _QueryCounter:
+    # `timing.observe_queries` novērotājs, kas tikai skaita vaicājumus (arī no vairākiem pavedieniem)
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, seconds):
+        with self._lock:
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Skata latentuma un DB vaicājumu metrikas katram pieprasījumam (bez izlases)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        with timing.observe_queries(queries):
+            response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started, queries.count)
+        metrics.flush()
+        return response
+
+    async def __acall__(self, request):
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        with timing.observe_queries(queries):
+            response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started, queries.count)
+        if metrics.flush_due():
+            # faila rakstīšana (tempfile + os.replace) nedrīkst bloķēt notikumu ciklu
+            await sync_to_async(metrics.flush, thread_sensitive=False)()
+        return response
+
+    def observe(self, request, response, elapsed, queries):
+        # neatrisinātiem URL (404) viena etiķete, lai skeneri neradītu neierobežotu sēriju skaitu
+        view = _view_name(request) or '<unresolved>'
+        REQUEST_LATENCY.observe(elapsed, view=view, status=str(response.status_code))
+        REQUEST_QUERIES.observe(queries, view=view)
+        DB_QUERIES.inc(queries, view=view)
+
+
+class ServerTimingMiddleware:
+    """
+    Mēra pieprasījuma laika sadalījumu un atdod to `Server-Timing` galvenē un logā.
+
+    Darbojas gan WSGI, gan ASGI režīmā: ASGI ķēdē tas pats `await`o nākamo
+    slāni, tāpēc asinhronie skati netiek pārcelti uz atsevišķu pavedienu.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        current, token = timing.start()
+        try:
+            with timing.observe_queries(current.query):
+                response = self.get_response(request)
+        finally:
+            timing.stop(token)
+        return self.finish(request, response, current)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        current, token = timing.start()
+        try:
+            with timing.observe_queries(current.query):
+                response = await self.get_response(request)
+        finally:
+            timing.stop(token)
+        return self.finish(request, response, current)
+
+    def sampled(self):
+        rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0)
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def finish(self, request, response, current):
+        total = current.elapsed()
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = self.header(current, total)
+        logger.info(json.dumps(self.record(request, response, current, total)))
+        return response
+
+    def header(self, current, total):
+        d, n = current.durations, current.counts
+        return ', '.join([
+            'db;dur=%s;desc="%d queries"' % (_ms(d.get('db', 0.0)), n.get('db', 0)),
+            'tpl;dur=%s' % _ms(d.get('tpl', 0.0)),
+            'off;dur=%s;desc="%d calls"' % (_ms(d.get('off', 0.0)), n.get('off', 0)),
+            'total;dur=%s' % _ms(total),
+        ])
+
+    def record(self, request, response, current, total):
+        d, n = current.durations, current.counts
+        return {
+            'event': 'request_timing',
+            'method': request.method,
+            'path': request.path,
+            'view': _view_name(request),
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'db_ms': _ms(d.get('db', 0.0)),
+            'db_queries': n.get('db', 0),
+            'template_ms': _ms(d.get('tpl', 0.0)),
+            'off_ms': _ms(d.get('off', 0.0)),
+            'off_calls': n.get('off', 0),
+        }
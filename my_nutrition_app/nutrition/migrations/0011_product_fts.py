@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-17 13:00
+
+from django.db import migrations
+
+
+"""
+SQLite FTS5 indekss produktu nosaukumiem (`nutrition_product_fts`).
+
+External-content tabula glabā tikai indeksu; sinhronizāciju ar
+`nutrition_product` nodrošina trigeri, tāpēc indekss paliek aktuāls arī pēc
+`bulk_create` (kataloga imports), kur Django signāli netiek izsaukti.
+`remove_diacritics 2` salīdzina "kefirs" ar "Kefīrs"; krievu "ё" tokenizētājs
+nesaloka, tāpēc indeksā (un vaicājumā, sk. `nutrition.search`) tas tiek aizstāts ar "е".
+"""
+
+# Indeksētā nosaukuma forma — tai jābūt vienādai ievietojot un dzēšot
+FOLDED = "replace(replace({0}.name, 'ё', 'е'), 'Ё', 'Е')"
+
+FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS nutrition_product_fts USING fts5(
+        name,
+        content='nutrition_product',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS nutrition_product_fts_ai AFTER INSERT ON nutrition_product BEGIN
+        INSERT INTO nutrition_product_fts(rowid, name) VALUES (new.id, {FOLDED.format('new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS nutrition_product_fts_ad AFTER DELETE ON nutrition_product BEGIN
+        INSERT INTO nutrition_product_fts(nutrition_product_fts, rowid, name) VALUES ('delete', old.id, {FOLDED.format('old')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS nutrition_product_fts_au AFTER UPDATE OF name ON nutrition_product BEGIN
+        INSERT INTO nutrition_product_fts(nutrition_product_fts, rowid, name) VALUES ('delete', old.id, {FOLDED.format('old')});
+        INSERT INTO nutrition_product_fts(rowid, name) VALUES (new.id, {FOLDED.format('new')});
+    END
+    """,
+    # Esošo produktu sākotnējā indeksācija (nevis 'rebuild', kas ņemtu nesalocītu nosaukumu)
+    f"INSERT INTO nutrition_product_fts(rowid, name) SELECT id, {FOLDED.format('nutrition_product')} FROM nutrition_product",
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS nutrition_product_fts_au",
+    "DROP TRIGGER IF EXISTS nutrition_product_fts_ad",
+    "DROP TRIGGER IF EXISTS nutrition_product_fts_ai",
+    "DROP TABLE IF EXISTS nutrition_product_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 ir SQLite specifisks; citās DB `nutrition.search` izmanto icontains
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0010_product_barcode'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0012_historyimport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodentry',
+            index=models.Index(fields=['user', 'created_at'], name='nutrition_fe_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', 'created_at'], name='nutrition_entry_user_created'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0013_user_created_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='foodentry',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0014_alter_foodentry_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historyimport',
+            name='checksum',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='historyimport',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -21,6 +21,8 @@ Modeļu definīcijas lietotnei `nutrition`.
 class Product(models.Model):
     """Produkts ar uzturvielu bāzēm uz 100 g."""
     name = models.CharField(max_length=200)
+    # OpenFoodFacts svītrkods — unikāls, ja produkts importēts no OFF kataloga
+    barcode = models.CharField(max_length=64, unique=True, null=True, blank=True)
     calories_per_100g = models.FloatField(default=0)  # kcal uz 100 g
     protein_per_100g = models.FloatField(default=0)   # proteīns (g) uz 100 g
     fat_per_100g = models.FloatField(default=0)       # tauki (g) uz 100 g
@@ -36,8 +38,14 @@ class FoodEntry(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE)
     amount = models.FloatField(help_text="grams")
     initial_amount = models.FloatField(default=0, help_text="grams - initial amount when created")
-    # Laiks, kad ieraksts izveidots
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Laiks, kad ieraksts izveidots (`default`, lai vēsturiskus datus varētu ievietot ar `bulk_create`)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # dienas/perioda vaicājumi: user = ? (vai user IS NULL) AND created_at BETWEEN ...
+            models.Index(fields=['user', 'created_at'], name='nutrition_fe_user_created'),
+        ]
 
     # Aprēķina enerģiju un makro atbilstoši `amount` un produkta per-100g bāzēm
     def calories(self):
@@ -119,10 +127,68 @@ class Entry(models.Model):
     protein_per100 = models.FloatField(default=0.0)
     fat_per100 = models.FloatField(default=0.0)
     carbs_per100 = models.FloatField(default=0.0)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # `default`, nevis `auto_now_add`: vēstures imports saglabā oriģinālo laiku
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='nutrition_entry_user_created'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.amount}g) — {self.kcal} kcal"
+
+
+class DailyTotals(models.Model):
+    """Lietotāja dienas kopsummas (rollup) — viena rinda uz (lietotājs, vietējā diena).
+
+    Tiek uzturēta inkrementāli rakstīšanas skatos (sk. `nutrition.rollup`), lai
+    sēriju endpointi lasītu ne vairāk kā vienu mazu rindu dienā, nevis visus
+    `FoodEntry`/`Entry` ierakstus. Pilnu pārbūvi veic `rebuild_daily_totals` komanda.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_totals')
+    day = models.DateField()  # vietējā (TIME_ZONE) diena
+    kcal = models.FloatField(default=0.0)
+    protein = models.FloatField(default=0.0)
+    fat = models.FloatField(default=0.0)
+    carbs = models.FloatField(default=0.0)
+    entry_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='nutrition_dailytotals_user_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.day}: {self.kcal} kcal ({self.entry_count})"
+
+
+class HistoryImport(models.Model):
+    """Vēstures importa darbs (CSV/NDJSON → `Entry`) ar progresu un atsākšanas punktu.
+
+    `offset` (baiti nesaspiestajā plūsmā) un skaitītāji tiek atjaunināti tajā pašā
+    transakcijā, kurā tiek ievietota partija, tāpēc pēc avārijas imports turpinās
+    tieši aiz pēdējās saglabātās partijas, nedublējot ierakstus (sk. `nutrition.history`).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='history_imports')
+    source = models.CharField(max_length=255)  # faila nosaukums
+    format = models.CharField(max_length=10)   # 'csv' vai 'ndjson'
+    # Oriģinālā faila izmērs un sha256 (kā augšupielādēts/uz diska) — atsākt drīkst tikai ar to pašu failu
+    size = models.BigIntegerField(null=True, blank=True)
+    checksum = models.CharField(max_length=64, blank=True, default='')
+    offset = models.BigIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)      # apstrādātās datu rindas
+    imported = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # pirmās kļūdas: [{"row": n, "error": kods}]
+    finished = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.user} {self.source}: {self.imported} imported, {self.failed} failed"
@@ -0,0 +1,365 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import timing
+from .instrumentation import Counter, Histogram
+
+try:
+    import httpx  # neobligāts: asinhronais klients (`AsyncOffClient`)
+except ImportError:  # pragma: no cover - atkarīgs no vides
+    httpx = None
+
+
+"""
+OpenFoodFacts (OFF) integrācija.
+
+`normalize_product` pārvērš OFF produkta JSON (API atbildē vai dump failā)
+vienkāršotā vārdnīcā, ko izmanto gan API skati, gan kataloga importētājs,
+lai uzturvielas tiktu nolasītas vienādi.
+
+`OffClient` ir koplietojams HTTP klients ar keep-alive savienojumu pūlu,
+`fields=` projekciju, ierobežotiem atkārtojumiem ar jitter un "circuit breaker",
+kas OFF nepieejamības laikā uzreiz atgriež kļūdu, nevis gaida taimautu.
+`AsyncOffClient` ir tas pats asinhroniem (ASGI) skatiem, balstīts uz `httpx`.
+"""
+
+# Lauki, kurus mēs patiešām izmantojam — OFF atgriež tikai tos (mazāka atbilde)
+FIELDS = ('code', 'product_name', 'generic_name', 'brands', 'nutriments')
+
+OFF_LATENCY = Histogram('off_request_seconds', 'OpenFoodFacts HTTP request latency.')
+OFF_ERRORS = Counter('off_request_errors_total', 'OpenFoodFacts requests that failed after retries.')
+
+
+def _to_float(value):
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def product_name(p):
+    """Produkta nosaukums: product_name → generic_name → brands (vai '')."""
+    return p.get('product_name') or p.get('generic_name') or p.get('brands') or ''
+
+
+def normalize_product(p):
+    """
+    Atgriež {'name', 'kcal', 'protein', 'fat', 'carbs'} no OFF produkta vārdnīcas.
+
+    Vērtības ir uz 100 g; trūkstošas vai nederīgas vērtības kļūst par 0.0.
+    """
+    nutr = p.get('nutriments') or {}
+    kcal = nutr.get('energy-kcal_100g') or nutr.get('energy_100g') or 0
+    protein = nutr.get('proteins_100g') or nutr.get('proteins') or 0
+    fat = nutr.get('fat_100g') or nutr.get('fat') or 0
+    carbs = nutr.get('carbohydrates_100g') or nutr.get('carbohydrates') or 0
+    return {
+        'name': product_name(p),
+        'kcal': _to_float(kcal),
+        'protein': _to_float(protein),
+        'fat': _to_float(fat),
+        'carbs': _to_float(carbs),
+    }
+
+
+def product_to_result(product):
+    """Lokāla `Product` objekta attēlojums tādā pašā formā kā OFF rezultāti."""
+    result = {
+        'name': product.name,
+        'kcal': float(product.calories_per_100g or 0.0),
+        'protein': float(product.protein_per_100g or 0.0),
+        'fat': float(product.fat_per_100g or 0.0),
+        'carbs': float(product.carbs_per_100g or 0.0),
+    }
+    if product.barcode:
+        result['barcode'] = product.barcode
+    return result
+
+
+class OffUnavailable(requests.RequestException):
+    """OFF tiek uzskatīts par nepieejamu (circuit breaker ir atvērts)."""
+
+
+class CircuitBreaker:
+    """
+    Vienkāršs circuit breaker: pēc `threshold` secīgām kļūdām "atveras" uz
+    `cooldown` sekundēm; pēc tam vienu izmēģinājuma pieprasījumu (half-open)
+    palaiž cauri — veiksme to aizver, kļūda atkal atver.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def acquire(self):
+        """'pass' (aizvērts), 'trial' (half-open izmēģinājums, jānoslēdz) vai None (atvērts)."""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return 'pass'
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return 'trial'
+            return None
+
+    def allow(self):
+        return self.acquire() is not None
+
+    def release(self):
+        # Izmēģinājums beidzās bez secinājuma (piem. negaidīta kļūda) — nākamais pieprasījums var mēģināt vēlreiz
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.threshold or self._opened_at is not None:
+                self._opened_at = time.monotonic()
+
+
+class _BaseOffClient:
+    """Kopīgā daļa: konfigurācija, pieprasījumu parametri, atbilžu parsēšana un atkārtojumu politika."""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, base_url=None, timeout=None, retries=None, backoff=0.2,
+                 pool_size=None, breaker=None, user_agent=None):
+        self.base_url = (base_url or getattr(settings, 'OFF_BASE_URL', 'https://world.openfoodfacts.org')).rstrip('/')
+        self.timeout = timeout if timeout is not None else getattr(settings, 'OFF_TIMEOUT', 6)
+        self.retries = retries if retries is not None else getattr(settings, 'OFF_RETRIES', 2)
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size or getattr(settings, 'OFF_POOL_SIZE', 10)
+        self.user_agent = user_agent or 'NutritionHelper/1.0 (django)'
+
+    def _search_request(self, q, page_size):
+        params = {
+            'search_terms': q,
+            'search_simple': 1,
+            'action': 'process',
+            'json': 1,
+            'page_size': page_size,
+            'fields': ','.join(FIELDS),
+        }
+        return 'search', '/cgi/search.pl', params
+
+    def _product_request(self, barcode):
+        return 'product', f'/api/v0/product/{barcode}.json', {'fields': ','.join(FIELDS)}
+
+    def _parse_search(self, data, page_size):
+        results = []
+        for p in (data.get('products') or [])[:page_size]:
+            item = normalize_product(p)
+            if item['name']:
+                results.append(item)
+        return results
+
+    def _parse_product(self, data, barcode):
+        if data.get('status') != 1:
+            return None
+        result = normalize_product(data.get('product') or {})
+        result['barcode'] = barcode
+        return result
+
+    def _check_breaker(self, endpoint):
+        """Atgriež True, ja šis pieprasījums ir half-open izmēģinājums (tas jānoslēdz `finally`)."""
+        permit = self.breaker.acquire()
+        if permit is None:
+            OFF_ERRORS.inc(endpoint=endpoint, reason='circuit_open')
+            raise OffUnavailable('OpenFoodFacts temporarily unavailable')
+        return permit == 'trial'
+
+    def _is_client_error(self, status):
+        # 4xx (izņemot 429) nozīmē, ka OFF ir sasniedzams — breaker to uzskata par veiksmi
+        return status is not None and 400 <= status < 500 and status not in self.RETRY_STATUSES
+
+    def _backoff_delay(self, attempt):
+        # eksponenciāla pauze ar "full jitter", lai pieprasījumi nesinhronizētos
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+
+class OffClient(_BaseOffClient):
+    """
+    OpenFoodFacts HTTP klients.
+
+    `search(q)` atgriež normalizētu produktu sarakstu, `product(barcode)` —
+    normalizētu produktu vai None (OFF atbild "not found"). Tīkla kļūdas tiek
+    izmestas kā `requests.RequestException` (t.sk. `OffUnavailable`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = self.user_agent
+
+    def search(self, q, page_size=12):
+        return self._parse_search(self._get_json(*self._search_request(q, page_size)), page_size)
+
+    def product(self, barcode):
+        return self._parse_product(self._get_json(*self._product_request(barcode)), barcode)
+
+    def _get_json(self, endpoint, path, params):
+        trial = self._check_breaker(endpoint)
+        try:
+            return self._fetch(endpoint, self.base_url + path, params)
+        finally:
+            if trial:
+                # ja izmēģinājums netika noslēgts ar record_success/failure (piem. JSON kļūda)
+                self.breaker.release()
+
+    def _fetch(self, endpoint, url, params):
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                with timing.measure('off'):
+                    r = self.session.get(url, params=params, timeout=self.timeout)
+                    r.raise_for_status()
+                    data = r.json()
+            except requests.RequestException as ex:
+                OFF_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, outcome='error')
+                retryable = self._is_retryable(ex)
+                if retryable and attempt < self.retries:
+                    attempt += 1
+                    time.sleep(self._backoff_delay(attempt))
+                    continue
+                if retryable:
+                    self.breaker.record_failure()
+                elif self._is_client_error(getattr(getattr(ex, 'response', None), 'status_code', None)):
+                    self.breaker.record_success()
+                OFF_ERRORS.inc(endpoint=endpoint, reason=type(ex).__name__)
+                raise
+            OFF_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, outcome='ok')
+            self.breaker.record_success()
+            return data
+
+    def _is_retryable(self, ex):
+        # Atkārto tikai pārejošas kļūdas: savienojums/taimauts vai 429/5xx
+        if isinstance(ex, (requests.ConnectionError, requests.Timeout)):
+            return True
+        response = getattr(ex, 'response', None)
+        return isinstance(ex, requests.HTTPError) and response is not None and response.status_code in self.RETRY_STATUSES
+
+
+class AsyncOffClient(_BaseOffClient):
+    """
+    Asinhronais OpenFoodFacts klients (`httpx.AsyncClient`) ASGI skatiem.
+
+    Tāda pati semantika kā `OffClient`; galīgās kļūdas tiek izmestas kā
+    `requests.RequestException`, lai skati tās apstrādātu vienādi.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if httpx is None:
+            raise ImportError('AsyncOffClient requires the "httpx" package')
+        super().__init__(*args, **kwargs)
+        limits = httpx.Limits(max_connections=self.pool_size * 10, max_keepalive_connections=self.pool_size)
+        self.http = httpx.AsyncClient(timeout=self.timeout, limits=limits, headers={'User-Agent': self.user_agent})
+
+    async def search(self, q, page_size=12):
+        return self._parse_search(await self._get_json(*self._search_request(q, page_size)), page_size)
+
+    async def product(self, barcode):
+        return self._parse_product(await self._get_json(*self._product_request(barcode)), barcode)
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def _get_json(self, endpoint, path, params):
+        trial = self._check_breaker(endpoint)
+        try:
+            return await self._fetch(endpoint, self.base_url + path, params)
+        finally:
+            if trial:
+                self.breaker.release()
+
+    async def _fetch(self, endpoint, url, params):
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                with timing.measure('off'):
+                    r = await self.http.get(url, params=params)
+                    r.raise_for_status()
+                    data = r.json()
+            except (httpx.HTTPError, ValueError) as ex:
+                OFF_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, outcome='error')
+                retryable = self._is_retryable(ex)
+                if retryable and attempt < self.retries:
+                    attempt += 1
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    continue
+                if retryable:
+                    self.breaker.record_failure()
+                elif isinstance(ex, httpx.HTTPStatusError) and self._is_client_error(ex.response.status_code):
+                    self.breaker.record_success()
+                OFF_ERRORS.inc(endpoint=endpoint, reason=type(ex).__name__)
+                raise requests.RequestException(str(ex)) from ex
+            OFF_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, outcome='ok')
+            self.breaker.record_success()
+            return data
+
+    def _is_retryable(self, ex):
+        if isinstance(ex, httpx.TransportError):
+            return True
+        return isinstance(ex, httpx.HTTPStatusError) and ex.response.status_code in self.RETRY_STATUSES
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Procesa kopīgais `OffClient` (viens savienojumu pūls visiem pieprasījumiem)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OffClient()
+    return _client
+
+
+# httpx.AsyncClient ir piesaistīts notikumu cilpai, tāpēc viens klients uz cilpu
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Kopīgais `AsyncOffClient` pašreizējai notikumu cilpai (izmanto sinhronā klienta breaker)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncOffClient(breaker=get_client().breaker)
+    return client
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import singleflight
+from .instrumentation import Counter
+
+
+"""
+Kešatmiņas slānis OpenFoodFacts meklēšanai un svītrkodu pieprasījumiem.
+
+Balstīts uz Django cache framework (`CACHES['default']`):
+- atslēgas tiek normalizētas (reģistrs/atstarpes), lai "Banana " un "banana" sakristu;
+- pozitīvas atbildes glabājas `OFF_CACHE_TTL` sekundes, negatīvas (404) — īsāk;
+- pēc TTL beigām ieraksts vēl `OFF_CACHE_STALE_TTL` sekundes tiek atdots kā "stale",
+  kamēr fonā tiek ielādēta svaiga versija (stale-while-revalidate);
+- kļūdas (502, tīkla izņēmumi) netiek kešotas.
+
+`aget_or_fetch` ir tas pats asinhroniem skatiem (Django async cache API).
+
+Netrāpījumi iet caur single-flight (`nutrition.singleflight`): vienlaicīgi
+identiski pieprasījumi procesā — un, pateicoties slēdzenei kešatmiņā, arī
+starp worker procesiem — izraisa tikai vienu OFF izsaukumu.
+"""
+
+logger = logging.getLogger(__name__)
+
+_flight = singleflight.SingleFlight('off')
+_aflight = singleflight.AsyncSingleFlight('off')
+
+
+# Iestatījumi tiek nolasīti izsaukuma brīdī, lai `override_settings` un izmaiņas pēc importa strādātu
+def positive_ttl():
+    return getattr(settings, 'OFF_CACHE_TTL', 6 * 60 * 60)
+
+
+def negative_ttl():
+    return getattr(settings, 'OFF_CACHE_NEGATIVE_TTL', 10 * 60)
+
+
+def stale_ttl():
+    return getattr(settings, 'OFF_CACHE_STALE_TTL', 24 * 60 * 60)
+
+
+def flight_wait():
+    """Cik ilgi cits worker gaida leader rezultātu, pirms vaicā OFF pats."""
+    return getattr(settings, 'OFF_SINGLEFLIGHT_WAIT', 10)
+
+
+def _ttl(status):
+    # Statusi, kurus drīkst kešot: 200 — pozitīvs, 404 — negatīvs ("Product not found")
+    if status == 200:
+        return positive_ttl()
+    if status == 404:
+        return negative_ttl()
+    return None
+
+LOOKUPS = Counter('off_cache_lookups_total', 'OpenFoodFacts cache lookups by kind and result (hit / stale / miss).')
+
+
+def _count(kind, result):
+    LOOKUPS.inc(kind=kind, result=result)
+
+
+def stats():
+    """Atgriež kešatmiņas trāpījumu/netrāpījumu skaitītājus šajā procesā."""
+    totals = {'hit': 0, 'miss': 0, 'stale': 0}
+    for labels, value in LOOKUPS.samples():
+        totals[labels['result']] += value
+    return totals
+
+
+def reset_stats():
+    LOOKUPS.reset()
+
+
+def normalize(value):
+    """Normalizē meklēšanas frāzi/svītrkodu: mazie burti, viena atstarpe starp vārdiem."""
+    return ' '.join(str(value).lower().split())
+
+
+def cache_key(kind, value):
+    digest = hashlib.sha1(normalize(value).encode('utf-8')).hexdigest()
+    return f'off:{kind}:{digest}'
+
+
+def _entry(payload, status):
+    # Atgriež (ieraksts, timeout) vai (None, None), ja statusu nekešo
+    ttl = _ttl(status)
+    if ttl is None:
+        return None, None
+    return {'payload': payload, 'status': status, 'fresh_until': time.time() + ttl}, ttl + stale_ttl()
+
+
+def _store(key, payload, status):
+    entry, timeout = _entry(payload, status)
+    if entry is not None:
+        cache.set(key, entry, timeout=timeout)
+
+
+def _spawn(target):
+    # Atsevišķa funkcija, lai testi varētu izpildīt revalidāciju sinhroni
+    threading.Thread(target=target, daemon=True).start()
+
+
+def _revalidate(key, fetch):
+    # Tikai viens fona atjauninājums uz atslēgu (cache.add ir atomisks)
+    lock_key = key + ':refresh'
+    if not cache.add(lock_key, 1, timeout=60):
+        return
+
+    def run():
+        try:
+            payload, status = fetch()
+            _store(key, payload, status)
+        except Exception as ex:
+            logger.info("OFF background refresh failed for %s: %s", key, ex)
+        finally:
+            cache.delete(lock_key)
+
+    _spawn(run)
+
+
+def get_or_fetch(kind, value, fetch):
+    """
+    Atgriež (payload, status, cache_state) no kešatmiņas vai izsaucot `fetch()`.
+
+    `fetch` — funkcija bez argumentiem, kas atgriež (payload, http_status) vai
+    izmet izņēmumu. `cache_state` ir 'hit', 'stale' vai 'miss'.
+    """
+    key = cache_key(kind, value)
+    entry = cache.get(key)
+    if entry is not None:
+        if entry['fresh_until'] > time.time():
+            _count(kind, 'hit')
+            return entry['payload'], entry['status'], 'hit'
+        _count(kind, 'stale')
+        _revalidate(key, fetch)
+        return entry['payload'], entry['status'], 'stale'
+
+    _count(kind, 'miss')
+    return _flight.do(key, lambda: _fetch_once(key, fetch))
+
+
+def _fetch_once(key, fetch):
+    # Procesa leader: ja cits worker jau vaicā OFF, sagaida tā rezultātu kešatmiņā
+    wait = flight_wait()
+    if not singleflight.cache_lock(key, timeout=wait * 3):
+        entry = singleflight.poll(key, wait=wait)
+        if entry is not None:
+            singleflight.COALESCED.inc(group='off', role='remote_coalesced')
+            return entry['payload'], entry['status'], 'hit'
+        payload, status = fetch()
+        _store(key, payload, status)
+        return payload, status, 'miss'
+    try:
+        payload, status = fetch()
+        _store(key, payload, status)
+        return payload, status, 'miss'
+    finally:
+        singleflight.cache_unlock(key)
+
+
+# Fona uzdevumu atsauces, lai tos nesavāktu garbage collector pirms pabeigšanas
+_background_tasks = set()
+
+
+async def _arevalidate(key, afetch):
+    lock_key = key + ':refresh'
+    if not await cache.aadd(lock_key, 1, timeout=60):
+        return
+
+    async def run():
+        try:
+            payload, status = await afetch()
+            await _astore(key, payload, status)
+        except Exception as ex:
+            logger.info("OFF background refresh failed for %s: %s", key, ex)
+        finally:
+            await cache.adelete(lock_key)
+
+    task = asyncio.ensure_future(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def aget_or_fetch(kind, value, afetch):
+    """Asinhronā `get_or_fetch` versija; `afetch` — korutīnas funkcija bez argumentiem."""
+    key = cache_key(kind, value)
+    entry = await cache.aget(key)
+    if entry is not None:
+        if entry['fresh_until'] > time.time():
+            _count(kind, 'hit')
+            return entry['payload'], entry['status'], 'hit'
+        _count(kind, 'stale')
+        await _arevalidate(key, afetch)
+        return entry['payload'], entry['status'], 'stale'
+
+    _count(kind, 'miss')
+    return await _aflight.do(key, lambda: _afetch_once(key, afetch))
+
+
+async def _astore(key, payload, status):
+    entry, timeout = _entry(payload, status)
+    if entry is not None:
+        await cache.aset(key, entry, timeout=timeout)
+
+
+async def _afetch_once(key, afetch):
+    wait = flight_wait()
+    if not await singleflight.acache_lock(key, timeout=wait * 3):
+        entry = await singleflight.apoll(key, wait=wait)
+        if entry is not None:
+            singleflight.COALESCED.inc(group='off', role='remote_coalesced')
+            return entry['payload'], entry['status'], 'hit'
+        payload, status = await afetch()
+        await _astore(key, payload, status)
+        return payload, status, 'miss'
+    try:
+        payload, status = await afetch()
+        await _astore(key, payload, status)
+        return payload, status, 'miss'
+    finally:
+        await singleflight.acache_unlock(key)
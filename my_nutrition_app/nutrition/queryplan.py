@@ -0,0 +1,79 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+
+from .models import DailyTotals, Entry, FoodEntry
+
+
+"""
+`EXPLAIN QUERY PLAN` pārbaude karstajiem skatiem (`home`, `progress`, `api_daily_calories`).
+
+Skati tiek izsaukti gan pieslēgtam, gan anonīmam lietotājam, to SQL vaicājumi
+tiek notverti un katram tiek izpildīts `EXPLAIN QUERY PLAN`. Ja kāds vaicājums
+pilnībā skenē ierakstu tabulu (`SCAN nutrition_entry` bez indeksa meklēšanas),
+tas tiek atzīmēts kā regresija. Izmanto `check_query_plans` komanda un testi.
+Pieejams tikai SQLite (citām datubāzēm EXPLAIN formāts atšķiras).
+"""
+
+# Tabulas, kuras aug kopā ar lietotāju skaitu/vēsturi — tām pilns skenējums nav pieļaujams
+WATCHED_TABLES = (FoodEntry._meta.db_table, Entry._meta.db_table, DailyTotals._meta.db_table)
+
+_SCAN_RE = re.compile(r'\bSCAN (\w+)')
+
+
+def explain(sql):
+    """Atgriež `EXPLAIN QUERY PLAN` rindu aprakstus vaicājumam `sql` (ar jau ievietotiem parametriem)."""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Atgriež plāna rindas, kurās kāda no `WATCHED_TABLES` tiek skenēta pilnībā."""
+    found = []
+    for detail in plan:
+        match = _SCAN_RE.search(detail)
+        # "SCAN t USING INDEX i" arī ir pilns skenējums (tikai indeksa secībā)
+        if match and match.group(1) in WATCHED_TABLES:
+            found.append(detail)
+    return found
+
+
+def _views():
+    from . import views
+    return (
+        ('home', views.home, '/nutrition/', {}),
+        ('progress', views.progress, '/nutrition/progress/', {}),
+        ('api_daily_calories', views.api_daily_calories, '/nutrition/api/daily_calories/', {'days': 30}),
+    )
+
+
+def check(user):
+    """
+    Izsauc karstos skatus kā `user` un anonīmam lietotājam.
+
+    Atgriež [(skats, lietotājs, sql, plāns, pilnie_skenējumi), ...] katram
+    vaicājumam, kas skar kādu no `WATCHED_TABLES`.
+    """
+    # django.test tikai šeit: modulis tiek importēts arī ārpus testiem, bet pārbaude ir rīks
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    factory = RequestFactory()
+    report = []
+    for who in (user, AnonymousUser()):
+        label = 'user' if who.is_authenticated else 'anonymous'
+        for name, view, path, params in _views():
+            request = factory.get(path, params)
+            request.user = who
+            request.session = {}  # skati lasa sesijas profilu; saglabāšana nav vajadzīga
+            with CaptureQueriesContext(connection) as ctx:
+                view(request)
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT') or not any(t in sql for t in WATCHED_TABLES):
+                    continue
+                plan = explain(sql)
+                report.append((name, label, sql, plan, full_scans(plan)))
+    return report
@@ -0,0 +1,163 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import conditional, finalized, fragments
+from .aggregation import aggregate_by_day
+from .instrumentation import Counter
+from .models import DailyTotals, Entry, FoodEntry
+
+
+"""
+Dienas kopsummu (`DailyTotals`) uzturēšana.
+
+Rakstīšanas skati (`home`, `add_meal`, `api_add_entry`, `edit_entry`,
+`delete_entry`) izsauc šīs funkcijas tajā pašā transakcijā, kurā maina
+`FoodEntry`/`Entry`, tāpēc rollup vienmēr atbilst neapstrādātajiem ierakstiem.
+Publiskie (anonīmie) `FoodEntry` ieraksti bez lietotāja netiek uzkrāti.
+
+Jauni ieraksti tiek arī saskaitīti `nutrition_entries_created_total` metrikā
+(pēc transakcijas apstiprināšanas, lai atceltas transakcijas netiktu skaitītas).
+"""
+
+ENTRIES_CREATED = Counter('nutrition_entries_created_total', 'Food log entries created, by origin (food / entry).')
+
+
+def local_day(created_at):
+    # Vietējā diena, kurā ieraksts iekrīt — tāda pati kā sēriju skatu grupēšanā
+    return timezone.localtime(created_at).date()
+
+
+def food_entry_values(fe):
+    """Atgriež (kcal, protein, fat, carbs) `FoodEntry` ierakstam."""
+    return (fe.calories(), fe.protein(), fe.fat(), fe.carbs())
+
+
+def entry_values(ce):
+    """Atgriež (kcal, protein, fat, carbs) pielāgotam `Entry` ierakstam."""
+    return (
+        float(ce.kcal or 0.0),
+        float(ce.protein or 0.0),
+        float(ce.fat or 0.0),
+        float(ce.carbs or 0.0),
+    )
+
+
+def apply_delta(user_id, day, kcal=0.0, protein=0.0, fat=0.0, carbs=0.0, count=0):
+    """
+    Pieskaita izmaiņas (var būt negatīvas) lietotāja dienas rindai.
+
+    Izmanto `UPDATE ... SET kcal = kcal + x`, lai vienlaicīgi pieprasījumi
+    nepārrakstītu viens otra vērtības; ja rindas vēl nav, to izveido.
+    Tā kā šeit iet visi rakstīšanas ceļi, te arī novecina `home` fragmentus
+    un lietotāja watermark nosacījuma GET atbildēm (`nutrition.conditional`).
+    """
+    fragments.invalidate(user_id, day)
+    conditional.touch(user_id)
+    if day < timezone.localdate():
+        # vēla labošana jau slēgtā dienā — iesaldētās sērijas jāatsauc
+        finalized.invalidate(user_id)
+    if user_id is None:
+        return
+    qs = DailyTotals.objects.filter(user_id=user_id, day=day)
+    changes = {
+        'kcal': F('kcal') + kcal,
+        'protein': F('protein') + protein,
+        'fat': F('fat') + fat,
+        'carbs': F('carbs') + carbs,
+        'entry_count': F('entry_count') + count,
+    }
+    if qs.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            DailyTotals.objects.create(
+                user_id=user_id, day=day,
+                kcal=kcal, protein=protein, fat=fat, carbs=carbs, entry_count=count,
+            )
+    except IntegrityError:
+        # Cits pieprasījums rindu izveidoja starplaikā — pieskaita tai
+        qs.update(**changes)
+
+
+def _created(origin, count=1):
+    transaction.on_commit(lambda: ENTRIES_CREATED.inc(count, origin=origin))
+
+
+def record_food_entry(fe, sign=1):
+    """Pieskaita (sign=1) vai atņem (sign=-1) `FoodEntry` ieraksta vērtības."""
+    if sign > 0:
+        _created('food')
+    kcal, p, f, c = food_entry_values(fe)
+    apply_delta(fe.user_id, local_day(fe.created_at),
+                sign * kcal, sign * p, sign * f, sign * c, sign)
+
+
+def record_entry(ce, sign=1):
+    """Pieskaita (sign=1) vai atņem (sign=-1) `Entry` ieraksta vērtības."""
+    if sign > 0:
+        _created('entry')
+    kcal, p, f, c = entry_values(ce)
+    apply_delta(ce.user_id, local_day(ce.created_at),
+                sign * kcal, sign * p, sign * f, sign * c, sign)
+
+
+def apply_grouped(changes):
+    """
+    Pieskaita daudzas izmaiņas, sasummējot tās pa (lietotājs, diena).
+
+    `changes` — (user_id, created_at, (kcal, protein, fat, carbs), count) virkne;
+    katrai dienai tiek izpildīts viens `UPDATE`, nevis viens uz katru ierakstu.
+    """
+    grouped = {}
+    for user_id, created_at, values, count in changes:
+        acc = grouped.setdefault((user_id, local_day(created_at)), [0.0, 0.0, 0.0, 0.0, 0])
+        for i, v in enumerate(values):
+            acc[i] += v
+        acc[4] += count
+    for (user_id, day), (kcal, p, f, c, count) in grouped.items():
+        apply_delta(user_id, day, kcal, p, f, c, count)
+
+
+def record_entries(entries):
+    """Pieskaita vairākus jaunus `Entry` ierakstus (piem. pēc `bulk_create`)."""
+    entries = list(entries)
+    _created('entry', len(entries))
+    apply_grouped((ce.user_id, ce.created_at, entry_values(ce), 1) for ce in entries)
+
+
+def delta(old_values, new_values):
+    """Starpība starp jaunajām un vecajām (kcal, protein, fat, carbs) vērtībām."""
+    return tuple(new - old for old, new in zip(old_values, new_values))
+
+
+def record_change(user_id, created_at, old_values, new_values):
+    """Pieskaita starpību starp vecajām un jaunajām vērtībām (ieraksta rediģēšana)."""
+    apply_delta(user_id, local_day(created_at), *delta(old_values, new_values))
+
+
+def rebuild(users=None):
+    """
+    Pārbūvē `DailyTotals` no neapstrādātajiem ierakstiem.
+
+    `users` — lietotāju queryset/saraksts; ja None, pārbūvē visiem. Summas
+    aprēķina datubāzē (`aggregation.aggregate_by_day`). Atgriež izveidoto rindu skaitu.
+    """
+    food_qs = FoodEntry.objects.filter(user__isnull=False)
+    entry_qs = Entry.objects.all()
+    totals_qs = DailyTotals.objects.all()
+    if users is not None:
+        food_qs = food_qs.filter(user__in=users)
+        entry_qs = entry_qs.filter(user__in=users)
+        totals_qs = totals_qs.filter(user__in=users)
+
+    rows = [
+        DailyTotals(user_id=user_id, day=day, kcal=v['kcal'], protein=v['protein'],
+                    fat=v['fat'], carbs=v['carbs'], entry_count=v['count'])
+        for (user_id, day), v in aggregate_by_day(food_qs, entry_qs).items()
+    ]
+    with transaction.atomic():
+        totals_qs.delete()
+        DailyTotals.objects.bulk_create(rows, batch_size=500)
+    finalized.invalidate_all()
+    return len(rows)
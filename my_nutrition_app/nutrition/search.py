@@ -0,0 +1,53 @@
+import re
+
+from django.db import connection
+
+from .models import Product
+
+
+"""
+Lokālā produktu meklēšana (typeahead) pēc nosaukuma.
+
+SQLite gadījumā izmanto FTS5 indeksu `nutrition_product_fts` (sk. migrāciju
+0011): katrs vārds tiek meklēts kā prefikss, rezultāti sakārtoti pēc BM25,
+un tokenizētājs ignorē diakritiskās zīmes (lv/ru). Citām datubāzēm — vienkāršs
+`name__icontains` rezerves variants.
+"""
+
+FTS_TABLE = 'nutrition_product_fts'
+
+# Vārdu atdalīšana vaicājumā; FTS5 operatori/pēdiņas no lietotāja ievades netiek nodoti
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(q):
+    """
+    Pārvērš lietotāja ievadi drošā FTS5 MATCH izteiksmē.
+
+    "pien rīg" → '"pien"* "rīg"*' (visi vārdi kā prefiksi, AND semantika).
+    Atgriež '' ja ievadē nav neviena vārda.
+    """
+    # "ё" indeksā glabājas kā "е" (sk. migrāciju 0011)
+    tokens = _TOKEN_RE.findall((q or '').replace('ё', 'е').replace('Ё', 'Е'))
+    return ' '.join(f'"{t}"*' for t in tokens[:8])
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def search_products(q, limit=12):
+    """Atgriež līdz `limit` `Product` objektiem, kas atbilst `q` (labākie vispirms)."""
+    expr = match_expression(q)
+    if not expr:
+        return []
+    if not fts_enabled():
+        return list(Product.objects.filter(name__icontains=q.strip()).order_by('name')[:limit])
+    sql = (
+        f'SELECT p.* FROM {FTS_TABLE} f '
+        f'JOIN nutrition_product p ON p.id = f.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s '
+        f'ORDER BY bm25({FTS_TABLE}), length(p.name) '
+        f'LIMIT %s'
+    )
+    return list(Product.objects.raw(sql, [expr, limit]))
@@ -0,0 +1,136 @@
+import datetime as dt
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from . import rollup
+from .models import Entry, FoodEntry, Product
+
+
+"""
+Sintētisku datu ģenerators slodzes testiem un benchmarkiem.
+
+Izveido lietotājus, produktu katalogu un vairāku gadu `FoodEntry`/`Entry`
+vēsturi ar `bulk_create` (partijās), pēc tam pārbūvē `DailyTotals`. Dati ir
+deterministiski pēc `rng_seed`, un visi ģenerētie objekti ir atpazīstami pēc
+`prefix` (lietotājvārds, produktu svītrkods), tāpēc tos var droši izdzēst ar `clear`.
+"""
+
+BATCH_SIZE = 2000
+
+# (nosaukums, kcal, proteīns, tauki, ogļhidrāti) uz 100 g; tipiskas porcijas gramos
+_FOODS = (
+    ('Oatmeal', 68, 2.4, 1.4, 12.0, 250), ('Rye bread', 259, 8.5, 3.3, 48.0, 60),
+    ('Buckwheat', 92, 3.4, 0.6, 20.0, 200), ('Rice', 130, 2.7, 0.3, 28.0, 200),
+    ('Chicken breast', 165, 31.0, 3.6, 0.0, 150), ('Salmon', 208, 20.0, 13.0, 0.0, 150),
+    ('Egg', 155, 13.0, 11.0, 1.1, 60), ('Cottage cheese', 98, 11.0, 4.3, 3.4, 150),
+    ('Milk', 46, 3.2, 1.5, 4.7, 250), ('Kefir', 41, 3.4, 1.0, 4.0, 250),
+    ('Apple', 52, 0.3, 0.2, 14.0, 150), ('Banana', 89, 1.1, 0.3, 23.0, 120),
+    ('Potatoes', 77, 2.0, 0.1, 17.0, 200), ('Cabbage salad', 25, 1.3, 0.1, 5.8, 150),
+    ('Pork chop', 231, 25.0, 14.0, 0.0, 150), ('Grey peas', 118, 8.0, 0.4, 21.0, 200),
+    ('Pasta', 131, 5.0, 1.1, 25.0, 200), ('Cheese', 402, 25.0, 33.0, 1.3, 30),
+    ('Yogurt', 59, 10.0, 0.4, 3.6, 150), ('Dark chocolate', 546, 4.9, 31.0, 61.0, 25),
+)
+_SNACKS = ('Coffee with milk', 'Protein bar', 'Homemade soup', 'Smoothie', 'Pancakes', 'Salad bowl')
+# Ēdienreižu stundas (vietējais laiks)
+_MEAL_HOURS = (8, 11, 13, 16, 19, 21)
+
+
+def _products(prefix, count, rng):
+    products = []
+    for i in range(count):
+        name, kcal, p, f, c, _portion = _FOODS[i % len(_FOODS)]
+        jitter = rng.uniform(0.9, 1.1)
+        products.append(Product(
+            name=name if i < len(_FOODS) else '%s #%d' % (name, i // len(_FOODS)),
+            barcode='%s-%06d' % (prefix, i),
+            calories_per_100g=round(kcal * jitter, 1),
+            protein_per_100g=round(p * jitter, 1),
+            fat_per_100g=round(f * jitter, 1),
+            carbs_per_100g=round(c * jitter, 1),
+        ))
+    return Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+
+
+def _history(user, products, days, entries_per_day, rng, end):
+    """Ģenerē (FoodEntry | Entry) objektus `days` dienām līdz `end` (ieskaitot)."""
+    portions = {p.pk: _FOODS[i % len(_FOODS)][5] for i, p in enumerate(products)}
+    for offset in range(days):
+        day = end - dt.timedelta(days=offset)
+        count = max(0, round(rng.gauss(entries_per_day, 1)))
+        for n in range(count):
+            hour = _MEAL_HOURS[n % len(_MEAL_HOURS)]
+            created_at = timezone.make_aware(dt.datetime.combine(day, dt.time(hour, rng.randrange(60))))
+            if rng.random() < 0.8:
+                product = rng.choice(products)
+                amount = round(portions[product.pk] * rng.uniform(0.6, 1.5))
+                yield FoodEntry(product=product, user=user, amount=amount, initial_amount=amount, created_at=created_at)
+            else:
+                amount = round(rng.uniform(100, 400))
+                kcal100 = rng.uniform(40, 250)
+                yield Entry(user=user, name=rng.choice(_SNACKS), amount=amount,
+                            kcal=round(kcal100 * amount / 100, 3), kcal_per100=round(kcal100, 3),
+                            protein=round(amount * 0.05, 3), fat=round(amount * 0.03, 3),
+                            carbs=round(amount * 0.12, 3), created_at=created_at)
+
+
+def seed(users=5, products=200, days=365, entries_per_day=4, public_days=30, rng_seed=0, prefix='seed', progress=None):
+    """
+    Izveido sintētiskos datus. Atgriež {'users', 'products', 'food_entries', 'entries'}.
+
+    `public_days` — cik dienu anonīmo (publisko) `FoodEntry` ierakstu ģenerēt.
+    `progress(message)` — neobligāts atskaites izsaukums.
+    """
+    rng = random.Random(rng_seed)
+    end = timezone.localdate()
+    User = get_user_model()
+    password = make_password(prefix)  # viens hash visiem — make_password ir apzināti lēns
+    start = User.objects.filter(username__startswith=prefix + '-user-').count()
+    seeded_users = User.objects.bulk_create([
+        User(username='%s-user-%d' % (prefix, start + i), password=password) for i in range(users)
+    ])
+    # SQLite atgriež id no bulk_create; citām datubāzēm nolasa vēlreiz
+    seeded_users = list(User.objects.filter(username__in=[u.username for u in seeded_users]))
+    catalog = _products('%s-%d' % (prefix, start), products, rng)
+
+    counts = {'users': len(seeded_users), 'products': len(catalog), 'food_entries': 0, 'entries': 0}
+    owners = [(user, days) for user in seeded_users] + [(None, public_days)]
+    for user, owner_days in owners:
+        food, custom = [], []
+        for obj in _history(user, catalog, owner_days, entries_per_day, rng, end):
+            if isinstance(obj, Entry):
+                if user is None:
+                    continue  # publiskie ieraksti ir tikai FoodEntry
+                custom.append(obj)
+            else:
+                food.append(obj)
+            if len(food) >= BATCH_SIZE:
+                FoodEntry.objects.bulk_create(food)
+                counts['food_entries'] += len(food)
+                food = []
+            if len(custom) >= BATCH_SIZE:
+                Entry.objects.bulk_create(custom)
+                counts['entries'] += len(custom)
+                custom = []
+        FoodEntry.objects.bulk_create(food)
+        Entry.objects.bulk_create(custom)
+        counts['food_entries'] += len(food)
+        counts['entries'] += len(custom)
+        if progress:
+            progress('%s: %d food entries, %d entries so far' % (
+                user.username if user else 'public', counts['food_entries'], counts['entries']))
+
+    rollup.rebuild(seeded_users)
+    return counts
+
+
+def clear(prefix='seed'):
+    """Izdzēš visus ar `prefix` ģenerētos lietotājus (kopā ar ierakstiem) un produktus."""
+    User = get_user_model()
+    products = Product.objects.filter(barcode__startswith=prefix + '-')
+    # publiskie FoodEntry ir piesaistīti seed produktiem un tiek dzēsti kaskādē
+    deleted_products = products.delete()[1].get(Product._meta.label, 0)
+    deleted_users = User.objects.filter(username__startswith=prefix + '-user-').delete()[1].get(User._meta.label, 0)
+    return {'users': deleted_users, 'products': deleted_products}
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+from django.core.cache import cache
+
+from .instrumentation import Counter
+
+
+"""
+"Single-flight" pieprasījumu apvienošana.
+
+Ja vairāki vienlaicīgi pieprasījumi vēlas vienu un to pašu (piem. svītrkodu),
+tikai pirmais ("leader") izsauc funkciju; pārējie gaida un saņem tā rezultātu
+(vai izņēmumu). `SingleFlight` strādā starp pavedieniem, `AsyncSingleFlight` —
+vienas notikumu cilpas korutīnām.
+
+Starp procesiem (vairāki gunicorn worker) koordinē `cache_lock`: leader ieliek
+kopīgajā kešatmiņā slēdzeni, bet pārējie procesi īsu brīdi gaida, līdz rezultāts
+parādās kešatmiņā (`poll`), un tikai tad izsauc funkciju paši.
+"""
+
+COALESCED = Counter('singleflight_calls_total', 'Single-flight calls by role (leader / coalesced / remote_coalesced).')
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Pavedienu līmeņa single-flight grupa (viena uz pieprasījumu veidu)."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Izsauc `fn()` vienreiz uz `key`, kamēr tas ir procesā; pārējie saņem to pašu rezultātu."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            COALESCED.inc(group=self.name, role='coalesced')
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        COALESCED.inc(group=self.name, role='leader')
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """Korutīnu single-flight grupa; nākotnes (futures) tiek glabātas pa notikumu cilpām."""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+
+    async def do(self, key, afn):
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        future = self._calls.get(slot)
+        if future is not None:
+            COALESCED.inc(group=self.name, role='coalesced')
+            # shield: ja viens gaidītājs tiek atcelts, kopīgais izsaukums turpinās
+            return await asyncio.shield(future)
+
+        COALESCED.inc(group=self.name, role='leader')
+        future = self._calls[slot] = loop.create_future()
+        try:
+            result = await afn()
+        except BaseException as ex:
+            future.set_exception(ex)
+            future.exception()  # atzīmē kā nolasītu, ja gaidītāju nav
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(slot, None)
+
+
+def cache_lock(key, timeout=10):
+    """Mēģina iegūt starpprocesu slēdzeni kopīgajā kešatmiņā. Atgriež True, ja iegūta."""
+    return cache.add(key + ':flight', 1, timeout=timeout)
+
+
+def cache_unlock(key):
+    cache.delete(key + ':flight')
+
+
+async def acache_lock(key, timeout=10):
+    return await cache.aadd(key + ':flight', 1, timeout=timeout)
+
+
+async def acache_unlock(key):
+    await cache.adelete(key + ':flight')
+
+
+def poll(key, wait=5.0, interval=0.05):
+    """
+    Gaida, kamēr cits process ieliek `key` kešatmiņā vai atbrīvo slēdzeni.
+
+    Atgriež kešatmiņas vērtību vai None (tad izsaucējam jāiegūst rezultāts pašam).
+    """
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(key + ':flight') is None:
+            return cache.get(key)
+        time.sleep(interval)
+    return None
+
+
+async def apoll(key, wait=5.0, interval=0.05):
+    """`poll` asinhronā versija."""
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+        if await cache.aget(key + ':flight') is None:
+            return await cache.aget(key)
+        await asyncio.sleep(interval)
+    return None
@@ -0,0 +1,172 @@
+/* nutrition/dist/progress.js: nutrition/js/common.js + nutrition/js/progress.js. Generated by build_static_assets, do not edit. */
+(function(window){
+const NH=window.NH=window.NH||{};
+NH.parseLocaleNumber=function(v){
+if(v===null||v===undefined)return 0;
+const s=String(v).trim().replace(/\s+/g,'').replace(',','.');
+const n=parseFloat(s);
+return isNaN(n)?0:n;
+};
+NH.getCsrfFromCookie=function(){
+const name='csrftoken=';
+const c=document.cookie.split(';').map(s=>s.trim()).find(s=>s.startsWith(name));
+return c?decodeURIComponent(c.split('=')[1]):'';
+};
+NH.csrfFromCookie=NH.getCsrfFromCookie;
+NH.csrfToken=NH.getCsrfFromCookie;
+NH.computeKcalFromMacros=function(p,f,c,amt){
+p=Number(p)||0;f=Number(f)||0;c=Number(c)||0;amt=Number(amt)||100;
+return(p*4+f*9+c*4)*(amt/100);
+};
+NH.fmt=function(n,dp){return(isFinite(n)?Number(n):0).toFixed(dp);};
+NH.escapeHtml=function(s){return String(s).replace(/[&<>"']/g,(m)=>({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[m]));};
+NH.sleep=function(ms){return new Promise(res=>setTimeout(res,ms));};
+window.parseLocaleNumber=NH.parseLocaleNumber;
+window.getCsrfFromCookie=NH.getCsrfFromCookie;
+window.csrfFromCookie=NH.csrfFromCookie;
+window.csrfToken=NH.csrfToken;
+window.computeKcalFromMacros=NH.computeKcalFromMacros;
+window.fmt=NH.fmt;
+window.escapeHtml=NH.escapeHtml;
+window.sleep=NH.sleep;
+})(window);
+(function(){
+const canvas=document.getElementById('calChart');
+if(!canvas){console.warn('Chart canvas not found');return;}
+function showNoData(message){
+const wrap=canvas.parentElement;
+canvas.style.display='none';
+const el=document.createElement('div');
+el.className='no-data-placeholder';
+el.style.padding='2rem';
+el.style.color='#666';
+el.style.fontSize='1rem';
+el.textContent=message||'No data available for chart';
+wrap.appendChild(el);
+}
+function safeJsonParse(str){
+if(!str)return[];
+try{return JSON.parse(str);}catch(e){}
+try{
+let s=String(str).replace(/\\u0022/g,'"').replace(/\\n/g,'').replace(/\\r/g,'').replace(/\\"/g,'"').replace(/\\\\/g,'\\');
+return JSON.parse(s);
+}catch(err){
+try{const m=String(str).match(/\[.*\]/s);if(m&&m[0])return JSON.parse(m[0].replace(/\\u0022/g,'"'));}catch(_){}
+return[];
+}
+}
+let dates=safeJsonParse(canvas.getAttribute('data-dates')||canvas.dataset.dates||'[]');
+let calories=safeJsonParse(canvas.getAttribute('data-calories')||canvas.dataset.calories||'[]');
+async function fetchFallback(){
+const url='/nutrition/api/daily_calories/?days=14';
+try{
+const res=await fetch(url,{credentials:'same-origin'});
+if(!res.ok)return null;
+const json=await res.json();
+if(Array.isArray(json.dates)&&Array.isArray(json.calories))return json;
+return null;
+}catch(err){return null;}
+}
+(async function initChart(){
+if((!dates||dates.length===0)||(!calories||calories.length===0)){
+const fallback=await fetchFallback();
+if(fallback){dates=fallback.dates||[];calories=fallback.calories||[];}
+}
+if((!dates||dates.length===0)&&(!calories||calories.length===0)){
+showNoData('No chart data for the last 14 days.');
+return;
+}
+const minLen=Math.min(dates.length||0,calories.length||0)||Math.max(dates.length,calories.length);
+const take=Math.min(minLen||Math.max(dates.length,calories.length),14);
+if(minLen>0){dates=dates.slice(-take);calories=calories.slice(-take);}
+else if(dates.length&&!calories.length){dates=dates.slice(-take);calories=dates.map(_=>0);}
+else if(calories.length&&!dates.length){calories=calories.slice(-take);dates=calories.map((_,i)=>'Day '+(i+1)).slice(-take);}
+if(!dates.length||!calories.length){showNoData('No chart data for the last 14 days.');return;}
+try{if(window.calChartInstance&&typeof window.calChartInstance.destroy==='function')window.calChartInstance.destroy();}catch(e){}
+const ctx=canvas.getContext('2d');
+calories=calories.map(v=>{const n=Number(v);return isFinite(n)?n:0;});
+let recRaw=canvas.getAttribute('data-rec')||canvas.dataset.rec||'0';
+console.log('progress.js: raw data-rec=',recRaw);
+recRaw=String(recRaw).trim().replace(/\s/g,'').replace(/,/g,'.').replace(/[^0-9.\-]/g,'');
+let recTarget=Number(recRaw);
+if(!isFinite(recTarget))recTarget=0;
+console.log('progress.js: recTarget=',recTarget,'parsed from',recRaw);
+const datasets=[
+{
+label:'Calories per day',
+data:calories,
+backgroundColor:'rgba(76,175,80,0.7)',
+borderColor:'rgba(76, 175, 80, 1)',
+borderWidth:1,
+borderRadius:4,
+type:'bar'
+}
+];
+if(recTarget>0){
+const tData=(dates&&dates.length)?new Array(dates.length).fill(recTarget):[];
+datasets.push({
+type:'line',
+label:'Target',
+data:tData,
+borderColor:'rgba(33,150,83,0.9)',
+borderWidth:2,
+borderDash:[8,6],
+pointRadius:0,
+fill:false,
+tension:0,
+order:2,
+yAxisID:'y'
+});
+}
+window.calChartInstance=new Chart(ctx,{
+type:'bar',
+data:{
+labels:dates,
+datasets:datasets
+},
+options:{
+responsive:false,
+maintainAspectRatio:false,
+animation:false,
+transitions:{active:false},
+devicePixelRatio:1,
+scales:{
+y:{beginAtZero:true,ticks:{color:'#666'},grid:{color:'#eee'}},
+x:{ticks:{color:'#666'},grid:{color:'#eee'}}
+},
+plugins:{
+legend:{labels:{color:'#333',font:{size:12}}},
+tooltip:{
+filter:function(tooltipItem){
+return tooltipItem.dataset&&tooltipItem.dataset.label!=='Target';
+},
+callbacks:{label:function(ctx){return ctx.dataset.label+': '+ctx.formattedValue+' kcal';}}
+}
+}
+}
+});
+console.log('progress.js: chart dates=',dates.length,'calories=',calories.length,'recTarget=',recTarget);
+async function refreshChartFromApi(){
+try{
+const fallback=await fetchFallback();
+if(!fallback){console.log('progress.js: refreshChartFromApi - no data from API');return;}
+const newDates=Array.isArray(fallback.dates)?fallback.dates:[];
+const newCalories=Array.isArray(fallback.calories)?fallback.calories.map(v=>{const n=Number(v);return isFinite(n)?n:0;}):[];
+if(window.calChartInstance){
+window.calChartInstance.data.labels=newDates.slice(-14);
+window.calChartInstance.data.datasets[0].data=newCalories.slice(-14);
+window.calChartInstance.update();
+console.log('progress.js: chart refreshed from API');
+}
+}catch(e){console.warn('progress.js: refreshChartFromApi error',e);}
+}
+window.addEventListener('storage',function(e){
+if(!e)return;
+if(e.key==='nutrition:entries-updated'){
+console.log('progress.js: storage event - entries updated, refreshing chart');
+refreshChartFromApi();
+}
+});
+document.addEventListener('visibilitychange',function(){if(!document.hidden){refreshChartFromApi();}});
+})();
+})();
@@ -0,0 +1,256 @@
+
+'use strict';
+{
+  const globals = this;
+  const django = globals.django || (globals.django = {});
+
+  
+  django.pluralidx = function(n) {
+    const v = (n%10==1 && n%100!=11 ? 0 : n != 0 ? 1 : 2);
+    if (typeof v === 'boolean') {
+      return v ? 1 : 0;
+    } else {
+      return v;
+    }
+  };
+  
+
+  /* gettext library */
+
+  django.catalog = django.catalog || {};
+  
+  const newcatalog = {
+    "%(sel)s of %(cnt)s selected": [
+      "%(sel)s no %(cnt)s izv\u0113l\u0113ts",
+      "%(sel)s no %(cnt)s izv\u0113l\u0113ti",
+      "%(sel)s no %(cnt)s izv\u0113l\u0113ti"
+    ],
+    "%s selected option not visible": [
+      "%s atlas\u012bto iesp\u0113ju nav redzamas",
+      "%s atlas\u012bt\u0101 iesp\u0113ja nav redzama",
+      "%s atlas\u012bt\u0101s iesp\u0113jas nav redzamas"
+    ],
+    "(click to clear)": "(klik\u0161\u0137in\u0101t, lai not\u012br\u012btu)",
+    "6 a.m.": "06.00",
+    "6 p.m.": "6:00",
+    "Add failed": "Pievieno\u0161ana neizdev\u0101s",
+    "Add failed (server)": "Pievieno\u0161ana neizdev\u0101s (serveris)",
+    "All nutrient fields are zero. Continue?": "Visi uzturvielu lauki ir nulles. Turpin\u0101t?",
+    "April": "apr\u012blis",
+    "Are you sure you want to delete this entry?": "Vai tie\u0161\u0101m v\u0113laties dz\u0113st \u0161o ierakstu?",
+    "August": "augusts",
+    "Available %s": "Pieejams %s",
+    "Calories": "Kalorijas",
+    "Cancel": "Atcelt",
+    "Carbs": "Og\u013chidr\u0101ti",
+    "Choose %s by selecting them and then select the \"Choose\" arrow button.": "J\u0101izv\u0113las %s ar atlas\u012b\u0161anu un tad j\u0101atlasa bultas poga \"Izv\u0113l\u0113ties\".",
+    "Choose a Date": "Izv\u0113lies datumu",
+    "Choose a Time": "Izv\u0113lies laiku",
+    "Choose a time": "Izv\u0113l\u0113ties laiku",
+    "Choose all %s": "Izv\u0113l\u0113ties visus %s",
+    "Choose selected %s": "Izv\u0113l\u0113ties atlas\u012btos %s",
+    "Chosen %s": "Izv\u0113l\u0113ts %s",
+    "December": "decembris",
+    "Delete failed": "Dz\u0113\u0161ana neizdev\u0101s",
+    "Delete failed (server)": "Dz\u0113\u0161ana neizdev\u0101s (serveris)",
+    "Edit failed": "Redi\u0123\u0113\u0161ana neizdev\u0101s",
+    "Enter a positive amount (grams)": "Ievadiet pozit\u012bvu daudzumu (gramos)",
+    "Enter product name": "Ievadiet produkta nosaukumu",
+    "Enter valid amount": "Ievadiet der\u012bgu daudzumu",
+    "External database error. Try again or add product manually.": "K\u013c\u016bda \u0101r\u0113j\u0101 datub\u0101z\u0113. M\u0113\u0123iniet v\u0113lreiz vai pievienojiet produktu manu\u0101li.",
+    "Fat": "Tauki",
+    "February": "febru\u0101ris",
+    "Filter": "Filtrs",
+    "Friday": "Piektdiena",
+    "January": "janv\u0101ris",
+    "July": "j\u016blijs",
+    "June": "j\u016bnijs",
+    "Looking up barcode...": "Mekl\u0113 p\u0113c sv\u012btrkoda...",
+    "Lookup failed, try again.": "Mekl\u0113\u0161ana neizdev\u0101s, m\u0113\u0123iniet v\u0113lreiz.",
+    "March": "marts",
+    "May": "maijs",
+    "Midnight": "Pusnakts",
+    "Monday": "Pirmdiena",
+    "Network error, try again.": "T\u012bkla k\u013c\u016bda, m\u0113\u0123iniet v\u0113lreiz.",
+    "No results.": "Rezult\u0101tu nav.",
+    "Noon": "Pusdiena",
+    "Note: You are %s hour ahead of server time.": [
+      "Piez\u012bme: Tavs laiks ir %s stundas pirms servera laika.",
+      "Piez\u012bme: Tavs laiks ir %s stundu pirms servera laika.",
+      "Piez\u012bme: Tavs laiks ir %s stundas pirms servera laika."
+    ],
+    "Note: You are %s hour behind server time.": [
+      "Piez\u012bme: Tavs laiks ir %s stundas p\u0113c servera laika.",
+      "Piez\u012bme: Tavs laiks ir %s stundu p\u0113c servera laika.",
+      "Piez\u012bme: Tavs laiks ir %s stundas p\u0113c servera laika."
+    ],
+    "November": "novembris",
+    "Now": "Tagad",
+    "October": "oktobris",
+    "Please log in to save entries.": "L\u016bdzu, piesakieties, lai saglab\u0101tu ierakstus.",
+    "Product not found for this barcode.": "Produktu p\u0113c \u0161\u012b sv\u012btrkoda nav atrasts.",
+    "Protein": "Olbaltumvielas",
+    "Remove %s by selecting them and then select the \"Remove\" arrow button.": "No\u0146emt %s tos atz\u012bm\u0113jot un tad izv\u0113loties \"No\u0146emt\" bulti\u0146as pogu.",
+    "Remove all %s": "No\u0146emt visu %s",
+    "Remove selected %s": "No\u0146emt atz\u012bm\u0113tos %s",
+    "Saturday": "Sestdiena",
+    "Searching...": "Mekl\u0113...",
+    "September": "septembris",
+    "Sunday": "Sv\u0113tdiena",
+    "Thursday": "Ceturtdiena",
+    "Today": "\u0160odien",
+    "Tomorrow": "R\u012bt",
+    "Tuesday": "Otrdiena",
+    "Type into this box to filter down the list of available %s.": "Raksti \u0161aj\u0101 log\u0101, lai atsij\u0101tu sarakstu ar pieejamajiem %s.",
+    "Type into this box to filter down the list of selected %s.": "Raksti \u0161aj\u0101 lauk\u0101, lai atsij\u0101tu atlas\u012bto %s sarakstu.",
+    "Wednesday": "Tre\u0161diena",
+    "Yesterday": "Vakar",
+    "You have selected an action, and you haven\u2019t made any changes on individual fields. You\u2019re probably looking for the Go button rather than the Save button.": "Tu atlas\u012bji darb\u012bbu un laukos neveici nek\u0101das izmai\u0146as. Iesp\u0113jams, ka mekl\u0113 pogu \u201cAiziet\u201d, nevis \u201cSaglab\u0101t\u201d.",
+    "You have selected an action, but you haven\u2019t saved your changes to individual fields yet. Please click OK to save. You\u2019ll need to re-run the action.": "Ir atlas\u012bta darb\u012bba, bet nav saglab\u0101tas laukos veikt\u0101s izmai\u0146as. L\u016bgums klik\u0161\u0137in\u0101t uz \u201cLabi\u201d, lai saglab\u0101tu. Darb\u012bba b\u016bs j\u0101izpilda v\u0113lreiz.",
+    "You have unsaved changes on individual editable fields. If you run an action, your unsaved changes will be lost.": "Atsevi\u0161\u0137i labojamiem laukiem ir nesaglab\u0101tas izmai\u0146as. Ja tiks izpild\u012bta darb\u012bba, nesaglab\u0101t\u0101s izmai\u0146as tiks zaud\u0113tas.",
+    "abbrev. day Friday\u0004Fri": "Pi",
+    "abbrev. day Monday\u0004Mon": "Pr",
+    "abbrev. day Saturday\u0004Sat": "Se",
+    "abbrev. day Sunday\u0004Sun": "Sv",
+    "abbrev. day Thursday\u0004Thur": "Ce",
+    "abbrev. day Tuesday\u0004Tue": "Ot",
+    "abbrev. day Wednesday\u0004Wed": "Tr",
+    "abbrev. month April\u0004Apr": "Apr",
+    "abbrev. month August\u0004Aug": "Aug",
+    "abbrev. month December\u0004Dec": "Dec",
+    "abbrev. month February\u0004Feb": "Feb",
+    "abbrev. month January\u0004Jan": "Jan",
+    "abbrev. month July\u0004Jul": "J\u016bl",
+    "abbrev. month June\u0004Jun": "J\u016bn",
+    "abbrev. month March\u0004Mar": "Mar",
+    "abbrev. month May\u0004May": "Mai",
+    "abbrev. month November\u0004Nov": "Nov",
+    "abbrev. month October\u0004Oct": "Okt",
+    "abbrev. month September\u0004Sep": "Sep",
+    "one letter Friday\u0004F": "Pk",
+    "one letter Monday\u0004M": "Pr",
+    "one letter Saturday\u0004S": "Se",
+    "one letter Sunday\u0004S": "Sv",
+    "one letter Thursday\u0004T": "C",
+    "one letter Tuesday\u0004T": "O",
+    "one letter Wednesday\u0004W": "T",
+    "unnamed": "nenosaukts"
+  };
+  for (const key in newcatalog) {
+    django.catalog[key] = newcatalog[key];
+  }
+  
+
+  if (!django.jsi18n_initialized) {
+    django.gettext = function(msgid) {
+      const value = django.catalog[msgid];
+      if (typeof value === 'undefined') {
+        return msgid;
+      } else {
+        return (typeof value === 'string') ? value : value[0];
+      }
+    };
+
+    django.ngettext = function(singular, plural, count) {
+      const value = django.catalog[singular];
+      if (typeof value === 'undefined') {
+        return (count == 1) ? singular : plural;
+      } else {
+        return value.constructor === Array ? value[django.pluralidx(count)] : value;
+      }
+    };
+
+    django.gettext_noop = function(msgid) { return msgid; };
+
+    django.pgettext = function(context, msgid) {
+      let value = django.gettext(context + '\x04' + msgid);
+      if (value.includes('\x04')) {
+        value = msgid;
+      }
+      return value;
+    };
+
+    django.npgettext = function(context, singular, plural, count) {
+      let value = django.ngettext(context + '\x04' + singular, context + '\x04' + plural, count);
+      if (value.includes('\x04')) {
+        value = django.ngettext(singular, plural, count);
+      }
+      return value;
+    };
+
+    django.interpolate = function(fmt, obj, named) {
+      if (named) {
+        return fmt.replace(/%\(\w+\)s/g, function(match){return String(obj[match.slice(2,-2)])});
+      } else {
+        return fmt.replace(/%s/g, function(match){return String(obj.shift())});
+      }
+    };
+
+
+    /* formatting library */
+
+    django.formats = {
+    "DATETIME_FORMAT": "Y. \\g\\a\\d\\a j. F, H:i",
+    "DATETIME_INPUT_FORMATS": [
+      "%Y-%m-%d %H:%M:%S",
+      "%Y-%m-%d %H:%M:%S.%f",
+      "%Y-%m-%d %H:%M",
+      "%d.%m.%Y %H:%M:%S",
+      "%d.%m.%Y %H:%M:%S.%f",
+      "%d.%m.%Y %H:%M",
+      "%d.%m.%y %H:%M:%S",
+      "%d.%m.%y %H:%M:%S.%f",
+      "%d.%m.%y %H:%M",
+      "%d.%m.%y %H.%M.%S",
+      "%d.%m.%y %H.%M.%S.%f",
+      "%d.%m.%y %H.%M",
+      "%Y-%m-%d"
+    ],
+    "DATE_FORMAT": "Y. \\g\\a\\d\\a j. F",
+    "DATE_INPUT_FORMATS": [
+      "%Y-%m-%d",
+      "%d.%m.%Y",
+      "%d.%m.%y"
+    ],
+    "DECIMAL_SEPARATOR": ",",
+    "FIRST_DAY_OF_WEEK": 1,
+    "MONTH_DAY_FORMAT": "j. F",
+    "NUMBER_GROUPING": 3,
+    "SHORT_DATETIME_FORMAT": "j.m.Y H:i",
+    "SHORT_DATE_FORMAT": "j.m.Y",
+    "THOUSAND_SEPARATOR": "\u00a0",
+    "TIME_FORMAT": "H:i",
+    "TIME_INPUT_FORMATS": [
+      "%H:%M:%S",
+      "%H:%M:%S.%f",
+      "%H:%M",
+      "%H.%M.%S",
+      "%H.%M.%S.%f",
+      "%H.%M"
+    ],
+    "YEAR_MONTH_FORMAT": "Y. \\g. F"
+  };
+
+    django.get_format = function(format_type) {
+      const value = django.formats[format_type];
+      if (typeof value === 'undefined') {
+        return format_type;
+      } else {
+        return value;
+      }
+    };
+
+    /* add to global namespace */
+    globals.pluralidx = django.pluralidx;
+    globals.gettext = django.gettext;
+    globals.ngettext = django.ngettext;
+    globals.gettext_noop = django.gettext_noop;
+    globals.pgettext = django.pgettext;
+    globals.npgettext = django.npgettext;
+    globals.interpolate = django.interpolate;
+    globals.get_format = django.get_format;
+
+    django.jsi18n_initialized = true;
+  }
+};
+
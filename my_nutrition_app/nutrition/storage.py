@@ -0,0 +1,71 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli  # neobligāts: `.br` kopijas
+except ImportError:  # pragma: no cover - atkarīgs no vides
+    brotli = None
+
+
+"""
+`collectstatic` krātuve: jaukti failu nosaukumi + iepriekš saspiestas kopijas.
+
+`ManifestStaticFilesStorage` katram failam pievieno satura jaucējkodu
+(`nutrition/dist/home.1a2b3c4d5e6f.js`) un `{% static %}` atgriež šo nosaukumu,
+tāpēc failus drīkst kešot uz visiem laikiem. Pēc tam katram jauktajam teksta
+failam blakus tiek ierakstīts `.gz` (un `.br`, ja instalēts `brotli`), ko
+`views.static_asset` vai reverse proxy (nginx `gzip_static`/`brotli_static`)
+atdod bez saspiešanas pieprasījuma laikā.
+
+Kamēr `collectstatic` nav palaists (izstrāde, testi), manifesta nav un
+`{% static %}` atgriež oriģinālos nosaukumus.
+"""
+
+COMPRESSIBLE = ('.css', '.js', '.json', '.svg', '.txt', '.html', '.xml', '.map')
+# Saspiestu kopiju neraksta, ja ietaupījums mazāks par šo daļu
+MIN_SAVING = 0.05
+
+
+def _compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # bez manifesta (collectstatic vēl nav palaists) — oriģinālais nosaukums, nevis kļūda
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            self.compress_files(self.hashed_files.values())
+
+    def compress_files(self, names):
+        """Ieraksta `.gz`/`.br` kopijas; jaukts nosaukums = nemainīgs saturs, tāpēc esošās netiek pārrakstītas."""
+        written = []
+        for name in sorted(set(names)):
+            if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+                continue
+            data = None
+            for suffix, compress in _compressors():
+                target = self.path(name + suffix)
+                if os.path.exists(target):
+                    continue
+                if data is None:
+                    with self.open(name) as fh:
+                        data = fh.read()
+                compressed = compress(data)
+                if len(compressed) > len(data) * (1 - MIN_SAVING):
+                    continue
+                with open(target, 'wb') as fh:
+                    fh.write(compressed)
+                written.append(name + suffix)
+        return written
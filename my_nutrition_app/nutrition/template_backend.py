@@ -0,0 +1,27 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from nutrition import timing
+
+
+"""
+Django veidņu backend, kas renderēšanas laiku pieskaita 'tpl' metrikai.
+
+Iestatījumos `TEMPLATES[...]['BACKEND'] = 'nutrition.template_backend.TimedDjangoTemplates'`.
+Tiek mērīta backend līmeņa veidne (`render()` / `TemplateResponse`), nevis
+`{% include %}` apakšveidnes, tāpēc laiks netiek skaitīts divreiz. Ārpus mērīta
+pieprasījuma (`timing.current()` ir None) `measure` neko nedara.
+"""
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timing.measure('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -1,4 +1,9 @@
 from django import template
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.translation import get_language
+
+from nutrition import jscatalog
 
 register = template.Library()
 
@@ -30,3 +35,15 @@ def kcal_from_macros(entry):
         return round(computed, 2)
     except Exception:
         return ''
+
+
+@register.simple_tag
+def js_catalog_url():
+    """
+    URL of the JavaScript translation catalog for the active language.
+
+    Prefers the pre-built, content-hashed static file (`build_js_catalogs`);
+    falls back to the dynamic `/jsi18n/` view if it has not been built.
+    """
+    path = jscatalog.static_path(get_language())
+    return static(path) if path else reverse('javascript-catalog')
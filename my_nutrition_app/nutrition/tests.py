@@ -1,8 +1,21 @@
 from django.test import TestCase
+from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+import asyncio
+import gzip
 import json
-from .models import Product, Entry
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+import requests
+from .models import Product, Entry, FoodEntry, DailyTotals, HistoryImport
+from .off import OffClient
 
 User = get_user_model()
 
@@ -78,3 +91,1781 @@ class ViewsAjaxTests(TestCase):
         data = resp.json()
         # Un JSON norāda, ka success nav True
         self.assertFalse(data.get('success'))
+
+
+class DailyTotalsTests(TestCase):
+    """
+    Pārbauda `DailyTotals` rollup uzturēšanu rakstīšanas skatos un pārbūves komandu.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='roller', password='pw')
+        self.product = Product.objects.create(name='Oats', calories_per_100g=380, protein_per_100g=13, fat_per_100g=7, carbs_per_100g=60)
+        self.client.force_login(self.user)
+
+    def _today(self):
+        return DailyTotals.objects.get(user=self.user)
+
+    def test_add_edit_delete_keep_rollup_in_sync(self):
+        url = reverse('nutrition:api_add_entry')
+        resp = self.client.post(url, data=json.dumps({'name': 'Bar', 'amount': 50, 'kcal': 200, 'protein': 4, 'fat': 8, 'carbs': 25}), content_type='application/json')
+        entry_id = resp.json()['id']
+        row = self._today()
+        self.assertEqual(row.entry_count, 1)
+        self.assertAlmostEqual(row.kcal, 200)
+
+        # Rediģēšana pieskaita tikai starpību, neskaitot ierakstu vēlreiz
+        self.client.post(reverse('nutrition:edit_entry', args=[entry_id]), data=json.dumps({'amount': 100}), content_type='application/json')
+        row = self._today()
+        self.assertEqual(row.entry_count, 1)
+        self.assertAlmostEqual(row.kcal, 400)
+
+        self.client.post(reverse('nutrition:add_meal'), {'product': self.product.pk, 'amount': 100})
+        row = self._today()
+        self.assertEqual(row.entry_count, 2)
+        self.assertAlmostEqual(row.kcal, 780)
+
+        fe = FoodEntry.objects.get(user=self.user)
+        self.client.post(reverse('nutrition:delete_entry', args=[fe.pk]), data=json.dumps({}), content_type='application/json')
+        row = self._today()
+        self.assertEqual(row.entry_count, 1)
+        self.assertAlmostEqual(row.kcal, 400)
+
+    def test_rebuild_command_matches_incremental(self):
+        Entry.objects.create(user=self.user, name='A', amount=100, kcal=150, protein=1, fat=2, carbs=3)
+        FoodEntry.objects.create(user=self.user, product=self.product, amount=50, initial_amount=50)
+        self.assertFalse(DailyTotals.objects.exists())
+        call_command('rebuild_daily_totals', stdout=open(os.devnull, 'w'))
+        row = self._today()
+        self.assertEqual(row.entry_count, 2)
+        self.assertAlmostEqual(row.kcal, 340)
+        self.assertAlmostEqual(row.protein, 7.5)
+
+    def test_api_daily_calories_reads_rollup(self):
+        DailyTotals.objects.create(user=self.user, day=timezone.now().date(), kcal=1234.5, entry_count=3)
+        resp = self.client.get(reverse('nutrition:api_daily_calories'), {'days': 7})
+        data = resp.json()
+        self.assertEqual(len(data['dates']), 7)
+        self.assertEqual(data['calories'][-1], 1234.5)
+
+
+class AggregationTests(TestCase):
+    """
+    Pārbauda, ka dienas sērijas tiek sagrupētas datubāzē ar nemainīgu vaicājumu skaitu.
+    """
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Rice', calories_per_100g=130, protein_per_100g=2.7, fat_per_100g=0.3, carbs_per_100g=28)
+
+    def _add_public(self, n):
+        FoodEntry.objects.bulk_create([
+            FoodEntry(product=self.product, amount=100, initial_amount=100) for _ in range(n)
+        ])
+
+    def test_series_query_count_is_constant(self):
+        url = reverse('nutrition:api_daily_calories')
+        self._add_public(3)
+        with self.assertNumQueries(1):
+            small = self.client.get(url, {'days': 365}).json()
+        self._add_public(60)
+        with self.assertNumQueries(1):
+            large = self.client.get(url, {'days': 365}).json()
+        self.assertEqual(len(large['dates']), 365)
+        self.assertAlmostEqual(small['calories'][-1], 390)
+        self.assertAlmostEqual(large['calories'][-1], 63 * 130)
+
+    def test_aggregate_by_day_merges_both_tables(self):
+        from .aggregation import aggregate_by_day
+        user = User.objects.create_user(username='agg', password='pw')
+        FoodEntry.objects.create(user=user, product=self.product, amount=200, initial_amount=200)
+        Entry.objects.create(user=user, name='Soup', amount=300, kcal=120, protein=6, fat=3, carbs=15)
+        with self.assertNumQueries(1):
+            result = aggregate_by_day(FoodEntry.objects.filter(user=user), Entry.objects.filter(user=user))
+        (key, totals), = result.items()
+        self.assertEqual(key, (user.pk, timezone.localdate()))
+        self.assertAlmostEqual(totals['kcal'], 380)
+        self.assertAlmostEqual(totals['carbs'], 71)
+        self.assertEqual(totals['count'], 2)
+
+
+class LedgerTests(TestCase):
+    """
+    Pārbauda `nutrition.ledger` dienas skatu: vaicājumu skaitu un vērtību aprēķinu.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ledger', password='pw')
+        self.products = [
+            Product.objects.create(name=f'P{i}', calories_per_100g=100 + i, protein_per_100g=1, fat_per_100g=2, carbs_per_100g=3)
+            for i in range(5)
+        ]
+
+    def test_day_ledger_uses_two_queries(self):
+        from . import ledger
+        for p in self.products:
+            FoodEntry.objects.create(user=self.user, product=p, amount=200, initial_amount=100)
+        Entry.objects.create(user=self.user, name='Custom', amount=50, kcal=75, protein=1, fat=1, carbs=10)
+        with self.assertNumQueries(2):
+            day = ledger.day_ledger(self.user)
+            names = [e.name for e in day]
+        self.assertEqual(names, ['P0', 'P1', 'P2', 'P3', 'P4', 'Custom'])
+        self.assertEqual(day.entries[0].kcal, 200.0)
+        self.assertEqual(day.entries[0].initial_amount, 100)
+        self.assertEqual(day.entries[-1].origin, 'entry')
+        self.assertAlmostEqual(day.totals['calories'], 2 * (100 + 101 + 102 + 103 + 104) + 75)
+        self.assertFalse(hasattr(day.entries[0], '__dict__'))
+
+    def test_home_renders_ledger_entries(self):
+        FoodEntry.objects.create(user=self.user, product=self.products[0], amount=150, initial_amount=150)
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse('nutrition:home'))
+        self.assertContains(resp, 'P0')
+        self.assertEqual(resp.context['totals']['calories'], 150.0)
+
+
+class ImportOffCatalogTests(TestCase):
+    """
+    Pārbauda `import_off_catalog` komandu: JSONL.gz un CSV importu, upsert un atsākšanu.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def _write_jsonl_gz(self, records):
+        path = os.path.join(self.tmp, 'dump.jsonl.gz')
+        with gzip.open(path, 'wt', encoding='utf-8') as fh:
+            for r in records:
+                fh.write(json.dumps(r) + '\n')
+        return path
+
+    def _record(self, code, name, kcal):
+        return {'code': code, 'product_name': name, 'nutriments': {'energy-kcal_100g': kcal, 'proteins_100g': 3.2, 'fat_100g': 1, 'carbohydrates_100g': 4.8}}
+
+    def test_jsonl_gz_import_and_upsert(self):
+        path = self._write_jsonl_gz([self._record('111', 'Milk', 64), self._record('222', 'Banana', 89), {'code': '333'}])
+        call_command('import_off_catalog', path, '--batch-size', '1', stdout=open(os.devnull, 'w'))
+        self.assertEqual(Product.objects.filter(barcode__isnull=False).count(), 2)
+        milk = Product.objects.get(barcode='111')
+        self.assertEqual(milk.calories_per_100g, 64)
+        self.assertEqual(milk.protein_per_100g, 3.2)
+
+        # Atkārtots imports atjaunina esošās rindas, nevis dublē
+        path = self._write_jsonl_gz([self._record('111', 'Whole milk', 65)])
+        call_command('import_off_catalog', path, stdout=open(os.devnull, 'w'))
+        self.assertEqual(Product.objects.filter(barcode='111').get().name, 'Whole milk')
+        self.assertEqual(Product.objects.filter(barcode__isnull=False).count(), 2)
+
+    def test_resume_from_checkpoint(self):
+        path = self._write_jsonl_gz([self._record(str(i), f'P{i}', i) for i in range(10)])
+        checkpoint = os.path.join(self.tmp, 'cp.json')
+        first_line = len(json.dumps(self._record('0', 'P0', 0)) + '\n')
+        from .management.commands.import_off_catalog import file_fingerprint
+        with open(checkpoint, 'w') as fh:
+            json.dump(dict(file_fingerprint(path, 'jsonl'), offset=first_line, imported=1), fh)
+        call_command('import_off_catalog', path, '--resume', '--checkpoint', checkpoint, stdout=open(os.devnull, 'w'))
+        self.assertFalse(Product.objects.filter(barcode='0').exists())
+        self.assertEqual(Product.objects.filter(barcode__isnull=False).count(), 9)
+        with open(checkpoint) as fh:
+            self.assertEqual(json.load(fh)['imported'], 10)
+
+    def test_resume_refuses_checkpoint_of_another_file(self):
+        from django.core.management.base import CommandError
+        path = self._write_jsonl_gz([self._record(str(i), f'P{i}', i) for i in range(3)])
+        checkpoint = os.path.join(self.tmp, 'cp.json')
+        call_command('import_off_catalog', path, '--checkpoint', checkpoint, stdout=open(os.devnull, 'w'))
+        # tas pats ceļš, bet cits dumps
+        path = self._write_jsonl_gz([self._record(str(i), f'Q{i}', i) for i in range(5)])
+        with self.assertRaisesMessage(CommandError, 'different file'):
+            call_command('import_off_catalog', path, '--resume', '--checkpoint', checkpoint, stdout=open(os.devnull, 'w'))
+        other = os.path.join(self.tmp, 'other.jsonl')
+        with open(other, 'w') as fh:
+            fh.write(json.dumps(self._record('9', 'Other', 1)) + '\n')
+        with self.assertRaisesMessage(CommandError, 'path'):
+            call_command('import_off_catalog', other, '--resume', '--checkpoint', checkpoint, stdout=open(os.devnull, 'w'))
+        self.assertFalse(Product.objects.filter(name__startswith='Q').exists())
+
+    def test_csv_import_and_local_lookup(self):
+        path = os.path.join(self.tmp, 'dump.csv')
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write('code\tproduct_name\tbrands\tenergy-kcal_100g\tproteins_100g\tfat_100g\tcarbohydrates_100g\n')
+            fh.write('4750\tKefīrs\tRīgas piens\t41\t3\t1\t4\n')
+        call_command('import_off_catalog', path, stdout=open(os.devnull, 'w'))
+        resp = self.client.get(reverse('nutrition:api_product_lookup'), {'barcode': '4750'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['result']['name'], 'Kefīrs')
+        self.assertEqual(resp.json()['result']['kcal'], 41.0)
+
+
+class ProductSearchTests(TestCase):
+    """
+    Pārbauda lokālo FTS5 produktu meklēšanu un `api_product_search` lokālo atbildi.
+    """
+
+    def setUp(self):
+        Product.objects.create(name='Kefīrs 2.5%')
+        Product.objects.create(name='Piens Rīgas')
+        Product.objects.create(name='Ёжевика замороженная')
+        Product.objects.create(name='Banana chips')
+
+    def test_prefix_and_diacritic_folding(self):
+        from .search import search_products
+        self.assertEqual([p.name for p in search_products('kefi')], ['Kefīrs 2.5%'])
+        self.assertEqual([p.name for p in search_products('rigas pie')], ['Piens Rīgas'])
+        self.assertEqual([p.name for p in search_products('ежев')], ['Ёжевика замороженная'])
+        self.assertEqual(search_products('"*) OR'), [])
+
+    def test_index_follows_updates_and_bulk_inserts(self):
+        from .search import search_products
+        p = Product.objects.get(name='Banana chips')
+        p.name = 'Plantain chips'
+        p.save()
+        self.assertEqual(search_products('banana'), [])
+        Product.objects.bulk_create([Product(name='Banana bread', barcode='9')])
+        self.assertEqual([x.name for x in search_products('banana')], ['Banana bread'])
+        Product.objects.filter(barcode='9').delete()
+        self.assertEqual(search_products('banana'), [])
+
+    def test_api_answers_from_local_index(self):
+        with mock.patch.object(OffClient, 'search') as off_search:
+            resp = self.client.get(reverse('nutrition:api_product_search'), {'q': 'piens'})
+        off_search.assert_not_called()
+        data = resp.json()
+        self.assertEqual(data['source'], 'local')
+        self.assertEqual(data['results'][0]['name'], 'Piens Rīgas')
+
+
+class OffCacheTests(TestCase):
+    """
+    Pārbauda OpenFoodFacts atbilžu kešošanu: atslēgu normalizāciju, negatīvo TTL un stale-while-revalidate.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        from . import off_cache
+        cache.clear()
+        off_cache.reset_stats()
+        self.off_cache = off_cache
+
+    def test_search_key_is_normalized(self):
+        url = reverse('nutrition:api_product_search')
+        banana = [{'name': 'Banana', 'kcal': 89.0, 'protein': 1.1, 'fat': 0.3, 'carbs': 23.0}]
+        with mock.patch.object(OffClient, 'search', return_value=banana) as off_search:
+            first = self.client.get(url, {'q': 'Banana '})
+            second = self.client.get(url, {'q': '  banana'})
+        self.assertEqual(off_search.call_count, 1)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json()['results'][0]['kcal'], 89.0)
+        self.assertEqual(self.off_cache.stats(), {'hit': 1, 'miss': 1, 'stale': 0})
+
+    def test_not_found_is_cached_and_errors_are_not(self):
+        url = reverse('nutrition:api_product_lookup')
+        with mock.patch.object(OffClient, 'product', return_value=None) as off_product:
+            self.assertEqual(self.client.get(url, {'barcode': '000'}).status_code, 404)
+            self.assertEqual(self.client.get(url, {'barcode': '000'}).status_code, 404)
+        self.assertEqual(off_product.call_count, 1)
+        with mock.patch.object(OffClient, 'product', side_effect=requests.ConnectionError) as off_product:
+            self.assertEqual(self.client.get(url, {'barcode': '111'}).status_code, 502)
+            self.assertEqual(self.client.get(url, {'barcode': '111'}).status_code, 502)
+        self.assertEqual(off_product.call_count, 2)
+
+    def test_stale_entry_is_served_while_revalidating(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {'result': {'name': f'v{len(calls)}'}}, 200
+
+        with mock.patch.object(self.off_cache, '_spawn', side_effect=lambda target: target()):
+            self.off_cache.get_or_fetch('barcode', '42', fetch)
+            with mock.patch.object(self.off_cache.time, 'time', return_value=time.time() + self.off_cache.positive_ttl() + 1):
+                payload, status, state = self.off_cache.get_or_fetch('barcode', '42', fetch)
+            self.assertEqual((payload['result']['name'], state), ('v1', 'stale'))
+            payload, status, state = self.off_cache.get_or_fetch('barcode', '42', fetch)
+        self.assertEqual((payload['result']['name'], state), ('v2', 'hit'))
+
+    def test_ttl_settings_are_read_at_call_time(self):
+        fetch = lambda: ({'result': {'name': 'x'}}, 200)
+        with self.settings(OFF_CACHE_TTL=5):
+            self.off_cache.get_or_fetch('barcode', '77', fetch)
+            with mock.patch.object(self.off_cache.time, 'time', return_value=time.time() + 6), \
+                    mock.patch.object(self.off_cache, '_revalidate') as revalidate:
+                _payload, _status, state = self.off_cache.get_or_fetch('barcode', '77', fetch)
+        self.assertEqual(state, 'stale')
+        revalidate.assert_called_once()
+        self.assertEqual(self.off_cache.positive_ttl(), 6 * 60 * 60)
+
+
+class _StubOffHandler(BaseHTTPRequestHandler):
+    # Lokāls OFF aizstājējs: atbildes nosaka servera `plan` saraksts (statuss, JSON)
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        status, body = server.plan.pop(0) if server.plan else (200, {'status': 1, 'product': {'product_name': 'Milk', 'nutriments': {'energy-kcal_100g': 64}}})
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class OffClientTests(TestCase):
+    """
+    Pārbauda `OffClient` pret lokālu stub serveri: projekciju, atkārtojumus, circuit breaker un metriku.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubOffHandler)
+        self.server.plan = []
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = 'http://127.0.0.1:%d' % self.server.server_port
+
+    def _client(self, **kwargs):
+        from .off import CircuitBreaker
+        kwargs.setdefault('breaker', CircuitBreaker(threshold=2, cooldown=60))
+        return OffClient(base_url=self.base_url, timeout=2, backoff=0.001, **kwargs)
+
+    def test_product_uses_field_projection(self):
+        result = self._client().product('4750')
+        self.assertEqual(result, {'name': 'Milk', 'kcal': 64.0, 'protein': 0.0, 'fat': 0.0, 'carbs': 0.0, 'barcode': '4750'})
+        self.assertIn('/api/v0/product/4750.json?fields=code%2Cproduct_name', self.server.requests[0])
+
+    def test_retries_transient_errors(self):
+        from .off import OFF_LATENCY
+        before = OFF_LATENCY.snapshot(endpoint='product', outcome='error')['count']
+        self.server.plan = [(503, {}), (503, {})]
+        self.assertEqual(self._client(retries=2).product('1')['name'], 'Milk')
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(OFF_LATENCY.snapshot(endpoint='product', outcome='error')['count'] - before, 2)
+
+    def test_not_found_and_client_errors_are_not_retried(self):
+        self.server.plan = [(200, {'status': 0})]
+        self.assertIsNone(self._client().product('1'))
+        self.server.plan = [(400, {})]
+        with self.assertRaises(requests.HTTPError):
+            self._client().product('2')
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_circuit_breaker_fails_fast(self):
+        from .off import OffUnavailable
+        client = self._client(retries=0)
+        self.server.plan = [(503, {}), (503, {})]
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                client.product('1')
+        with self.assertRaises(OffUnavailable):
+            client.product('1')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(client.breaker.state, 'open')
+
+    def _half_open(self, client):
+        self.server.plan = [(503, {}), (503, {})]
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                client.product('1')
+        client.breaker._opened_at -= client.breaker.cooldown
+        self.assertEqual(client.breaker.state, 'half-open')
+
+    def test_client_error_on_half_open_probe_closes_breaker(self):
+        client = self._client(retries=0)
+        self._half_open(client)
+        self.server.plan = [(404, {})]
+        with self.assertRaises(requests.HTTPError):
+            client.product('1')
+        # OFF ir sasniedzams — breaker aizvērts, nākamie pieprasījumi iet cauri
+        self.assertEqual(client.breaker.state, 'closed')
+        self.assertEqual(client.product('2')['name'], 'Milk')
+
+    def test_unexpected_error_on_half_open_probe_releases_trial(self):
+        client = self._client(retries=0)
+        self._half_open(client)
+        with mock.patch.object(client.session, 'get', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                client.product('1')
+        self.assertEqual(client.breaker.state, 'half-open')
+        self.assertEqual(client.product('2')['name'], 'Milk')
+        self.assertEqual(client.breaker.state, 'closed')
+
+    def test_async_client_settles_half_open_probe(self):
+        import httpx
+        from .off import AsyncOffClient, CircuitBreaker
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+
+        async def run(status):
+            client = AsyncOffClient(base_url='http://off.test', breaker=breaker, retries=0)
+            client.http = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(status, content=b'not json')))
+            try:
+                await client.product('1')
+            finally:
+                await client.aclose()
+
+        # 200 ar nederīgu JSON — izmēģinājums atbrīvots, bet breaker paliek half-open
+        with self.assertRaises(requests.RequestException):
+            asyncio.run(run(200))
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertTrue(breaker.allow())
+        breaker.release()
+        with self.assertRaises(requests.RequestException):
+            asyncio.run(run(404))
+        self.assertEqual(breaker.state, 'closed')
+
+
+class AsyncProductViewsTests(TestCase):
+    """
+    Pārbauda asinhronos (ASGI) produktu skatus: lokālo katalogu, OFF klientu un rezerves ceļu bez httpx.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        Product.objects.create(name='Kefīrs', barcode='4750')
+
+    async def test_lookup_local_then_remote(self):
+        from .off import AsyncOffClient
+        url = reverse('nutrition:api_product_lookup_async')
+        resp = await self.async_client.get(url, {'barcode': '4750'})
+        self.assertEqual(resp.json()['result']['name'], 'Kefīrs')
+        remote = {'name': 'Milk', 'kcal': 64.0, 'protein': 3.2, 'fat': 3.6, 'carbs': 4.8, 'barcode': '111'}
+        with mock.patch.object(AsyncOffClient, 'product', new=mock.AsyncMock(return_value=remote)):
+            resp = await self.async_client.get(url, {'barcode': '111'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['result'], remote)
+        self.assertEqual(resp['X-Cache'], 'MISS')
+
+    async def test_search_falls_back_to_sync_client_without_httpx(self):
+        url = reverse('nutrition:api_product_search_async')
+        banana = [{'name': 'Banana', 'kcal': 89.0, 'protein': 1.1, 'fat': 0.3, 'carbs': 23.0}]
+        with mock.patch('nutrition.off.httpx', None), mock.patch.object(OffClient, 'search', return_value=banana):
+            resp = await self.async_client.get(url, {'q': 'banana'})
+        self.assertEqual(resp.json()['results'], banana)
+
+    async def test_remote_failure_maps_to_502(self):
+        from .off import AsyncOffClient
+        with mock.patch.object(AsyncOffClient, 'product', new=mock.AsyncMock(side_effect=requests.RequestException('down'))):
+            resp = await self.async_client.get(reverse('nutrition:api_product_lookup_async'), {'barcode': '222'})
+        self.assertEqual(resp.status_code, 502)
+
+
+class SingleFlightTests(TestCase):
+    """
+    Pārbauda identisku OFF pieprasījumu apvienošanu pavedienos, korutīnās un starp procesiem (kešatmiņas slēdzene).
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .singleflight import COALESCED
+        cache.clear()
+        COALESCED.reset()
+        self.cache = cache
+        self.coalesced = COALESCED
+
+    def test_concurrent_threads_share_one_fetch(self):
+        from . import off_cache
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'result': {'name': 'Banana'}}, 200
+
+        def worker(results):
+            barrier.wait()
+            results.append(off_cache.get_or_fetch('barcode', 'lunch', fetch)[0])
+
+        results = []
+        threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.coalesced.value(group='off', role='leader'), 1)
+        self.assertEqual(self.coalesced.value(group='off', role='coalesced'), 7)
+
+    def test_other_worker_waits_for_cached_result(self):
+        from . import off_cache, singleflight
+        key = off_cache.cache_key('barcode', '777')
+        self.assertTrue(singleflight.cache_lock(key))  # "cits worker" jau vaicā OFF
+
+        def other_worker_finishes():
+            time.sleep(0.1)
+            off_cache._store(key, {'result': {'name': 'Remote'}}, 200)
+            singleflight.cache_unlock(key)
+
+        threading.Thread(target=other_worker_finishes).start()
+        fetch = mock.Mock()
+        payload, status, state = off_cache.get_or_fetch('barcode', '777', fetch)
+        fetch.assert_not_called()
+        self.assertEqual(payload['result']['name'], 'Remote')
+        self.assertEqual(self.coalesced.value(group='off', role='remote_coalesced'), 1)
+
+    async def test_concurrent_coroutines_share_one_fetch(self):
+        from . import off_cache
+        calls = []
+
+        async def afetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {'results': []}, 200
+
+        results = await asyncio.gather(*(off_cache.aget_or_fetch('search', 'banana', afetch) for _ in range(5)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({r[1] for r in results}, {200})
+        self.assertEqual(self.coalesced.value(group='off', role='coalesced'), 4)
+
+
+class ProductLookupBatchTests(TestCase):
+    """
+    `api/product-lookup/batch/`: lokālie trāpījumi, paralēli OFF pieprasījumi un kopējais termiņš.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.url = reverse('nutrition:api_product_lookup_batch')
+        Product.objects.create(name='Local milk', calories_per_100g=46, protein_per_100g=3.2,
+                               fat_per_100g=1.5, carbs_per_100g=4.7, barcode='4750')
+
+    @staticmethod
+    def _slow_product(delay):
+        def product(self, barcode):
+            time.sleep(delay)
+            if barcode == 'missing':
+                return None
+            if barcode == 'broken':
+                raise requests.ConnectionError('down')
+            return {'name': 'Remote %s' % barcode, 'kcal': 10, 'protein': 0, 'fat': 0, 'carbs': 0}
+        return product
+
+    def test_mixed_results_in_input_order(self):
+        with mock.patch.object(OffClient, 'product', self._slow_product(0)):
+            resp = self.client.get(self.url, {'barcodes': '111,4750,missing,broken,111'})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.json()['results']
+        self.assertEqual([r['barcode'] for r in results], ['111', '4750', 'missing', 'broken'])
+        self.assertEqual(results[0]['result']['name'], 'Remote 111')
+        self.assertEqual(results[0]['source'], 'off')
+        self.assertEqual(results[1]['source'], 'local')
+        self.assertEqual((results[2]['status'], results[2]['error']), (404, 'Product not found'))
+        self.assertEqual(results[3]['status'], 502)
+
+    def test_misses_are_fetched_in_parallel(self):
+        codes = ['%d' % i for i in range(6)]
+        with mock.patch.object(OffClient, 'product', self._slow_product(0.3)):
+            started = time.monotonic()
+            resp = self.client.get(self.url, {'barcodes': ','.join(codes)})
+            elapsed = time.monotonic() - started
+        self.assertEqual([r['status'] for r in resp.json()['results']], [200] * 6)
+        # ~viens OFF apgrieziens, nevis seši pēc kārtas
+        self.assertLess(elapsed, 1.0)
+
+    def test_deadline_reports_unfinished_lookups(self):
+        with self.settings(OFF_BATCH_DEADLINE=0.1), mock.patch.object(OffClient, 'product', self._slow_product(0.5)):
+            resp = self.client.get(self.url, {'barcode': ['4750', 'slow']})
+        results = resp.json()['results']
+        self.assertEqual(results[0]['status'], 200)
+        self.assertEqual((results[1]['status'], results[1]['error']), (504, 'Lookup timed out'))
+
+    def test_validation(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        with self.settings(OFF_BATCH_MAX=2):
+            resp = self.client.get(self.url, {'barcodes': '1,2,3'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()['max'], 2)
+
+    def test_unexpected_error_affects_only_its_barcode(self):
+        def product(client, barcode):
+            if barcode == 'bad':
+                raise ValueError('cache backend exploded')
+            return {'name': 'Remote %s' % barcode, 'kcal': 10, 'protein': 0, 'fat': 0, 'carbs': 0}
+
+        with mock.patch.object(OffClient, 'product', product), self.assertLogs('nutrition.views', 'WARNING'):
+            resp = self.client.get(self.url, {'barcodes': 'bad,222'})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.json()['results']
+        self.assertEqual((results[0]['status'], results[0]['error']), (502, 'External lookup failed'))
+        self.assertEqual(results[1]['result']['name'], 'Remote 222')
+
+    def test_requests_share_one_bounded_pool(self):
+        from . import views
+        pool = views._batch_executor()
+        self.assertIs(views._batch_executor(), pool)
+        self.assertEqual(pool._max_workers, 8)
+        with mock.patch.object(OffClient, 'product', self._slow_product(0)):
+            for codes in ('1,2,3', '4,5,6'):
+                self.client.get(self.url, {'barcodes': codes})
+        self.assertIs(views._batch_executor(), pool)
+        self.assertLessEqual(len([t for t in threading.enumerate() if t.name.startswith('off-batch')]), 8)
+
+
+class BulkAddEntryTests(TestCase):
+    """
+    `api_add_entry` ar sarakstu: viens INSERT, kļūdas pa elementiem, rollup pa dienām.
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='bulk', password='pw')
+        self.client.login(username='bulk', password='pw')
+        self.url = reverse('nutrition:api_add_entry')
+
+    def _post(self, body):
+        return self.client.post(self.url, data=json.dumps(body), content_type='application/json')
+
+    def test_list_creates_valid_items_and_reports_errors(self):
+        resp = self._post([
+            {'name': 'Rice', 'amount': 200, 'kcal_per100': 130, 'carbs_per100': 28},
+            {'name': 'Bad', 'amount': -5},
+            {'name': 'Egg', 'kcal': 70, 'protein': 6},
+            'nope',
+        ])
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(len(data['ids']), 2)
+        self.assertEqual(data['errors'], [
+            {'index': 1, 'error': 'amount_must_be_positive'},
+            {'index': 3, 'error': 'invalid_item'},
+        ])
+        rice = Entry.objects.get(pk=data['ids'][0])
+        self.assertAlmostEqual(rice.kcal, 260.0)
+        totals = DailyTotals.objects.get(user=self.user)
+        self.assertAlmostEqual(totals.kcal, 330.0)
+        self.assertEqual(totals.entry_count, 2)
+
+    def test_entries_key_uses_single_insert(self):
+        items = [{'name': 'Item %d' % i, 'kcal': 10} for i in range(8)]
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self._post({'entries': items})
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "nutrition_entry"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(resp.json()['ids']), 8)
+        self.assertEqual(Entry.objects.filter(user=self.user).count(), 8)
+
+    def test_all_invalid_or_empty(self):
+        resp = self._post([{'kcal': -1}])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()['ids'], [])
+        self.assertEqual(self._post([]).json()['error'], 'no_entries')
+        self.assertFalse(Entry.objects.exists())
+
+
+class BulkEditDeleteTests(TestCase):
+    """
+    Paketes rediģēšana/dzēšana: īpašumtiesības, `bulk_update`, viens DELETE un rollup.
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='owner', password='pw')
+        self.other = User.objects.create_user(username='other', password='pw')
+        self.client.login(username='owner', password='pw')
+        self.product = Product.objects.create(name='Oats', calories_per_100g=380, protein_per_100g=13,
+                                              fat_per_100g=7, carbs_per_100g=60)
+        self.food = FoodEntry.objects.create(product=self.product, user=self.user, amount=50, initial_amount=50)
+        self.entry = Entry.objects.create(user=self.user, name='Shake', amount=200, kcal=240, protein=20,
+                                          kcal_per100=120, protein_per100=10)
+        self.foreign = Entry.objects.create(user=self.other, name='Not mine', amount=100, kcal=100)
+        from . import rollup
+        rollup.rebuild()
+
+    def _post(self, name, body):
+        return self.client.post(reverse('nutrition:' + name), data=json.dumps(body), content_type='application/json')
+
+    def test_bulk_edit(self):
+        resp = self._post('api_bulk_edit_entries', {'entries': [
+            {'origin': 'food', 'id': self.food.pk, 'amount': 100},
+            {'origin': 'entry', 'id': self.entry.pk, 'amount': 100},
+            {'origin': 'entry', 'id': self.foreign.pk, 'amount': 10},
+            {'origin': 'entry', 'id': self.entry.pk + 1000, 'amount': 10},
+            {'origin': 'food', 'id': self.food.pk, 'amount': 0},
+            {'origin': 'meal', 'id': 1},
+        ]})
+        data = resp.json()
+        self.assertTrue(data['success'])
+        by_origin = {u['origin']: u for u in data['updated']}
+        self.assertAlmostEqual(by_origin['food']['kcal'], 380.0)
+        self.assertAlmostEqual(by_origin['entry']['kcal'], 120.0)
+        self.assertEqual(sorted(e.get('index', e.get('id')) for e in data['errors']),
+                         sorted([4, 5, self.foreign.pk, self.entry.pk + 1000]))
+
+        self.entry.refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertAlmostEqual(self.entry.protein, 10.0)
+        self.assertEqual(self.foreign.amount, 100)
+        totals = DailyTotals.objects.get(user=self.user)
+        self.assertAlmostEqual(totals.kcal, 380.0 + 120.0)
+        self.assertEqual(totals.entry_count, 2)
+
+    def test_bulk_delete_only_owned(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self._post('api_bulk_delete_entries', [
+                {'origin': 'food', 'id': self.food.pk},
+                {'origin': 'entry', 'id': self.entry.pk},
+                {'origin': 'entry', 'id': self.foreign.pk},
+            ])
+        data = resp.json()
+        self.assertEqual(len(data['deleted']), 2)
+        self.assertEqual(data['errors'], [{'origin': 'entry', 'id': self.foreign.pk, 'error': 'not_found'}])
+        deletes = [q for q in ctx.captured_queries if q['sql'].startswith('DELETE FROM "nutrition_entry"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertFalse(FoodEntry.objects.filter(pk=self.food.pk).exists())
+        self.assertTrue(Entry.objects.filter(pk=self.foreign.pk).exists())
+        totals = DailyTotals.objects.get(user=self.user)
+        self.assertAlmostEqual(totals.kcal, 0.0)
+        self.assertEqual(totals.entry_count, 0)
+
+    def test_requires_login_and_valid_json(self):
+        self.assertEqual(self.client.post(reverse('nutrition:api_bulk_delete_entries'), data='{',
+                                          content_type='application/json').status_code, 400)
+        self.client.logout()
+        resp = self._post('api_bulk_delete_entries', [{'origin': 'entry', 'id': self.entry.pk}])
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(Entry.objects.filter(pk=self.entry.pk).exists())
+
+
+class ExportHistoryTests(TestCase):
+    """
+    Vēstures eksports: CSV/NDJSON, gzip, datumu filtrs, tikai savi ieraksti, komanda.
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='exporter', password='pw')
+        other = User.objects.create_user(username='someone', password='pw')
+        self.client.login(username='exporter', password='pw')
+        product = Product.objects.create(name='Bread', calories_per_100g=250, protein_per_100g=8,
+                                         fat_per_100g=3, carbs_per_100g=48)
+        old = FoodEntry.objects.create(product=product, user=self.user, amount=40, initial_amount=40)
+        FoodEntry.objects.filter(pk=old.pk).update(created_at=timezone.now() - timezone.timedelta(days=10))
+        FoodEntry.objects.create(product=product, user=self.user, amount=100, initial_amount=100)
+        Entry.objects.create(user=self.user, name='Juice, "fresh"', amount=250, kcal=110)
+        Entry.objects.create(user=other, name='Hidden', amount=1, kcal=1)
+        self.url = reverse('nutrition:export_history')
+
+    def _body(self, resp):
+        return b''.join(resp.streaming_content)
+
+    def test_csv_streams_own_rows_in_order(self):
+        import csv as csv_module
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        rows = list(csv_module.reader(self._body(resp).decode('utf-8').splitlines()))
+        self.assertEqual(rows[0][:2], ['origin', 'id'])
+        self.assertEqual([r[4] for r in rows[1:]], ['Bread', 'Bread', 'Juice, "fresh"'])
+        self.assertEqual(float(rows[2][6]), 250.0)
+        self.assertEqual({r[2] for r in rows[1:]}, {'exporter'})
+
+    def test_ndjson_gzip_and_date_range(self):
+        today = timezone.localdate().isoformat()
+        resp = self.client.get(self.url, {'format': 'ndjson', 'gzip': '1', 'start': today})
+        self.assertEqual(resp['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(self._body(resp)).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r['origin'] for r in records], ['food', 'entry'])
+        self.assertEqual(records[0]['kcal'], 250.0)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': '2024-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'end': 'yesterday'}).status_code, 400)
+
+    def test_command_writes_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'history.csv.gz')
+        call_command('export_history', '--gzip', '-o', path, '--chunk-size', '1')
+        with gzip.open(path, 'rt', encoding='utf-8') as fh:
+            lines = fh.read().splitlines()
+        # galvene + 4 ieraksti (visi lietotāji)
+        self.assertEqual(len(lines), 5)
+
+
+class HistoryImportTests(TestCase):
+    """
+    Vēstures imports: oriģinālais `created_at`, rindu kļūdas, partijas, atsākšana un augšupielāde.
+    """
+
+    CSV = (
+        'created_at,name,amount,kcal_per100,protein\n'
+        '2023-03-01 08:00,Porridge,250,70,6\n'
+        '2023-03-01 13:00,Soup,300,,\n'
+        'not-a-date,Broken,100,10,\n'
+        '2023-03-02,Apple,150,52,0.4\n'
+        '2023-03-02T19:00:00+02:00,Fish,-1,100,\n'
+    )
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='migrant', password='pw')
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def _write(self, name, text, compress=False):
+        path = os.path.join(self.tmp, name)
+        opener = gzip.open if compress else open
+        with opener(path, 'wt', encoding='utf-8') as fh:
+            fh.write(text)
+        return path
+
+    def test_command_imports_csv_with_original_timestamps(self):
+        import io
+        path = self._write('log.csv.gz', self.CSV, compress=True)
+        err = io.StringIO()
+        call_command('import_history', path, '--user', 'migrant', '--batch-size', '2', stdout=io.StringIO(), stderr=err)
+        names = list(Entry.objects.filter(user=self.user).order_by('created_at').values_list('name', flat=True))
+        self.assertEqual(names, ['Porridge', 'Soup', 'Apple'])
+        porridge = Entry.objects.get(name='Porridge')
+        self.assertEqual(timezone.localtime(porridge.created_at).strftime('%Y-%m-%d %H:%M'), '2023-03-01 08:00')
+        self.assertAlmostEqual(porridge.kcal, 175.0)
+
+        job = HistoryImport.objects.get()
+        self.assertTrue(job.finished)
+        self.assertEqual((job.rows, job.imported, job.failed), (5, 3, 2))
+        self.assertEqual(job.errors, [{'row': 3, 'error': 'invalid_created_at'},
+                                      {'row': 5, 'error': 'amount_must_be_positive'}])
+        self.assertIn('row 3: invalid_created_at', err.getvalue())
+        # rollup ir atjaunināts vēsturiskajām dienām
+        self.assertEqual(DailyTotals.objects.filter(user=self.user).count(), 2)
+
+    def test_resume_continues_after_last_committed_batch(self):
+        import io
+        from . import history
+        lines = ''.join('{"created_at": "2022-01-%02d", "name": "Day %d", "kcal": 100}\n' % (d, d) for d in range(1, 11))
+        path = self._write('log.ndjson', lines)
+        with open(path, 'rb') as fh:
+            fingerprint = history.fingerprint([fh.read()])
+        job = HistoryImport.objects.create(user=self.user, source=os.path.abspath(path), format='ndjson', **fingerprint)
+
+        calls = []
+
+        def crash(job):
+            calls.append(job.rows)
+            if len(calls) == 2:
+                raise RuntimeError('simulated crash')
+
+        with open(path, 'rb') as fh, self.assertRaises(RuntimeError):
+            history.run(job, fh, batch_size=3, progress=crash)
+        self.assertEqual(Entry.objects.count(), 6)
+
+        call_command('import_history', path, '--user', 'migrant', '--resume', '--batch-size', '3', stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertTrue(job.finished)
+        self.assertEqual(job.imported, 10)
+        self.assertEqual(Entry.objects.count(), 10)
+        self.assertEqual(Entry.objects.values('name').distinct().count(), 10)
+
+    def test_upload_endpoint_and_status(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        self.client.login(username='migrant', password='pw')
+        upload = SimpleUploadedFile('export.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        resp = self.client.post(reverse('nutrition:api_import_history'), {'file': upload})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual((data['imported'], data['failed'], data['finished']), (3, 2, True))
+        status = self.client.get(reverse('nutrition:api_import_history_status', args=[data['id']]))
+        self.assertEqual(status.json()['rows'], 5)
+        self.assertEqual(self.client.post(reverse('nutrition:api_import_history')).status_code, 400)
+
+    def test_resume_requires_the_same_file(self):
+        import io
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.core.management.base import CommandError
+        from . import history
+        self.client.login(username='migrant', password='pw')
+        content = self.CSV.encode('utf-8')
+        job = HistoryImport.objects.create(user=self.user, source='export.csv', format='csv',
+                                           offset=content.index(b'2023-03-02'), **history.fingerprint([content]))
+        url = reverse('nutrition:api_import_history')
+
+        def post(name, body, **extra):
+            return self.client.post(url, {'file': SimpleUploadedFile(name, body), 'resume': job.pk, **extra})
+
+        self.assertEqual(post('export.csv', content.replace(b'Apple', b'Pear!')).status_code, 409)
+        self.assertEqual(post('other.csv', content).status_code, 409)
+        self.assertEqual(post('export.csv', content, format='ndjson').status_code, 409)
+        self.assertEqual(Entry.objects.count(), 0)
+        resp = post('export.csv', content)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(Entry.objects.values_list('name', flat=True)), ['Apple'])
+
+        # komanda: fails mainīts kopš pārtrauktā importa
+        path = self._write('log.csv', self.CSV)
+        call_command('import_history', path, '--user', 'migrant', stdout=io.StringIO(), stderr=io.StringIO())
+        HistoryImport.objects.filter(source=os.path.abspath(path)).update(finished=False)
+        self._write('log.csv', self.CSV + '2023-03-03,Pear,100,57,\n')
+        with self.assertRaises(CommandError):
+            call_command('import_history', path, '--user', 'migrant', '--resume', stdout=io.StringIO())
+
+    def test_csv_quoted_newlines_and_offsets_at_record_boundaries(self):
+        import io
+        from . import ingest
+        text = ('created_at,name,amount,kcal_per100\n'
+                '2023-03-01,"Soup\nwith bread",300,40\n'
+                '2023-03-02,"Tea, ""green""",200,1\n')
+        data = text.encode('utf-8')
+        rows = list(ingest.iter_csv_rows(io.BytesIO(data)))
+        self.assertEqual([row['name'] for _end, row in rows], ['Soup\nwith bread', 'Tea, "green"'])
+        self.assertEqual([end for end, _row in rows], [data.index(b'2023-03-02'), len(data)])
+        # atsākšana no ieraksta robežas
+        resumed = list(ingest.iter_csv_rows(io.BytesIO(data), rows[0][0]))
+        self.assertEqual([row['name'] for _end, row in resumed], ['Tea, "green"'])
+
+        path = self._write('multi.csv', text)
+        call_command('import_history', path, '--user', 'migrant', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(sorted(Entry.objects.values_list('name', flat=True)), ['Soup\nwith bread', 'Tea, "green"'])
+
+
+class QueryPlanTests(TestCase):
+    """
+    `EXPLAIN QUERY PLAN` regresijas pārbaude: karstie skati nedrīkst pilnībā skenēt ierakstu tabulas.
+    """
+
+    def test_hot_views_use_indexes(self):
+        from . import queryplan
+        User = get_user_model()
+        user = User.objects.create_user(username='planner', password='pw')
+        product = Product.objects.create(name='Rye', calories_per_100g=250)
+        FoodEntry.objects.create(product=product, user=user, amount=80, initial_amount=80)
+        FoodEntry.objects.create(product=product, amount=50, initial_amount=50)
+        Entry.objects.create(user=user, name='Tea', amount=200, kcal=2)
+
+        report = queryplan.check(user)
+        self.assertEqual({(name, who) for name, who, *_ in report}, {
+            ('home', 'user'), ('home', 'anonymous'), ('progress', 'user'),
+            ('progress', 'anonymous'), ('api_daily_calories', 'user'), ('api_daily_calories', 'anonymous'),
+        })
+        for name, who, sql, plan, scans in report:
+            self.assertEqual(scans, [], '%s (%s) scans: %s' % (name, who, sql))
+        plans = '\n'.join(line for *_, plan, _scans in report for line in plan)
+        self.assertIn('nutrition_fe_user_created', plans)
+        self.assertIn('nutrition_entry_user_created', plans)
+
+    def test_full_scan_detection(self):
+        from . import queryplan
+        self.assertEqual(queryplan.full_scans(['SCAN nutrition_entry']), ['SCAN nutrition_entry'])
+        self.assertEqual(len(queryplan.full_scans(['SCAN nutrition_foodentry USING INDEX x'])), 1)
+        self.assertEqual(queryplan.full_scans([
+            'SEARCH nutrition_entry USING INDEX nutrition_entry_user_created (user_id=?)',
+            'SCAN auth_user',
+            'USE TEMP B-TREE FOR GROUP BY',
+        ]), [])
+
+    def test_command(self):
+        import io
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('use indexes', out.getvalue())
+
+
+class EntryHistoryApiTests(TestCase):
+    """
+    `api/entries/`: keyset lapošana pār abām tabulām, filtri, lapas izmēra ierobežojums.
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='scroller', password='pw')
+        self.client.login(username='scroller', password='pw')
+        product = Product.objects.create(name='Yogurt', calories_per_100g=60)
+        base = timezone.now() - timezone.timedelta(days=30)
+        self.expected = []
+        for i in range(9):
+            at = base + timezone.timedelta(days=i // 2)  # pa divi ieraksti ar vienādu laiku
+            fe = FoodEntry.objects.create(product=product, user=self.user, amount=100, initial_amount=100)
+            FoodEntry.objects.filter(pk=fe.pk).update(created_at=at)
+            ce = Entry.objects.create(user=self.user, name='Snack %d' % i, amount=50, kcal=100, created_at=at)
+            self.expected += [(at, 'food', fe.pk), (at, 'entry', ce.pk)]
+        self.expected.sort(reverse=True)
+        Entry.objects.create(user=User.objects.create_user(username='x'), name='Foreign', kcal=1)
+        self.url = reverse('nutrition:api_entries')
+
+    def _walk(self, queries=4, **params):
+        seen, cursor = [], None
+        while True:
+            query = dict(params, limit=4)
+            if cursor:
+                query['cursor'] = cursor
+            with self.assertNumQueries(queries):  # sesija + lietotājs + keyset vaicājums katrai tabulai
+                data = self.client.get(self.url, query).json()
+            seen += [(r['origin'], r['id']) for r in data['results']]
+            cursor = data['next']
+            if not cursor:
+                return seen
+
+    def test_pages_cover_history_once_in_order(self):
+        self.assertEqual(self._walk(), [(origin, pk) for _, origin, pk in self.expected])
+
+    def test_filters(self):
+        only_entries = self._walk(queries=3, origin='entry', q='snack')
+        self.assertEqual(len(only_entries), 9)
+        self.assertEqual({o for o, _ in only_entries}, {'entry'})
+        recent = self.client.get(self.url, {'start': timezone.localdate().isoformat()}).json()
+        self.assertEqual(recent, {'results': [], 'next': None})
+
+    def test_page_size_cap_and_bad_cursor(self):
+        from . import ledger
+        with mock.patch.object(ledger, 'MAX_PAGE_SIZE', 5):
+            data = self.client.get(self.url, {'limit': 10000}).json()
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNotNone(data['next'])
+        self.assertEqual(self.client.get(self.url, {'cursor': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'origin': 'meal'}).status_code, 400)
+
+    def test_deep_page_uses_index(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from . import ledger, queryplan
+        cursor = ledger.decode_cursor(self.client.get(self.url, {'limit': 10}).json()['next'])
+        with CaptureQueriesContext(connection) as ctx:
+            ledger.history_page(self.user, cursor=cursor, limit=10)
+        for query in ctx.captured_queries:
+            plan = queryplan.explain(query['sql'])
+            self.assertEqual(queryplan.full_scans(plan), [], plan)
+            self.assertTrue(any('user_created' in line for line in plan), plan)
+
+
+class SeedAndBenchmarkTests(TestCase):
+    """
+    Sintētisko datu ģenerators un skatu benchmarks (mazā apjomā).
+    """
+
+    def test_seed_is_consistent_and_clearable(self):
+        from . import aggregation, seed
+        counts = seed.seed(users=2, products=25, days=20, entries_per_day=3, public_days=5, prefix='t')
+        self.assertEqual(counts['users'], 2)
+        self.assertEqual(Product.objects.filter(barcode__startswith='t-').count(), 25)
+        self.assertEqual(FoodEntry.objects.count(), counts['food_entries'])
+        self.assertEqual(Entry.objects.count(), counts['entries'])
+        self.assertTrue(FoodEntry.objects.filter(user__isnull=True).exists())
+        oldest = FoodEntry.objects.filter(user__isnull=False).order_by('created_at').first()
+        self.assertGreaterEqual((timezone.localdate() - timezone.localtime(oldest.created_at).date()).days, 15)
+
+        # rollup atbilst neapstrādātajiem ierakstiem
+        expected = aggregation.aggregate_by_day(FoodEntry.objects.filter(user__isnull=False), Entry.objects.all())
+        for row in DailyTotals.objects.all():
+            self.assertAlmostEqual(row.kcal, expected[(row.user_id, row.day)]['kcal'], places=3)
+
+        # tas pats seed → tie paši dati
+        again = seed.seed(users=2, products=25, days=20, entries_per_day=3, public_days=5, prefix='u')
+        self.assertEqual(again, counts)
+
+        seed.clear('t')
+        seed.clear('u')
+        self.assertFalse(FoodEntry.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_benchmark_views_reports_percentiles(self):
+        import io
+        out = io.StringIO()
+        call_command('benchmark_views', '--sizes', '3', '--users', '1', '--iterations', '2',
+                     '--use-current-db', stdout=out)
+        run = json.loads(out.getvalue())['runs'][0]
+        self.assertEqual(set(run['views']), {'home', 'progress', 'api_daily_calories', 'api_add_entry', 'edit_entry'})
+        self.assertEqual(set(run['views']['home']), {'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'queries'})
+        self.assertFalse(get_user_model().objects.filter(username__startswith='bench-').exists())
+
+    def test_benchmark_views_fails_on_error_response(self):
+        from django.core.management.base import CommandError
+        from .management.commands.benchmark_views import Command
+        url = reverse('nutrition:edit_entry', args=[999999])
+        with self.assertRaisesMessage(CommandError, '%s returned ' % url):
+            Command()._measure(lambda: self.client.post(url, '{}', content_type='application/json'), 1)
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Vaicājumu budžets katram `nutrition/urls.py` URL un admin sarakstiem.
+
+    Katrs skats tiek izsaukts pret ģenerētiem datiem divos apjomos; vaicājumu
+    skaits nedrīkst pārsniegt budžetu un nedrīkst augt līdz ar rindu skaitu
+    (N+1 regresija, piem. `fe.product.name` ciklā vai `calories` adminā).
+    Jaunam URL jāpievieno budžets `BUDGETS`, citādi tests krīt.
+    """
+
+    # vēstures dienas uz lietotāju katrā kārtā
+    SIZES = (2, 12)
+
+    BUDGETS = {
+        'login': 2,
+        'logout': 4,
+        'home': 8,  # ieskaitot Profile get_or_create pirmajā apmeklējumā
+        'profile': 3,
+        'add_meal': 0,  # GET tikai pāradresē
+        'calculator': 3,
+        'progress': 4,
+        'signup': 2,
+        'products': 3,
+        'api_product_search': 1,
+        'api_product_lookup': 1,
+        'api_product_lookup_batch': 1,
+        'api_product_search_async': 1,
+        'api_product_lookup_async': 1,
+        'api_import_history': 16,  # 2 rindas / 2 dienas augšupielādētajā failā
+        'api_import_history_status': 3,
+        'export_history': 4,
+        'api_daily_calories': 3,
+        'api_daily_calories_range': 3,
+        'api_add_entry': 6,
+        'api_entries': 4,
+        'api_bulk_edit_entries': 9,
+        'api_bulk_delete_entries': 9,
+        'edit_entry': 8,
+        'delete_entry': 7,
+    }
+    ADMIN_BUDGET = 8
+
+    def _dataset(self, days):
+        from . import seed
+        prefix = 'qb%d' % days
+        seed.seed(users=2, products=10 + days, days=days, entries_per_day=4, public_days=days, prefix=prefix)
+        User = get_user_model()
+        user = User.objects.filter(username__startswith=prefix + '-user-').order_by('id').first()
+        user.is_staff = user.is_superuser = True
+        user.save(update_fields=['is_staff', 'is_superuser'])
+        self.client.force_login(user)
+        # rediģējamie/dzēšamie ieraksti — šodien, lai rollup skartu vienu un to pašu dienu
+        product = Product.objects.filter(barcode__startswith=prefix).first()
+        foods = [FoodEntry.objects.create(product=product, user=user, amount=100, initial_amount=100).pk for _ in range(4)]
+        entries = [Entry.objects.create(user=user, name='Edit me', amount=100, kcal=50).pk for _ in range(2)]
+        job = HistoryImport.objects.create(user=user, source='x.csv', format='csv')
+        barcodes = list(Product.objects.filter(barcode__startswith=prefix).values_list('barcode', flat=True)[:3])
+        return user, foods, entries, job, barcodes
+
+    def _calls(self, foods, entries, job, barcodes):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        c = self.client
+
+        def post_json(name, body, *args):
+            return c.post(reverse('nutrition:' + name, args=args), json.dumps(body), content_type='application/json')
+
+        def consume(resp):
+            if resp.streaming:
+                b''.join(resp.streaming_content)
+            return resp
+
+        upload = 'created_at,name,kcal\n2024-01-01,A,10\n2024-01-02,B,20\n'
+        history_url = c.get(reverse('nutrition:api_daily_calories'), {'days': 30}).json()['history']['url']
+        return {
+            'login': lambda: c.get(reverse('nutrition:login')),
+            'logout': lambda: c.post(reverse('nutrition:logout')),
+            'home': lambda: c.get(reverse('nutrition:home')),
+            'profile': lambda: c.get(reverse('nutrition:profile')),
+            'add_meal': lambda: c.get(reverse('nutrition:add_meal')),
+            'calculator': lambda: c.get(reverse('nutrition:calculator')),
+            'progress': lambda: c.get(reverse('nutrition:progress')),
+            'signup': lambda: c.get(reverse('nutrition:signup')),
+            'products': lambda: c.get(reverse('nutrition:products')),
+            'api_product_search': lambda: c.get(reverse('nutrition:api_product_search'), {'q': 'oat'}),
+            'api_product_lookup': lambda: c.get(reverse('nutrition:api_product_lookup'), {'barcode': barcodes[0]}),
+            'api_product_lookup_batch': lambda: c.get(reverse('nutrition:api_product_lookup_batch'),
+                                                      {'barcodes': ','.join(barcodes)}),
+            'api_product_search_async': lambda: c.get(reverse('nutrition:api_product_search_async'), {'q': 'oat'}),
+            'api_product_lookup_async': lambda: c.get(reverse('nutrition:api_product_lookup_async'),
+                                                      {'barcode': barcodes[0]}),
+            'api_import_history': lambda: c.post(reverse('nutrition:api_import_history'),
+                                                 {'file': SimpleUploadedFile('h.csv', upload.encode('utf-8'))}),
+            'api_import_history_status': lambda: c.get(reverse('nutrition:api_import_history_status', args=[job.pk])),
+            'export_history': lambda: consume(c.get(reverse('nutrition:export_history'))),
+            'api_daily_calories': lambda: c.get(reverse('nutrition:api_daily_calories'), {'days': 30}),
+            'api_daily_calories_range': lambda: c.get(history_url),
+            'api_add_entry': lambda: post_json('api_add_entry', [{'name': 'A', 'kcal': 1}, {'name': 'B', 'kcal': 2}]),
+            'api_entries': lambda: c.get(reverse('nutrition:api_entries'), {'limit': 20}),
+            'api_bulk_edit_entries': lambda: post_json('api_bulk_edit_entries', [
+                {'origin': 'food', 'id': foods[0], 'amount': 90}, {'origin': 'entry', 'id': entries[0], 'amount': 90}]),
+            'api_bulk_delete_entries': lambda: post_json('api_bulk_delete_entries', [
+                {'origin': 'food', 'id': foods[1]}, {'origin': 'entry', 'id': entries[1]}]),
+            'edit_entry': lambda: post_json('edit_entry', {'amount': 80}, foods[2]),
+            'delete_entry': lambda: post_json('delete_entry', {}, foods[3]),
+        }
+
+    def _count(self, call):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            resp = call()
+        self.assertLess(resp.status_code, 500)
+        return len(ctx.captured_queries)
+
+    def test_every_url_has_a_budget(self):
+        from django.urls import URLPattern
+        from . import urls
+        names = {p.name for p in urls.urlpatterns if isinstance(p, URLPattern) and p.name}
+        self.assertEqual(names - set(self.BUDGETS), set(), 'URLs without a query budget')
+
+    def test_views_stay_within_budget_as_data_grows(self):
+        from django.core.cache import cache
+        counts = {}
+        with mock.patch.object(OffClient, 'search', return_value=[]), \
+                mock.patch.object(OffClient, 'product', return_value=None):
+            for days in self.SIZES:
+                cache.clear()
+                _user, foods, entries, job, barcodes = self._dataset(days)
+                for name, call in self._calls(foods, entries, job, barcodes).items():
+                    counts.setdefault(name, []).append(self._count(call))
+                    if name == 'logout':
+                        self.client.force_login(_user)
+        for name, observed in counts.items():
+            with self.subTest(url=name):
+                self.assertLessEqual(max(observed), self.BUDGETS[name], observed)
+                self.assertEqual(len(set(observed)), 1, 'query count grows with data: %s' % observed)
+
+    def test_admin_changelists_stay_within_budget(self):
+        from django.contrib import admin
+        counts = {}
+        for days in self.SIZES:
+            self._dataset(days)
+            for model in admin.site._registry:
+                url = reverse('admin:%s_%s_changelist' % (model._meta.app_label, model._meta.model_name))
+                counts.setdefault(model._meta.label, []).append(self._count(lambda: self.client.get(url)))
+        for label, observed in counts.items():
+            with self.subTest(model=label):
+                self.assertLessEqual(max(observed), self.ADMIN_BUDGET, observed)
+                self.assertEqual(len(set(observed)), 1, 'query count grows with data: %s' % observed)
+
+
+class ServerTimingTests(TestCase):
+    """
+    `ServerTimingMiddleware`: `Server-Timing` galvene, JSON log rinda un izlase.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='timed', password='pw')
+        self.client.force_login(self.user)
+        Entry.objects.create(user=self.user, name='Rice', amount=100, kcal=130)
+
+    @staticmethod
+    def _metrics(header):
+        # 'db;dur=1.2;desc="3 queries", tpl;dur=0.4' -> {'db': {'dur': '1.2', 'desc': '"3 queries"'}, ...}
+        metrics = {}
+        for part in header.split(', '):
+            name, *params = part.split(';')
+            metrics[name] = dict(p.split('=', 1) for p in params)
+        return metrics
+
+    def test_header_and_log_line(self):
+        with self.assertLogs('nutrition.middleware', 'INFO') as logs:
+            resp = self.client.get(reverse('nutrition:home'))
+        self.assertEqual(resp.status_code, 200)
+        metrics = self._metrics(resp['Server-Timing'])
+        self.assertEqual(set(metrics), {'db', 'tpl', 'off', 'total'})
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'nutrition:home')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertEqual(metrics['db']['desc'], '"%d queries"' % record['db_queries'])
+        self.assertEqual(record['off_calls'], 0)
+
+    def test_template_time_comes_from_backend_not_patch(self):
+        from django.template import engines
+        from django.template.backends import django as django_backend
+        from .template_backend import TimedDjangoTemplates, TimedTemplate
+        # Django klase paliek neskarta; mēra tikai mūsu backend
+        self.assertIs(django_backend.Template.render, django_backend.Template.__dict__['render'])
+        engine, = engines.all()
+        self.assertIsInstance(engine, TimedDjangoTemplates)
+        self.assertIsInstance(engine.from_string('x'), TimedTemplate)
+        from . import timing
+        current, token = timing.start()
+        try:
+            self.assertEqual(engine.from_string('{{ a }}').render({'a': 1}), '1')
+        finally:
+            timing.stop(token)
+        self.assertEqual(current.counts['tpl'], 1)
+
+    def test_off_time_includes_batch_worker_threads(self):
+        from . import off
+
+        def slow_get(session, url, params=None, timeout=None):
+            time.sleep(0.02)
+            response = mock.Mock()
+            response.json.return_value = {'status': 1, 'product': {'product_name': 'Remote', 'nutriments': {}}}
+            return response
+
+        off._client = None
+        self.addCleanup(setattr, off, '_client', None)
+        with mock.patch('requests.Session.get', slow_get), self.assertLogs('nutrition.middleware', 'INFO') as logs:
+            resp = self.client.get(reverse('nutrition:api_product_lookup_batch'), {'barcodes': '11,22'})
+        self.assertEqual(resp.status_code, 200)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['off_calls'], 2)
+        self.assertGreaterEqual(record['off_ms'], 40)
+        self.assertIn('off;dur=', resp['Server-Timing'])
+
+    def test_sampling_and_header_switch(self):
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=0), self.assertNoLogs('nutrition.middleware', 'INFO'):
+            resp = self.client.get(reverse('nutrition:home'))
+        self.assertNotIn('Server-Timing', resp)
+        with self.settings(SERVER_TIMING_HEADER=False), self.assertLogs('nutrition.middleware', 'INFO'):
+            resp = self.client.get(reverse('nutrition:progress'))
+        self.assertNotIn('Server-Timing', resp)
+
+    async def test_asgi_stack_runs_without_adaptation(self):
+        import logging
+        await Product.objects.acreate(name='Kefir', calories_per_100g=41, barcode='4751')
+        with self.settings(DEBUG=True), self.assertLogs('django.request', 'DEBUG') as logs:
+            logging.getLogger('django.request').debug('ASGI request')
+            resp = await self.async_client.get(reverse('nutrition:api_product_lookup_async'), {'barcode': '4751'})
+        self.assertEqual(resp.status_code, 200)
+        adapted = [r.getMessage() for r in logs.records if 'ServerTimingMiddleware' in r.getMessage()]
+        self.assertEqual(adapted, [])
+        # async ORM vaicājums (`sync_to_async` pavedienā) ir ieskaitīts
+        self.assertEqual(self._metrics(resp['Server-Timing'])['db']['desc'], '"1 queries"')
+
+
+class MetricsEndpointTests(TestCase):
+    """
+    `/metrics`: Prometheus teksta formāts, skatu/OFF/kešatmiņas metrikas un vairāku procesu apvienošana.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='scraped', password='pw')
+        self.client.force_login(self.user)
+
+    def _scrape(self, **extra):
+        resp = self.client.get(reverse('metrics'), **extra)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return resp.content.decode('utf-8')
+
+    @staticmethod
+    def _value(text, sample):
+        for line in text.splitlines():
+            if line.startswith(sample + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        return 0.0
+
+    def test_view_latency_and_query_counts(self):
+        before = self._value(self._scrape(), 'http_request_duration_seconds_count{status="200",view="nutrition:api_daily_calories"}')
+        self.client.get(reverse('nutrition:api_daily_calories'))
+        text = self._scrape()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertEqual(self._value(text, 'http_request_duration_seconds_count{status="200",view="nutrition:api_daily_calories"}') - before, 1)
+        self.assertIn('http_request_duration_seconds_bucket{status="200",view="nutrition:api_daily_calories",le="+Inf"}', text)
+        self.assertGreater(self._value(text, 'db_queries_total{view="nutrition:api_daily_calories"}'), 0)
+
+    def test_off_cache_and_entry_counters(self):
+        created = 'nutrition_entries_created_total{origin="entry"}'
+        before = self._scrape()
+        with mock.patch.object(OffClient, 'search', return_value=[]):
+            self.client.get(reverse('nutrition:api_product_search'), {'q': 'kefir'})
+            self.client.get(reverse('nutrition:api_product_search'), {'q': 'kefir'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('nutrition:api_add_entry'), data=json.dumps([{'name': 'A', 'kcal': 10}, {'name': 'B', 'kcal': 20}]),
+                             content_type='application/json')
+        text = self._scrape()
+        self.assertEqual(self._value(text, created) - self._value(before, created), 2)
+        self.assertIn('off_cache_lookups_total{kind="search",result="hit"}', text)
+        self.assertIn('# TYPE off_cache_hit_ratio gauge', text)
+        self.assertIn('# TYPE off_request_seconds histogram', text)
+
+    def test_forbidden_outside_allowed_ips(self):
+        resp = self.client.get(reverse('metrics'), REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(resp.status_code, 403)
+        with self.settings(METRICS_ALLOWED_IPS=None):
+            self._scrape(REMOTE_ADDR='10.1.2.3')
+
+    def test_multiprocess_directory_sums_workers(self):
+        from . import metrics
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # cita worker procesa fails
+        other = {
+            'db_queries_total': {'type': 'counter', 'help': 'x', 'samples': [[{'view': 'nutrition:home'}, 1000]]},
+            'worker_only_seconds': {'type': 'histogram', 'help': 'x', 'buckets': [1, 2],
+                                    'samples': [[{}, {'counts': [1, 0, 2], 'sum': 9.5, 'count': 3}]]},
+        }
+        with open(os.path.join(directory, 'metrics_999999.json'), 'w') as fh:
+            json.dump(other, fh)
+        with self.settings(METRICS_MULTIPROC_DIR=directory):
+            self.client.get(reverse('nutrition:home'))
+            text = self._scrape()
+        self.assertIn('metrics_%d.json' % os.getpid(), os.listdir(directory))
+        self.assertGreater(self._value(text, 'db_queries_total{view="nutrition:home"}'), 1000)
+        self.assertEqual(self._value(text, 'worker_only_seconds_bucket{le="2.0"}'), 1)
+        self.assertEqual(self._value(text, 'worker_only_seconds_bucket{le="+Inf"}'), 3)
+        self.assertEqual(self._value(text, 'worker_only_seconds_sum'), 9.5)
+
+    async def test_asgi_requests_are_counted_without_adaptation(self):
+        import logging
+        from asgiref.sync import sync_to_async
+        from . import metrics
+        await Product.objects.acreate(name='Kefir', calories_per_100g=41, barcode='4751')
+        sample = 'db_queries_total{view="nutrition:api_product_lookup_async"}'
+        before = self._value(await sync_to_async(self._scrape)(), sample)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with self.settings(DEBUG=True, METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_INTERVAL=0), \
+                self.assertLogs('django.request', 'DEBUG') as logs:
+            logging.getLogger('django.request').debug('ASGI request')
+            resp = await self.async_client.get(reverse('nutrition:api_product_lookup_async'), {'barcode': '4751'})
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn('metrics_%d.json' % os.getpid(), os.listdir(directory))
+            text = metrics.render(metrics.collect())
+        # neviens middleware netiek pārslēgts uz sinhrono režīmu
+        self.assertEqual([r.getMessage() for r in logs.records if 'adapted for middleware' in r.getMessage()], [])
+        self.assertEqual(self._value(text, sample) - before, 1)
+
+
+class HomeFragmentCacheTests(TestCase):
+    """
+    `home` ierakstu saraksta un kopsummu fragmenti: kešatmiņa līdz nākamajai rakstīšanai.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='cached', password='pw')
+        self.client.force_login(self.user)
+        self.entry = Entry.objects.create(user=self.user, name='Porridge', amount=100, kcal=120)
+
+    def _home(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('nutrition:home'))
+        self.assertEqual(resp.status_code, 200)
+        entry_queries = [q['sql'] for q in ctx.captured_queries
+                         if 'FROM "nutrition_entry"' in q['sql'] or 'FROM "nutrition_foodentry"' in q['sql']]
+        return resp.content.decode('utf-8'), entry_queries
+
+    def test_repeat_visit_skips_entry_queries(self):
+        first, queries = self._home()
+        self.assertIn('Porridge', first)
+        self.assertEqual(len(queries), 2)
+        second, queries = self._home()
+        self.assertEqual(queries, [])
+        self.assertIn('Porridge', second)
+        self.assertIn('id="totCalories" style="font-weight:800; font-size:1.1rem;">120.0<', second)
+
+    def test_writes_bump_the_version(self):
+        self._home()
+        self.client.post(reverse('nutrition:api_add_entry'), data=json.dumps({'name': 'Soup', 'kcal': 80}),
+                         content_type='application/json')
+        html, queries = self._home()
+        self.assertIn('Soup', html)
+        self.assertEqual(len(queries), 2)
+
+        self.client.post(reverse('nutrition:delete_entry', args=[self.entry.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        html, _ = self._home()
+        self.assertNotIn('Porridge', html)
+
+    def test_fragments_are_per_user(self):
+        self._home()
+        other = get_user_model().objects.create_user(username='other', password='pw')
+        self.client.force_login(other)
+        html, queries = self._home()
+        self.assertNotIn('Porridge', html)
+        self.assertEqual(len(queries), 2)
+
+    def test_version_survives_eviction_without_reuse(self):
+        from django.core.cache import cache
+        from . import fragments
+        today = timezone.localdate()
+        before = fragments.version(self.user.pk, today)
+        cache.delete(fragments._key(self.user.pk, today))
+        fragments.bump(self.user.pk, today)
+        self.assertNotEqual(fragments.version(self.user.pk, today), before)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    ETag / Last-Modified: 304 bez agregācijas vaicājumiem, kamēr lietotāja dati nav mainīti.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='etag', password='pw')
+        self.client.force_login(self.user)
+        from . import rollup
+        rollup.record_entry(Entry.objects.create(user=self.user, name='Toast', amount=50, kcal=150))
+
+    def _get(self, name, **headers):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse(name), **headers)
+        nutrition_queries = [q['sql'] for q in ctx.captured_queries if '"nutrition_' in q['sql']]
+        return resp, nutrition_queries
+
+    def test_not_modified_skips_queries(self):
+        for name in ('nutrition:api_daily_calories', 'nutrition:progress', 'nutrition:home'):
+            with self.subTest(view=name):
+                first, _ = self._get(name)
+                self.assertEqual(first.status_code, 200)
+                self.assertIn('no-cache', first['Cache-Control'])
+                # lapām otrajā pieprasījumā jau ir CSRF sīkfails (ETag to ietver)
+                second, _ = self._get(name)
+                resp, queries = self._get(name, HTTP_IF_NONE_MATCH=second['ETag'])
+                self.assertEqual(resp.status_code, 304)
+                self.assertEqual(queries, [])
+
+    def test_entry_write_changes_etag(self):
+        name = 'nutrition:api_daily_calories'
+        first, _ = self._get(name)
+        self.client.post(reverse('nutrition:api_add_entry'), data=json.dumps({'name': 'Jam', 'kcal': 40}),
+                         content_type='application/json')
+        resp, queries = self._get(name, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], first['ETag'])
+        self.assertEqual(json.loads(resp.content)['calories'][-1], 190.0)
+        self.assertTrue(queries)
+
+    def test_profile_save_and_other_users(self):
+        name = 'nutrition:progress'
+        self._get(name)
+        etag = self._get(name)[0]['ETag']
+        self.client.post(reverse('nutrition:profile'), {'age': 30, 'sex': 'M', 'weight': 80, 'height': 180,
+                                                        'activity_level': '1.55', 'goal': 'maintain'})
+        self.assertEqual(self._get(name, HTTP_IF_NONE_MATCH=etag)[0].status_code, 200)
+
+        api_etag = self._get('nutrition:api_daily_calories')[0]['ETag']
+        self.client.force_login(get_user_model().objects.create_user(username='etag2', password='pw'))
+        self.assertEqual(self._get('nutrition:api_daily_calories', HTTP_IF_NONE_MATCH=api_etag)[0].status_code, 200)
+
+    def test_if_modified_since_fallback(self):
+        first, _ = self._get('nutrition:api_daily_calories')
+        resp, queries = self._get('nutrition:api_daily_calories', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(queries, [])
+
+
+class FinalizedDaysTests(TestCase):
+    """
+    Slēgtās dienas: iesaldētas sērijas, nemainīgs intervāla URL un vēlas labošanas invalidācija.
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+        import datetime as dt
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='final', password='pw')
+        self.client.force_login(self.user)
+        self.today = timezone.localdate()
+        self.yesterday = self.today - dt.timedelta(days=1)
+        DailyTotals.objects.create(user=self.user, day=self.yesterday, kcal=500, entry_count=1)
+        DailyTotals.objects.create(user=self.user, day=self.today, kcal=100, entry_count=1)
+
+    def _series(self, days=7):
+        resp = self.client.get(reverse('nutrition:api_daily_calories'), {'days': days})
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_closed_days_are_frozen(self):
+        from . import ledger
+        self.assertEqual(ledger.daily_calories(self.user, 7)[1][-2:], [500, 100])
+        # tieša DB maiņa (bez rollup) pagātnes dienai netiek redzēta, šodiena — tiek
+        DailyTotals.objects.filter(day=self.yesterday).update(kcal=999)
+        DailyTotals.objects.filter(day=self.today).update(kcal=150)
+        with self.assertNumQueries(1):
+            self.assertEqual(ledger.daily_calories(self.user, 7)[1][-2:], [500, 150])
+
+    def test_immutable_range_url(self):
+        data = self._series()
+        history = data['history']
+        self.assertEqual(history['end'], self.yesterday.isoformat())
+        resp = self.client.get(history['url'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('immutable', resp['Cache-Control'])
+        self.assertEqual(resp.json(), {'dates': data['dates'][:-1], 'calories': data['calories'][:-1]})
+
+        other = get_user_model().objects.create_user(username='final2', password='pw')
+        self.client.force_login(other)
+        resp = self.client.get(history['url'])
+        self.assertEqual(resp.status_code, 302)
+        self.assertNotEqual(resp['Location'], history['url'])
+
+    def test_late_edit_invalidates(self):
+        import datetime as dt
+        from . import rollup
+        old_url = self._series()['history']['url']
+        # vēls ieraksts pagājušajā dienā (kā vēstures importā) iet caur rollup → invalidācija
+        created_at = timezone.make_aware(dt.datetime.combine(self.yesterday, dt.time(12)))
+        rollup.record_entry(Entry.objects.create(user=self.user, name='Late dinner', kcal=250, created_at=created_at))
+        data = self._series()
+        self.assertEqual(data['calories'][-2], 750)
+        self.assertNotEqual(data['history']['url'], old_url)
+        resp = self.client.get(old_url)
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp['Location'], data['history']['url'])
+
+        # `rebuild_daily_totals` (rollup.rebuild) atsauc visu lietotāju iesaldētās dienas
+        rollup.rebuild()
+        self.assertEqual(self._series()['calories'][-2], 250)
+
+    def test_rejects_open_or_invalid_ranges(self):
+        url = reverse('nutrition:api_daily_calories_range', args=[self.today.isoformat(), self.today.isoformat(), 'x'])
+        self.assertEqual(self.client.get(url).status_code, 400)
+        url = reverse('nutrition:api_daily_calories_range', args=['2024-13-01', '2024-01-02', 'x'])
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+
+class JsCatalogTests(TestCase):
+    """
+    Iepriekš uzbūvētie JavaScript tulkojumu katalogi un `{% js_catalog_url %}`.
+    """
+
+    def setUp(self):
+        from . import jscatalog
+        self.jscatalog = jscatalog
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_build_writes_hashed_catalog_per_language(self):
+        manifest = self.jscatalog.build(self.dir)
+        self.assertEqual(set(manifest), {'en', 'lv', 'ru'})
+        for language, path in manifest.items():
+            name = path.rsplit('/', 1)[1]
+            self.assertRegex(name, r'^%s\.[0-9a-f]{12}\.js$' % language)
+        with open(os.path.join(self.dir, manifest['lv'].rsplit('/', 1)[1]), encoding='utf-8') as fh:
+            self.assertIn('Ievadiet produkta nosaukumu', fh.read())
+        self.assertEqual(self.jscatalog.outdated(self.dir), [])
+
+        # vecā versija tiek izdzēsta, manifestā paliek tikai aktuālā
+        stale = os.path.join(self.dir, 'lv.000000000000.js')
+        open(stale, 'w').close()
+        self.jscatalog.build(self.dir)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_check_detects_outdated_catalogs(self):
+        self.jscatalog.build(self.dir)
+        with open(os.path.join(self.dir, 'manifest.json'), 'w') as fh:
+            json.dump({'en': 'nutrition/jsi18n/en.000000000000.js'}, fh)
+        self.assertEqual(self.jscatalog.outdated(self.dir), ['en', 'lv', 'ru'])
+        from django.core.management.base import CommandError
+        with self.assertRaises(CommandError):
+            call_command('build_js_catalogs', '--check', '--output', self.dir)
+
+    def test_shipped_catalogs_are_up_to_date(self):
+        import io
+        call_command('build_js_catalogs', '--check', stdout=io.StringIO())
+
+    def test_template_tag_prefers_static_catalog(self):
+        from django.template import Context, Template
+        from django.utils import translation
+        template = Template('{% load nutrition_extras %}{% js_catalog_url %}')
+        with translation.override('lv'):
+            self.assertRegex(template.render(Context()), r'^/static/nutrition/jsi18n/lv\.[0-9a-f]{12}\.js$')
+        with mock.patch.object(self.jscatalog, '_manifest', return_value={}), translation.override('lv'):
+            self.assertEqual(template.render(Context()), reverse('javascript-catalog'))
+
+
+class AssetPipelineTests(TestCase):
+    """
+    Apvienotie/minificētie statiskie faili, `collectstatic` ar jauktiem nosaukumiem
+    un `.gz` kopijām, un `static_asset` skats.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from django.test import override_settings
+        cls.root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(STATIC_ROOT=cls.root)
+        cls.settings_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.settings_override.disable()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def setUp(self):
+        from . import assets
+        self.assets = assets
+        with open(os.path.join(self.root, 'staticfiles.json'), encoding='utf-8') as fh:
+            self.manifest = json.load(fh)['paths']
+
+    def test_minify_keeps_literals_and_line_breaks(self):
+        source = (
+            "// komentārs\n"
+            "var a = 'x // y', b = `t ${ {k: 1}.k } /* z */`; /* bloks */\n"
+            "const re = /a[/]b\\//g, c = a / 2 / b;\n"
+            "return a - -b + ++c\n"
+        )
+        self.assertEqual(
+            self.assets.minify_js(source),
+            "var a='x // y',b=`t ${ {k: 1}.k } /* z */`;\n"
+            "const re=/a[/]b\\//g,c=a/2/b;\n"
+            "return a- -b+ ++c",
+        )
+        self.assertEqual(
+            self.assets.minify_css('a :hover { color: red ; content: "a , b" } /* c */ @media (max-width: 9px) { .x > p { margin: 0 auto; } }'),
+            'a :hover{color:red;content:"a , b"}@media (max-width:9px){.x>p{margin:0 auto}}',
+        )
+
+    def test_shipped_bundles_are_up_to_date(self):
+        import io
+        call_command('build_static_assets', '--check', stdout=io.StringIO())
+        self.assertEqual(self.assets.outdated(), [])
+
+    def test_pages_load_bundles(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, '/static/nutrition/dist/home.js')
+        self.assertContains(response, '/static/nutrition/dist/style.css')
+        self.assertNotContains(response, 'nutrition/js/common.js')
+
+    def test_collectstatic_hashes_and_compresses(self):
+        hashed = self.manifest['nutrition/dist/home.js']
+        self.assertRegex(hashed, r'^nutrition/dist/home\.[0-9a-f]{12}\.js$')
+        with open(os.path.join(self.root, hashed), 'rb') as fh:
+            content = fh.read()
+        with gzip.open(os.path.join(self.root, hashed + '.gz')) as fh:
+            self.assertEqual(fh.read(), content)
+
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        from django.test import override_settings
+        with override_settings(STATIC_ROOT=self.root, DEBUG=False):
+            self.assertEqual(staticfiles_storage.url('nutrition/dist/home.js'), '/static/' + hashed)
+
+    def test_static_asset_serves_precompressed_copy(self):
+        from django.test import override_settings
+        hashed = self.manifest['nutrition/dist/style.css']
+        with override_settings(STATIC_ROOT=self.root, SERVE_STATIC=True):
+            response = self.client.get('/static/' + hashed, HTTP_ACCEPT_ENCODING='gzip, deflate, br;q=0')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Type'], 'text/css')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(response['Cache-Control'], self.assets.CACHE_CONTROL)
+            body = gzip.decompress(b''.join(response.streaming_content))
+
+            plain = self.client.get('/static/' + hashed)
+            self.assertNotIn('Content-Encoding', plain)
+            self.assertEqual(b''.join(plain.streaming_content), body)
+
+            # nejaukts nosaukums var mainīties — nav `immutable`
+            unhashed = self.client.get('/static/nutrition/dist/style.css')
+            self.assertEqual(unhashed.status_code, 200)
+            self.assertNotIn('Cache-Control', unhashed)
+
+        with override_settings(STATIC_ROOT=self.root, SERVE_STATIC=False):
+            self.assertEqual(self.client.get('/static/' + hashed).status_code, 404)
@@ -0,0 +1,121 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+"""
+Viena pieprasījuma laika sadalījums (DB, veidnes, OFF, kopā).
+
+`ServerTimingMiddleware` (`nutrition.middleware`) katram izlasītajam pieprasījumam
+ieliek `RequestTiming` konteksta mainīgajā; koda vietas, kas tērē laiku ārpus
+skata (DB vaicājumi, veidņu renderēšana, OFF HTTP izsaukumi), to papildina ar
+`add` / `measure`. Ja pieprasījums netiek mērīts, abas ir tukšas darbības.
+Veidņu laiku mēra `nutrition.template_backend.TimedDjangoTemplates`.
+
+DB vaicājumus novēro ietinējs, ko `install_query_hook` (izsauc
+`NutritionConfig.ready`) pievieno katram savienojumam; tas pārbauda konteksta
+mainīgo (`observe_queries`). Atšķirībā no `connection.execute_wrapper` bloka
+tas redz arī vaicājumus, kurus ASGI režīmā izpilda `sync_to_async` pavedienā
+(konteksts tiek nodots līdzi).
+"""
+
+_current = contextvars.ContextVar('nutrition_request_timing', default=None)
+_query_observers = contextvars.ContextVar('nutrition_query_observers', default=())
+
+
+class RequestTiming:
+    """Uzkrāj ilgumu (sekundēs) un izsaukumu skaitu pa nosaukumiem ('db', 'tpl', 'off')."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        # paketes svītrkodu meklēšana papildina laiku no vairākiem pavedieniem
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def query(self, seconds):
+        """`observe_queries` novērotājs: pieskaita viena SQL vaicājuma laiku."""
+        self.add('db', seconds)
+
+
+def current():
+    return _current.get()
+
+
+def start():
+    """Sāk mērīt pašreizējo pieprasījumu; atgriež (RequestTiming, token) priekš `stop`."""
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def add(name, seconds):
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+@contextmanager
+def measure(name):
+    """Pieskaita bloka izpildes laiku `name` metrikai (ja pieprasījums tiek mērīts)."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+def _observe_query(execute, sql, params, many, context):
+    observers = _query_observers.get()
+    if not observers:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for observer in observers:
+            observer(elapsed)
+
+
+def _attach(sender=None, connection=None, **kwargs):
+    if _observe_query not in connection.execute_wrappers:
+        # sākumā: `connection.execute_wrapper()` bloki savu ietinēju noņem ar pop()
+        connection.execute_wrappers.insert(0, _observe_query)
+
+
+def install_query_hook():
+    """Pievieno `_observe_query` esošajiem un visiem turpmāk atvērtajiem DB savienojumiem."""
+    connection_created.connect(_attach, dispatch_uid='nutrition.timing.observe_query')
+    for connection in connections.all(initialized_only=True):
+        _attach(connection=connection)
+
+
+@contextmanager
+def observe_queries(observer):
+    """Bloka laikā (arī pavedienos ar šo kontekstu) izsauc `observer(sekundes)` katram SQL vaicājumam."""
+    token = _query_observers.set(_query_observers.get() + (observer,))
+    try:
+        yield
+    finally:
+        _query_observers.reset(token)
+
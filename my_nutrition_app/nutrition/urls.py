@@ -18,8 +18,19 @@ urlpatterns = [
     path('products/', views.products, name='products'),
     path('api/product-search/', views.api_product_search, name='api_product_search'),
     path('api/product-lookup/', views.api_product_lookup, name='api_product_lookup'),
+    path('api/product-lookup/batch/', views.api_product_lookup_batch, name='api_product_lookup_batch'),
+    # asinhronās (ASGI) versijas ārējiem produktu pieprasījumiem
+    path('api/async/product-search/', views.api_product_search_async, name='api_product_search_async'),
+    path('api/async/product-lookup/', views.api_product_lookup_async, name='api_product_lookup_async'),
+    path('api/import/', views.api_import_history, name='api_import_history'),
+    path('api/import/<int:job_id>/', views.api_import_history_status, name='api_import_history_status'),
+    path('export/', views.export_history, name='export_history'),
     path('api/daily_calories/', views.api_daily_calories, name='api_daily_calories'),
+    path('api/daily_calories/<str:start>/<str:end>/<str:digest>/', views.api_daily_calories_range, name='api_daily_calories_range'),
     path('api/add-entry/', views.api_add_entry, name='api_add_entry'),
+    path('api/entries/', views.api_entries, name='api_entries'),
+    path('api/entries/bulk-edit/', views.api_bulk_edit_entries, name='api_bulk_edit_entries'),
+    path('api/entries/bulk-delete/', views.api_bulk_delete_entries, name='api_bulk_delete_entries'),
     path('entry/<int:entry_id>/edit/', views.edit_entry, name='edit_entry'),
     path('entry/<int:entry_id>/delete/', views.delete_entry, name='delete_entry'),
 ]
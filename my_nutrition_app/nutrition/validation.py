@@ -0,0 +1,100 @@
+import datetime as dt
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+"""
+Klienta ievades validācija pielāgotiem `Entry` ierakstiem.
+
+Kopīga `api_add_entry` (viens ieraksts vai saraksts) un vēstures importam
+(`nutrition.history`), lai visur darbotos vienādi lauku nosaukumi un
+noteikumi (pozitīvs daudzums, nav negatīvu uzturvielu).
+"""
+
+
+def to_float(v, default=0.0):
+    """Droša pārvēršana uz float; nederīgai vērtībai atgriež `default`."""
+    try:
+        return float(v)
+    except Exception:
+        return default
+
+
+def entry_fields(payload):
+    """
+    Nolasa un validē viena `Entry` laukus no klienta JSON objekta.
+
+    Atbalsta vairākus lauku nosaukumus (`kcal`, `kcal_per100`, `kcal_per_entry`,
+    `protein_per100` utt.). Atgriež (lauki, None) vai (None, kļūdas_kods).
+    """
+    if not isinstance(payload, dict):
+        return None, 'invalid_item'
+
+    # pamatlauki
+    name = (payload.get('name') or '').strip()[:255]
+    try:
+        amount = float(payload.get('amount') or payload.get('mass') or 100)
+    except Exception:
+        amount = 100.0
+
+    # preferē tiešu kcal/per-entry; ja nav, aprēķina no per-100
+    k100 = to_float(payload.get('kcal_per100') or payload.get('kcal_100') or payload.get('kcal100') or payload.get('kcalPer100') or 0.0)
+    kcal = to_float(payload.get('kcal')) or to_float(payload.get('kcal_per_entry')) or (k100 * amount / 100.0) or 0.0
+
+    # nolasīt makro per100 ja dota
+    protein_per100 = to_float(payload.get('protein_per100') or payload.get('protein100') or 0.0)
+    fat_per100 = to_float(payload.get('fat_per100') or payload.get('fat100') or 0.0)
+    carbs_per100 = to_float(payload.get('carbs_per100') or payload.get('carbs100') or 0.0)
+
+    protein = to_float(payload.get('protein')) or (protein_per100 * amount / 100.0) or 0.0
+    fat = to_float(payload.get('fat')) or (fat_per100 * amount / 100.0) or 0.0
+    carbs = to_float(payload.get('carbs')) or (carbs_per100 * amount / 100.0) or 0.0
+
+    # Validation: amount must be positive and no nutrient value may be negative
+    try:
+        if float(amount) <= 0:
+            return None, 'amount_must_be_positive'
+    except Exception:
+        return None, 'invalid_amount'
+
+    if any(x < 0 for x in [k100, kcal, protein_per100, fat_per100, carbs_per100, protein, fat, carbs]):
+        return None, 'negative_values_not_allowed'
+
+    return {
+        'name': name or 'Custom',
+        'amount': amount,
+        'kcal': round(kcal, 3),
+        'protein': round(protein, 3),
+        'fat': round(fat, 3),
+        'carbs': round(carbs, 3),
+        'kcal_per100': round(k100, 3),
+        'protein_per100': round(protein_per100, 3),
+        'fat_per100': round(fat_per100, 3),
+        'carbs_per100': round(carbs_per100, 3),
+    }, None
+
+
+def parse_timestamp(value):
+    """
+    Nolasa ieraksta laiku: ISO datetime (ar vai bez laika joslas) vai tikai datums.
+
+    Laiks bez joslas tiek uzskatīts par vietējo; datums → vietējā pusnakts.
+    Atgriež aware datetime vai None, ja vērtība nav derīga.
+    """
+    if isinstance(value, dt.datetime):
+        parsed = value
+    else:
+        text = str(value or '').strip()
+        try:
+            parsed = parse_datetime(text)
+            if parsed is None:
+                day = parse_date(text)
+                parsed = dt.datetime.combine(day, dt.time.min) if day else None
+        except ValueError:
+            return None
+        if parsed is None:
+            return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
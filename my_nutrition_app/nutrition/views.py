@@ -2,15 +2,27 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from .models import Product, FoodEntry, Profile, Entry
+from .models import Product, FoodEntry, Profile, Entry, HistoryImport
 from .forms import FoodEntryForm, ProfileForm, ProductForm, SignUpForm
+from . import assets, conditional, export, finalized, fragments, history, ledger, metrics, off, off_cache, rollup, search, validation
+import contextvars
 import json
 import requests
 import logging
-from django.http import JsonResponse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from django.middleware.csrf import get_token
+from django.db import transaction
+from asgiref.sync import sync_to_async
 from django.views.decorators.http import require_POST
+from django.views.static import serve
+from django.utils.cache import patch_vary_headers
 from django.utils.translation import gettext as _
-import datetime as dt
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +114,52 @@ def _per_g_from_entry(ce, field_name):
     return 0.0
 
 
+def _food_entry_nutrients(fe):
+    """
+    Atgriež (kcal, protein, fat, carbs) `FoodEntry` ierakstam, noapaļotus līdz 3 zīmēm.
+
+    Bāzes ņem no produkta per-100g laukiem; ja kcal nav norādīts, bet makro ir,
+    kcal tiek aprēķināts no makro (4/9/4).
+    """
+    # compute authoritative per-100 baselines from Product (if available)
+    prod = getattr(fe, 'product', None)
+    kcal_per100 = 0.0
+    protein_per100 = 0.0
+    fat_per100 = 0.0
+    carbs_per100 = 0.0
+    if prod is not None:
+        try:
+            kcal_per100 = float(getattr(prod, 'calories_per_100g', 0) or 0.0)
+        except Exception:
+            kcal_per100 = 0.0
+        try:
+            protein_per100 = float(getattr(prod, 'protein_per_100g', 0) or 0.0)
+        except Exception:
+            protein_per100 = 0.0
+        try:
+            fat_per100 = float(getattr(prod, 'fat_per_100g', 0) or 0.0)
+        except Exception:
+            fat_per100 = 0.0
+        try:
+            carbs_per100 = float(getattr(prod, 'carbs_per_100g', 0) or 0.0)
+        except Exception:
+            carbs_per100 = 0.0
+
+    # If kcal_per100 missing but macros present, compute kcal_per100 from macros
+    if not kcal_per100 and (protein_per100 or fat_per100 or carbs_per100):
+        kcal_per100 = (protein_per100 * 4.0) + (fat_per100 * 9.0) + (carbs_per100 * 4.0)
+
+    # Now compute authoritative per-entry values
+    amount_val = float(fe.amount or 0.0)
+    return (
+        round(amount_val * (kcal_per100 or 0.0) / 100.0, 3),
+        round(amount_val * (protein_per100 or 0.0) / 100.0, 3),
+        round(amount_val * (fat_per100 or 0.0) / 100.0, 3),
+        round(amount_val * (carbs_per100 or 0.0) / 100.0, 3),
+    )
+
+
+@conditional.conditional(conditional.page_etag)
 def home(request):
     """
     Galvenā mājas lapa, kas apstrādā šādas darbības:
@@ -123,82 +181,24 @@ def home(request):
             if request.user.is_authenticated:
                 # Ja lietotājs pieslēdzies, sasaista ierakstu ar šo lietotāju
                 fe_kwargs['user'] = request.user
-            FoodEntry.objects.create(**fe_kwargs)
+            with transaction.atomic():
+                fe = FoodEntry.objects.create(**fe_kwargs)
+                rollup.record_food_entry(fe)
             return redirect('nutrition:home')
     else:
         # GET pieprasījums — izveido tukšu formu
         form = FoodEntryForm()
 
     products = Product.objects.all()  # visu produktu saraksts, izmanto front-end izvēlnei
-    today = timezone.now().date()
-
-    # Build datetime range for "today" in aware timezone
-    start_dt = timezone.make_aware(dt.datetime.combine(today, dt.time.min))
-    end_dt = timezone.make_aware(dt.datetime.combine(today, dt.time.max))
-
-    # Nokopē FoodEntry vai Entry, atkarībā no tā, vai lietotājs ir pieslēdzies
-    if request.user.is_authenticated:
-        qs_food = FoodEntry.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt, user=request.user)
-        qs_entry = Entry.objects.filter(user=request.user, created_at__gte=start_dt, created_at__lte=end_dt)
-    else:
-        # anonīmi lietotāji redz publiskos ierakstus (user is null)
-        qs_food = FoodEntry.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt, user__isnull=True)
-        qs_entry = Entry.objects.none()
-
-    # Apvieno abus ierakstu tipus vienā sarakstā, sagatavojot datus priekš šablona
-    combined_entries = []
-    totals = {'calories': 0.0, 'protein': 0.0, 'fat': 0.0, 'carbs': 0.0}
 
-    for fe in qs_food:
-        # drošības pārbaude: ja objekts satur metodes, izmanto tās
-        kcal = fe.calories() if callable(getattr(fe, 'calories', None)) else 0.0
-        p = fe.protein() if callable(getattr(fe, 'protein', None)) else 0.0
-        f = fe.fat() if callable(getattr(fe, 'fat', None)) else 0.0
-        c = fe.carbs() if callable(getattr(fe, 'carbs', None)) else 0.0
-        totals['calories'] += kcal
-        totals['protein'] += p
-        totals['fat'] += f
-        totals['carbs'] += c
-        combined_entries.append({
-            'pk': fe.pk,
-            'id': fe.pk,
-            'name': fe.product.name,
-            'amount': fe.amount,
-            'initial_amount': fe.initial_amount,
-            'kcal': round(kcal, 2),
-            'protein': round(p, 2),
-            'fat': round(f, 2),
-            'carbs': round(c, 2),
-            'origin': 'food',
-        })
-
-    for ce in qs_entry:
-        # Entry ir pielāgots ieraksts — šeit vērtības parasti jau ir laukos
-        kcal = float(getattr(ce, 'kcal', 0.0) or 0.0)
-        p = float(getattr(ce, 'protein', 0.0) or 0.0)
-        f = float(getattr(ce, 'fat', 0.0) or 0.0)
-        c = float(getattr(ce, 'carbs', 0.0) or 0.0)
-        totals['calories'] += kcal
-        totals['protein'] += p
-        totals['fat'] += f
-        totals['carbs'] += c
-        combined_entries.append({
-            'pk': ce.pk,
-            'id': ce.pk,
-            'name': ce.name,
-            'amount': ce.amount,
-            'initial_amount': getattr(ce, 'initial_amount', ce.amount),
-            'kcal': round(kcal, 2),
-            'protein': round(p, 2),
-            'fat': round(f, 2),
-            'carbs': round(c, 2),
-            'origin': 'entry',
-        })
-
-    # Noapaļo totālus pirms padošanas uz šablonu
-    for k in totals:
-        totals[k] = round(totals[k], 2)
-    entries = combined_entries
+    # Šodienas ieraksti (FoodEntry + Entry) un kopsummas — ne vairāk kā 2 vaicājumi.
+    # Anonīmi lietotāji redz publiskos ierakstus (user is null).
+    # Slinki: ja saraksta un kopsummu fragmenti ir kešatmiņā (`nutrition.fragments`),
+    # veidne tos nenolasa un vaicājumi netiek izpildīti vispār.
+    today = ledger.today()
+    day = SimpleLazyObject(lambda: ledger.day_ledger(request.user, today))
+    entries = SimpleLazyObject(lambda: day.entries)
+    totals = SimpleLazyObject(lambda: day.totals)
 
     recommendation = None
     # Ja lietotājs pieslēdzies, mēģina izmantot saistīto `Profile` objektu
@@ -221,12 +221,18 @@ def home(request):
         if session_profile:
             recommendation = _compute_recommendation(session_profile)
 
+    # Saraksta fragmentā ir {% csrf_token %} formas, tāpēc tā atslēgā ir CSRF noslēpums;
+    # `get_token` to izveido (un iestata sīkfailu) arī tad, ja fragments nāk no kešatmiņas
+    get_token(request)
     return render(request, 'nutrition/home.html', {
         'products': products,
         'form': form,
         'totals': totals,
         'entries': entries,
         'recommendation': recommendation,
+        'entries_version': fragments.fragment_key(request.user, today),
+        'csrf_secret': request.META.get('CSRF_COOKIE'),
+        'fragment_ttl': fragments.ttl(),
     })
 
 @login_required
@@ -239,6 +245,8 @@ def profile(request):
         form = ProfileForm(request.POST, instance=profile)
         if form.is_valid():
             form.save()
+            # ieteikums `home`/`progress` lapās mainās — klientu kešotās versijas vairs neder
+            conditional.touch(request.user.pk)
             return redirect('nutrition:home')
     else:
         # GET — priekšizpilda formu ar profila objekta datiem
@@ -288,7 +296,9 @@ def add_meal(request):
                 if request.user.is_authenticated:
                     # Ja lietotājs ir pieslēdzies, pievieno saistību
                     fe_kwargs['user'] = request.user
-                FoodEntry.objects.create(**fe_kwargs)
+                with transaction.atomic():
+                    fe = FoodEntry.objects.create(**fe_kwargs)
+                    rollup.record_food_entry(fe)
         except Exception:
             # Drošības nolūkos ignorē jebkādas kļūdas (neuzbrūk)
             pass
@@ -348,26 +358,18 @@ def calculator(request):
         'result': result,
     })
 
+@conditional.conditional(conditional.page_etag)
 def progress(request):
     """
     Progress lapa: sagatavo pēdējo 14 dienu kaloriju sēriju diagrammai.
 
     Loģika:
     - Izveido laika logu (14 dienas, iekļaujot šodienu),
-    - Nolasa gan `FoodEntry` (metode calories()) gan `Entry` (lauku kcal),
-    - Akumulē pēc datuma un nodod JSON rindas priekš front-end grafika.
+    - Dienas kopsummas nolasa ar `ledger.daily_calories` (viens vaicājums),
+    - Nodod JSON rindas priekš front-end grafika.
     """
-    today = timezone.now().date()
-    start = today - timezone.timedelta(days=13)  # include today -> 14 days
-
-    # Būvē aware datetime robežas vaicājumam
-    start_dt = timezone.make_aware(dt.datetime.combine(start, dt.time.min))
-    end_dt = timezone.make_aware(dt.datetime.combine(today, dt.time.max))
-
     recommendation = None
     if request.user.is_authenticated:
-        qs_food = FoodEntry.objects.filter(user=request.user, created_at__gte=start_dt, created_at__lte=end_dt)
-        qs_entry = Entry.objects.filter(user=request.user, created_at__gte=start_dt, created_at__lte=end_dt)
         # Mēģina iegūt rekomendāciju no profila
         try:
             profile_obj = getattr(request.user, 'profile', None)
@@ -383,34 +385,9 @@ def progress(request):
                 recommendation = _compute_recommendation(profile)
         except Exception:
             recommendation = None
-    else:
-        qs_food = FoodEntry.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt, user__isnull=True)
-        qs_entry = Entry.objects.none()
 
-    # Iniciālizē dienu vārdnīcu ar nullēm
-    daily = {}
-    for i in range(14):
-        d = (start + timezone.timedelta(days=i))
-        daily[d.strftime('%Y-%m-%d')] = 0.0
-
-    # Uzkrāj FoodEntry kalorijas (izmantojot metodi) grupējot pēc datuma
-    for e in qs_food:
-        try:
-            key = timezone.localtime(e.created_at).strftime('%Y-%m-%d')
-        except Exception:
-            key = getattr(e, 'created_at').strftime('%Y-%m-%d')
-        daily[key] = daily.get(key, 0.0) + (e.calories() if callable(getattr(e, 'calories', None)) else 0.0)
-
-    # Uzkrāj pielāgoto Entry.kcal laukus
-    for e in qs_entry:
-        try:
-            key = timezone.localtime(e.created_at).strftime('%Y-%m-%d')
-        except Exception:
-            key = getattr(e, 'created_at').strftime('%Y-%m-%d')
-        daily[key] = daily.get(key, 0.0) + (getattr(e, 'kcal', 0.0) or 0.0)
-
-    dates = list(daily.keys())
-    calories = [round(daily[d], 2) for d in dates]
+    # include today -> 14 days; trūkstošās dienas = 0.0, sagrupēts datubāzē
+    dates, calories = ledger.daily_calories(request.user, 14)
     return render(request, 'nutrition/progress.html', {
         'dates_json': json.dumps(dates),
         'calories_json': json.dumps(calories),
@@ -418,6 +395,7 @@ def progress(request):
     })
 
 
+@conditional.conditional()
 def api_daily_calories(request):
     """
     API: atgriež JSON ar datumiem un kalorijām pēdējām `days` dienām.
@@ -430,40 +408,202 @@ def api_daily_calories(request):
     except Exception:
         days = 14
     days = max(1, min(365, days))
-    today = timezone.now().date()
-    start = today - timezone.timedelta(days=days - 1)
-    start_dt = timezone.make_aware(dt.datetime.combine(start, dt.time.min))
-    end_dt = timezone.make_aware(dt.datetime.combine(today, dt.time.max))
 
-    if request.user.is_authenticated:
-        qs_food = FoodEntry.objects.filter(user=request.user, created_at__gte=start_dt, created_at__lte=end_dt)
-        qs_entry = Entry.objects.filter(user=request.user, created_at__gte=start_dt, created_at__lte=end_dt)
+    dates, calories = ledger.daily_calories(request.user, days)
+    # slēgtās dienas (visas, izņemot šodienu) ir pieejamas arī kā nemainīgs, kešojams resurss
+    closed = len(dates) - 1
+    history = None
+    if closed > 0:
+        start, end = parse_date(dates[0]), parse_date(dates[closed - 1])
+        history = {'start': dates[0], 'end': dates[closed - 1],
+                   'url': finalized.range_url(request.user, start, end, calories[:closed])}
+    return JsonResponse({'dates': dates, 'calories': calories, 'history': history})
+
+
+def api_daily_calories_range(request, start, end, digest):
+    """
+    Nemainīgs resurss: slēgtu (pagājušu) dienu kalorijas intervālā [start, end].
+
+    URL satur satura HMAC (`nutrition.finalized`), tāpēc atbilde tiek atdota ar
+    `Cache-Control: immutable`. Ja dati kopš tam mainīti (vēla labošana) vai
+    `digest` nepieder šim lietotājam, pārsūta uz aktuālo URL.
+    """
+    try:
+        start, end = _parse_day(start), _parse_day(end)
+    except ValueError:
+        return JsonResponse({'error': 'invalid_date'}, status=400)
+    if end < start or end > finalized.last_closed_day() or (end - start).days >= finalized.MAX_DAYS:
+        return JsonResponse({'error': 'invalid_range'}, status=400)
+
+    dates, calories = ledger.daily_calories(request.user, (end - start).days + 1, end)
+    if not constant_time_compare(digest, finalized.digest(request.user, start, end, calories)):
+        return redirect(finalized.range_url(request.user, start, end, calories))
+    response = JsonResponse({'dates': dates, 'calories': calories})
+    response['Cache-Control'] = finalized.CACHE_CONTROL
+    return response
+
+def _parse_day(value):
+    # 'YYYY-MM-DD' → date; tukšs → None; nederīgs → ValueError
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+@login_required
+def export_history(request):
+    """
+    Straumē pieslēgtā lietotāja visu ierakstu vēsturi (`FoodEntry` un `Entry`).
+
+    GET parametri: `format` (`csv` vai `ndjson`), `gzip=1` (saspiests fails),
+    `start`/`end` (YYYY-MM-DD, vietējās dienas, ieskaitot). Atbilde tiek ģenerēta
+    pa gabaliem (`nutrition.export`), tāpēc arī 100k ierakstu neielādējas atmiņā.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        return JsonResponse({'error': 'invalid_format'}, status=400)
+    try:
+        start = _parse_day(request.GET.get('start'))
+        end = _parse_day(request.GET.get('end'))
+    except ValueError:
+        return JsonResponse({'error': 'invalid_date'}, status=400)
+    compress = request.GET.get('gzip') in ('1', 'true')
+
+    rows = export.rows(user=request.user, start=start, end=end)
+    response = StreamingHttpResponse(
+        export.stream(rows, fmt, compress),
+        content_type='application/gzip' if compress else ('text/csv; charset=utf-8' if fmt == 'csv' else 'application/x-ndjson'),
+    )
+    filename = 'nutrition-history.%s%s' % (fmt, '.gz' if compress else '')
+    response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+    return response
+
+
+def prometheus_metrics(request):
+    """
+    Procesa (vai visu worker) metrikas Prometheus teksta formātā (`nutrition.metrics`).
+
+    Pieejams tikai no `METRICS_ALLOWED_IPS` adresēm (noklusējumā localhost);
+    `None` atļauj visiem — tad piekļuvi jāierobežo reverse proxy līmenī.
+    """
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if allowed is not None and request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(metrics.collect()), content_type=metrics.CONTENT_TYPE)
+
+
+def static_asset(request, path):
+    """
+    STATIC_ROOT fails ar iepriekš saspiestu kopiju, ja klients to pieņem.
+
+    `collectstatic` (`nutrition.storage`) blakus jauktajiem failiem ieraksta
+    `.br`/`.gz`; atbilde tad ir ar `Content-Encoding` un `Vary: Accept-Encoding`.
+    Jauktie nosaukumi nekad nemaina saturu, tāpēc tie ir kešojami uz visiem laikiem.
+    Ieslēgts ar `SERVE_STATIC` (noklusējumā tikai DEBUG režīmā).
+    """
+    root = settings.STATIC_ROOT
+    if not getattr(settings, 'SERVE_STATIC', settings.DEBUG) or not root:
+        raise Http404
+    name, encoding = assets.encoded_variant(root, path, request.headers.get('Accept-Encoding'))
+    response = serve(request, name, document_root=root)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if assets.is_hashed(path) and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = assets.CACHE_CONTROL
+    return response
+
+
+def api_entries(request):
+    """
+    Ierakstu vēsture ar kursoru lapošanu (jaunākie vispirms), `FoodEntry` + `Entry`.
+
+    GET parametri: `cursor` (no iepriekšējās atbildes `next`), `limit` (līdz
+    `ledger.MAX_PAGE_SIZE`), `start`/`end` (YYYY-MM-DD), `origin` (`food` / `entry`),
+    `q` (nosaukuma fragments). Keyset lapošana nozīmē, ka arī tālas lapas maksā
+    tikpat, cik pirmā. Anonīmam lietotājam — publiskie ieraksti (kā `home`).
+    """
+    try:
+        cursor = ledger.decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+    except ValueError:
+        return JsonResponse({'error': 'invalid_cursor'}, status=400)
+    try:
+        start = _parse_day(request.GET.get('start'))
+        end = _parse_day(request.GET.get('end'))
+    except ValueError:
+        return JsonResponse({'error': 'invalid_date'}, status=400)
+    origin = request.GET.get('origin') or None
+    if origin not in (None,) + ORIGINS:
+        return JsonResponse({'error': 'invalid_origin'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', ledger.PAGE_SIZE))
+    except ValueError:
+        limit = ledger.PAGE_SIZE
+
+    page, next_cursor = ledger.history_page(
+        request.user, cursor=cursor, limit=limit, start=start, end=end,
+        origin=origin, q=request.GET.get('q', '').strip() or None,
+    )
+    return JsonResponse({
+        'results': [{
+            'origin': e.origin,
+            'id': e.pk,
+            'name': e.name,
+            'amount': e.amount,
+            'kcal': e.kcal,
+            'protein': e.protein,
+            'fat': e.fat,
+            'carbs': e.carbs,
+            'created_at': timezone.localtime(e.created_at).isoformat(),
+        } for e in page],
+        'next': next_cursor,
+    })
+
+
+@require_POST
+@login_required
+def api_import_history(request):
+    """
+    Importē ierakstu vēsturi no augšupielādēta faila (`file`: CSV vai NDJSON, arī .gz).
+
+    POST parametri: `format` (pēc noklusējuma — pēc faila nosaukuma), `resume`
+    (iepriekš pārtraukta darba id — tad tas pats fails tiek apstrādāts no
+    saglabātā offseta; cits fails, formāts vai saturs → 409 `resume_mismatch`). Atgriež darba kopsavilkumu ar skaitītājiem un rindu kļūdām;
+    progresu var sekot `api_import_history_status`.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': 'missing_file'}, status=400)
+    fmt = request.POST.get('format') or history.guess_format(upload.name)
+    if fmt not in history.FORMATS:
+        return JsonResponse({'error': 'invalid_format'}, status=400)
+
+    source = upload.name[:255]
+    file_fingerprint = history.fingerprint(upload.chunks())
+    if request.POST.get('resume'):
+        job = HistoryImport.objects.filter(user=request.user, pk=request.POST['resume'], finished=False).first()
+        if job is None:
+            return JsonResponse({'error': 'not_found'}, status=404)
+        if not history.same_file(job, source, fmt, file_fingerprint):
+            return JsonResponse({'error': 'resume_mismatch'}, status=409)
     else:
-        qs_food = FoodEntry.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt, user__isnull=True)
-        qs_entry = Entry.objects.none()
+        job = HistoryImport.objects.create(user=request.user, source=source, format=fmt, **file_fingerprint)
 
-    daily = {}
-    for i in range(days):
-        d = (start + timezone.timedelta(days=i))
-        daily[d.strftime('%Y-%m-%d')] = 0.0
+    # `upload.file` — pati plūsma (Django `File` iterators vienmēr sāk no faila sākuma)
+    upload.seek(0)
+    history.run(job, history.open_binary(upload.file, upload.name))
+    logger.info("History import %s by user %s: %d imported, %d failed", job.pk, request.user.username, job.imported, job.failed)
+    return JsonResponse(history.summary(job))
 
-    for e in qs_food:
-        try:
-            key = timezone.localtime(e.created_at).strftime('%Y-%m-%d')
-        except Exception:
-            key = getattr(e, 'created_at').strftime('%Y-%m-%d')
-        daily[key] = daily.get(key, 0.0) + (e.calories() if callable(getattr(e, 'calories', None)) else 0.0)
 
-    for e in qs_entry:
-        try:
-            key = timezone.localtime(e.created_at).strftime('%Y-%m-%d')
-        except Exception:
-            key = getattr(e, 'created_at').strftime('%Y-%m-%d')
-        daily[key] = daily.get(key, 0.0) + (getattr(e, 'kcal', 0.0) or 0.0)
+@login_required
+def api_import_history_status(request, job_id):
+    """Atgriež vēstures importa darba progresu (pieslēgtā lietotāja darbiem)."""
+    job = get_object_or_404(HistoryImport, pk=job_id, user=request.user)
+    return JsonResponse(history.summary(job))
 
-    dates = list(daily.keys())
-    calories = [round(daily[d], 2) for d in dates]
-    return JsonResponse({'dates': dates, 'calories': calories})
 
 def signup(request):
     """
@@ -506,113 +646,106 @@ def products(request):
 
 def api_product_search(request):
     """
-    Meklē produktus OpenFoodFacts datubāzē un atgriež vienkāršotu JSON rezultātu sarakstu.
+    Meklē produktus un atgriež vienkāršotu JSON rezultātu sarakstu.
     GET parametrs: `q` (meklēšanas frāze). Ierobežo rezultātus līdz 12 produktiem.
+
+    Vispirms atbild no lokālā pilnteksta indeksa (`nutrition.search`); OpenFoodFacts
+    tiek izsaukts tikai tad, ja lokāli nekas netika atrasts.
     """
     q = request.GET.get('q', '').strip()
     if not q:
         return JsonResponse({'results': []})
-    url = 'https://world.openfoodfacts.org/cgi/search.pl'
-    params = {
-        'search_terms': q,
-        'search_simple': 1,
-        'action': 'process',
-        'json': 1,
-        'page_size': 12,
-    }
+    local = search.search_products(q, limit=12)
+    if local:
+        return JsonResponse({'results': [off.product_to_result(p) for p in local], 'source': 'local'})
     try:
-        r = requests.get(url, params=params, timeout=6)
-        r.raise_for_status()
-        data = r.json()
-        results = []
-        for p in data.get('products', [])[:12]:
-            name = p.get('product_name') or p.get('generic_name') or p.get('brands') or ''
-            if not name:
-                continue
-            nutr = p.get('nutriments', {})
-            kcal = nutr.get('energy-kcal_100g') or nutr.get('energy_100g') or 0
-            protein = nutr.get('proteins_100g') or nutr.get('proteins') or 0
-            fat = nutr.get('fat_100g') or nutr.get('fat') or 0
-            carbs = nutr.get('carbohydrates_100g') or nutr.get('carbohydrates') or 0
-            results.append({
-                'name': name,
-                'kcal': float(kcal) if kcal else 0.0,
-                'protein': float(protein) if protein else 0.0,
-                'fat': float(fat) if fat else 0.0,
-                'carbs': float(carbs) if carbs else 0.0,
-            })
-        return JsonResponse({'results': results})
+        payload, status, state = off_cache.get_or_fetch('search', q, lambda: _off_search(q))
     except Exception as e:
         return JsonResponse({'results': [], 'error': str(e)})
+    return _cached_json(payload, status, state)
+
+
+def _cached_json(payload, status, state):
+    # JSON atbilde ar `X-Cache` galveni (HIT / STALE / MISS) — ērti pārbaudīt pārlūkā
+    response = JsonResponse(payload, status=status)
+    response['X-Cache'] = state.upper()
+    return response
+
+
+def _off_search(q):
+    """OpenFoodFacts teksta meklēšana. Atgriež ({'results': [...]}, 200) vai izmet izņēmumu."""
+    return {'results': off.get_client().search(q, page_size=12)}, 200
+
+
+def _off_lookup(barcode):
+    """OpenFoodFacts svītrkoda pieprasījums. Atgriež (payload, 200 | 404) vai izmet izņēmumu."""
+    result = off.get_client().product(barcode)
+    if result is None:
+        return {'error': 'Product not found'}, 404
+    return {'result': result}, 200
+
+
+# Maksimālais ierakstu skaits vienā `api_add_entry` pieprasījumā
+MAX_BULK_ENTRIES = 500
 
 
 @require_POST
 @login_required
 def api_add_entry(request):
     """
-    Pieņem JSON payload no klienta, atbalsta vairākus lauku nosaukumus
-    un izveido pielāgotu `Entry` ierakstu pieslēgtam lietotājam.
+    Pieņem JSON payload no klienta un izveido pielāgotu `Entry` ierakstu(s) pieslēgtam lietotājam.
 
-    Ieeja var saturēt `kcal`, `kcal_per100`, `kcal_per_entry`, `protein_per100` utt.
-    Atgriež JSON ar `success` un izveidotā ieraksta `id`.
+    Viens objekts → atgriež JSON ar `success` un izveidotā ieraksta `id`.
+    Saraksts (vai `{"entries": [...]}`) → visi derīgie ieraksti tiek ievietoti ar
+    vienu `bulk_create` vienā transakcijā; atgriež `ids` un `errors`
+    (`[{"index": i, "error": kods}, ...]`) par nederīgajiem elementiem.
     """
     try:
         payload = json.loads(request.body.decode('utf-8') or '{}')
     except Exception:
         return JsonResponse({'success': False, 'error': 'invalid_json'}, status=400)
 
-    # pamatlauki
-    name = (payload.get('name') or '').strip()[:255]
-    try:
-        amount = float(payload.get('amount') or payload.get('mass') or 100)
-    except Exception:
-        amount = 100.0
+    if isinstance(payload, dict) and isinstance(payload.get('entries'), list):
+        payload = payload['entries']
+    if isinstance(payload, list):
+        return _add_entries(request.user, payload)
 
-    # palīdzfunkcija drošai pārvēršanai uz float
-    def to_float(v, default=0.0):
-        try:
-            return float(v)
-        except Exception:
-            return default
+    fields, error = validation.entry_fields(payload)
+    if error:
+        return JsonResponse({'success': False, 'error': error}, status=400)
 
-    # preferē tiešu kcal/per-entry; ja nav, aprēķina no per-100
-    k100 = to_float(payload.get('kcal_per100') or payload.get('kcal_100') or payload.get('kcal100') or payload.get('kcalPer100') or 0.0)
-    kcal = to_float(payload.get('kcal')) or to_float(payload.get('kcal_per_entry')) or (k100 * amount / 100.0) or 0.0
+    with transaction.atomic():
+        entry = Entry.objects.create(user=request.user, **fields)
+        rollup.record_entry(entry)
 
-    # nolasīt makro per100 ja dota
-    protein_per100 = to_float(payload.get('protein_per100') or payload.get('protein100') or 0.0)
-    fat_per100 = to_float(payload.get('fat_per100') or payload.get('fat100') or 0.0)
-    carbs_per100 = to_float(payload.get('carbs_per100') or payload.get('carbs100') or 0.0)
+    return JsonResponse({'success': True, 'id': entry.id})
 
-    protein = to_float(payload.get('protein')) or (protein_per100 * amount / 100.0) or 0.0
-    fat = to_float(payload.get('fat')) or (fat_per100 * amount / 100.0) or 0.0
-    carbs = to_float(payload.get('carbs')) or (carbs_per100 * amount / 100.0) or 0.0
 
-    # Validation: amount must be positive and no nutrient value may be negative
-    try:
-        if float(amount) <= 0:
-            return JsonResponse({'success': False, 'error': 'amount_must_be_positive'}, status=400)
-    except Exception:
-        return JsonResponse({'success': False, 'error': 'invalid_amount'}, status=400)
-
-    if any(x < 0 for x in [k100, kcal, protein_per100, fat_per100, carbs_per100, protein, fat, carbs]):
-        return JsonResponse({'success': False, 'error': 'negative_values_not_allowed'}, status=400)
-
-    entry = Entry.objects.create(
-        user=request.user,
-        name=name or 'Custom',
-        amount=amount,
-        kcal=round(kcal, 3),
-        protein=round(protein, 3),
-        fat=round(fat, 3),
-        carbs=round(carbs, 3),
-        kcal_per100=round(k100, 3),
-        protein_per100=round(protein_per100, 3),
-        fat_per100=round(fat_per100, 3),
-        carbs_per100=round(carbs_per100, 3),
-    )
+def _add_entries(user, items):
+    # Vairāku ierakstu variants: validē katru, derīgos ievieto ar vienu INSERT
+    if not items:
+        return JsonResponse({'success': False, 'error': 'no_entries'}, status=400)
+    if len(items) > MAX_BULK_ENTRIES:
+        return JsonResponse({'success': False, 'error': 'too_many_entries', 'max': MAX_BULK_ENTRIES}, status=400)
 
-    return JsonResponse({'success': True, 'id': entry.id})
+    entries, errors = [], []
+    for index, item in enumerate(items):
+        fields, error = validation.entry_fields(item)
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            entries.append(Entry(user=user, **fields))
+
+    if entries:
+        with transaction.atomic():
+            entries = Entry.objects.bulk_create(entries)
+            rollup.record_entries(entries)
+
+    return JsonResponse({
+        'success': bool(entries),
+        'ids': [e.id for e in entries],
+        'errors': errors,
+    }, status=200 if entries else 400)
 
 @require_POST
 def edit_entry(request, entry_id):
@@ -656,43 +789,13 @@ def edit_entry(request, entry_id):
             messages.error(request, "Amount must be greater than 0.")
             return redirect('nutrition:home')
 
+        old_values = rollup.food_entry_values(fe)
         fe.amount = amount
-        # persist new amount first
-        fe.save()
-        # compute authoritative per-100 baselines from Product (if available)
-        prod = getattr(fe, 'product', None)
-        kcal_per100 = 0.0
-        protein_per100 = 0.0
-        fat_per100 = 0.0
-        carbs_per100 = 0.0
-        if prod is not None:
-            try:
-                kcal_per100 = float(getattr(prod, 'calories_per_100g', 0) or 0.0)
-            except Exception:
-                kcal_per100 = 0.0
-            try:
-                protein_per100 = float(getattr(prod, 'protein_per_100g', 0) or 0.0)
-            except Exception:
-                protein_per100 = 0.0
-            try:
-                fat_per100 = float(getattr(prod, 'fat_per_100g', 0) or 0.0)
-            except Exception:
-                fat_per100 = 0.0
-            try:
-                carbs_per100 = float(getattr(prod, 'carbs_per_100g', 0) or 0.0)
-            except Exception:
-                carbs_per100 = 0.0
-
-        # If kcal_per100 missing but macros present, compute kcal_per100 from macros
-        if not kcal_per100 and (protein_per100 or fat_per100 or carbs_per100):
-            kcal_per100 = (protein_per100 * 4.0) + (fat_per100 * 9.0) + (carbs_per100 * 4.0)
-
-        # Now compute authoritative per-entry values
-        amount_val = float(fe.amount or 0.0)
-        kcal = round(amount_val * (kcal_per100 or 0.0) / 100.0, 3)
-        protein = round(amount_val * (protein_per100 or 0.0) / 100.0, 3)
-        fat = round(amount_val * (fat_per100 or 0.0) / 100.0, 3)
-        carbs = round(amount_val * (carbs_per100 or 0.0) / 100.0, 3)
+        # persist new amount first (together with the daily rollup delta)
+        with transaction.atomic():
+            fe.save()
+            rollup.record_change(fe.user_id, fe.created_at, old_values, rollup.food_entry_values(fe))
+        kcal, protein, fat, carbs = _food_entry_nutrients(fe)
 
         logger.info("FoodEntry %s updated by user %s: amount=%s (kcal=%s, p=%s f=%s c=%s)", fe.pk, getattr(request.user, 'username', 'anonymous'), amount, kcal, protein, fat, carbs)
 
@@ -736,6 +839,7 @@ def edit_entry(request, entry_id):
 
         # Recompute per-entry values пропорционально изменению количества
         # Use helper to derive reliable per-gram baselines
+        old_values = rollup.entry_values(ce)
         kcal_per_g = _per_g_from_entry(ce, 'kcal')
         protein_per_g = _per_g_from_entry(ce, 'protein')
         fat_per_g = _per_g_from_entry(ce, 'fat')
@@ -747,7 +851,9 @@ def edit_entry(request, entry_id):
         ce.fat = round(fat_per_g * new_amount, 3)
         ce.carbs = round(carbs_per_g * new_amount, 3)
         # keep per100 fields unchanged (they remain authoritative baselines)
-        ce.save()
+        with transaction.atomic():
+            ce.save()
+            rollup.record_change(ce.user_id, ce.created_at, old_values, rollup.entry_values(ce))
         logger.info("Entry %s updated by user %s: amount=%s", ce.pk, request.user.username, new_amount)
 
         if is_json:
@@ -774,8 +880,10 @@ def delete_entry(request, entry_id):
 
     # first try FoodEntry
     try:
-        fe = FoodEntry.objects.get(pk=entry_id)
-        fe.delete()
+        fe = FoodEntry.objects.select_related('product').get(pk=entry_id)
+        with transaction.atomic():
+            rollup.record_food_entry(fe, sign=-1)
+            fe.delete()
         logger.info("FoodEntry %s deleted by user %s", entry_id, getattr(request.user, 'username', 'anonymous'))
         if is_json:
             return JsonResponse({'success': True})
@@ -798,16 +906,155 @@ def delete_entry(request, entry_id):
             messages.error(request, "You are not allowed to delete this entry.")
             return redirect('nutrition:home')
 
-        ce.delete()
+        with transaction.atomic():
+            rollup.record_entry(ce, sign=-1)
+            ce.delete()
         logger.info("Entry %s deleted by owner %s", entry_id, request.user.username)
         if is_json:
             return JsonResponse({'success': True})
         messages.success(request, "Entry deleted.")
         return redirect('nutrition:home')
 
+ORIGINS = ('food', 'entry')
+
+
+def _bulk_items(request):
+    # JSON saraksts vai {"entries": [...]}; None, ja ķermenis nav derīgs
+    try:
+        payload = json.loads(request.body.decode('utf-8') or '[]')
+    except Exception:
+        return None
+    if isinstance(payload, dict):
+        payload = payload.get('entries')
+    return payload if isinstance(payload, list) else None
+
+
+def _bulk_targets(items, with_amount):
+    """
+    Validē `{origin, id[, amount]}` elementus.
+
+    Atgriež ({(origin, id): amount}, errors); atkārtotiem elementiem derīgs ir pēdējais.
+    """
+    targets, errors = {}, []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or item.get('origin') not in ORIGINS:
+            errors.append({'index': index, 'error': 'invalid_item'})
+            continue
+        try:
+            pk = int(item.get('id'))
+        except Exception:
+            errors.append({'index': index, 'error': 'invalid_item'})
+            continue
+        amount = None
+        if with_amount:
+            amount = validation.to_float(item.get('amount'), None)
+            if amount is None:
+                errors.append({'index': index, 'error': 'invalid_amount'})
+                continue
+            if amount <= 0:
+                errors.append({'index': index, 'error': 'amount_must_be_positive'})
+                continue
+        targets[(item['origin'], pk)] = amount
+    return targets, errors
+
+
+def _owned(user, targets):
+    # Pa vienam filtrētam vaicājumam katram modelim: tikai lietotāja ieraksti
+    food_ids = [pk for origin, pk in targets if origin == 'food']
+    entry_ids = [pk for origin, pk in targets if origin == 'entry']
+    foods = list(FoodEntry.objects.select_related('product').filter(user=user, pk__in=food_ids)) if food_ids else []
+    entries = list(Entry.objects.filter(user=user, pk__in=entry_ids)) if entry_ids else []
+    return foods, entries
+
+
+def _not_found(targets, foods, entries):
+    found = {('food', fe.pk) for fe in foods} | {('entry', ce.pk) for ce in entries}
+    return [{'origin': origin, 'id': pk, 'error': 'not_found'} for origin, pk in targets if (origin, pk) not in found]
+
+
+@require_POST
+@login_required
+def api_bulk_edit_entries(request):
+    """
+    Maina vairāku ierakstu daudzumu vienā pieprasījumā.
+
+    JSON: `[{"origin": "food" | "entry", "id": 1, "amount": 150}, ...]` (vai `{"entries": [...]}`).
+    Tiek mainīti tikai pieslēgtā lietotāja ieraksti; `Entry` uzturvielas tiek
+    pārrēķinātas kā `edit_entry` (`_per_g_from_entry`), un izmaiņas saglabātas ar
+    `bulk_update`. Atgriež `updated` un `errors` (nederīgi vai neatrasti elementi).
+    """
+    items = _bulk_items(request)
+    if items is None:
+        return JsonResponse({'success': False, 'error': 'invalid_json'}, status=400)
+    if len(items) > MAX_BULK_ENTRIES:
+        return JsonResponse({'success': False, 'error': 'too_many_entries', 'max': MAX_BULK_ENTRIES}, status=400)
+    targets, errors = _bulk_targets(items, with_amount=True)
+    foods, entries = _owned(request.user, targets)
+    errors.extend(_not_found(targets, foods, entries))
+
+    changes, updated = [], []
+    for fe in foods:
+        old_values = rollup.food_entry_values(fe)
+        fe.amount = targets[('food', fe.pk)]
+        changes.append((fe.user_id, fe.created_at, rollup.delta(old_values, rollup.food_entry_values(fe)), 0))
+        kcal, protein, fat, carbs = _food_entry_nutrients(fe)
+        updated.append({'origin': 'food', 'id': fe.pk, 'amount': float(fe.amount),
+                        'kcal': kcal, 'protein': protein, 'fat': fat, 'carbs': carbs})
+    for ce in entries:
+        old_values = rollup.entry_values(ce)
+        new_amount = targets[('entry', ce.pk)]
+        per_g = {f: _per_g_from_entry(ce, f) for f in ('kcal', 'protein', 'fat', 'carbs')}
+        ce.amount = new_amount
+        for f, value in per_g.items():
+            setattr(ce, f, round(value * new_amount, 3))
+        changes.append((ce.user_id, ce.created_at, rollup.delta(old_values, rollup.entry_values(ce)), 0))
+        updated.append({'origin': 'entry', 'id': ce.pk, 'amount': float(ce.amount),
+                        'kcal': float(ce.kcal), 'protein': float(ce.protein), 'fat': float(ce.fat), 'carbs': float(ce.carbs)})
+
+    with transaction.atomic():
+        if foods:
+            FoodEntry.objects.bulk_update(foods, ['amount'])
+        if entries:
+            Entry.objects.bulk_update(entries, ['amount', 'kcal', 'protein', 'fat', 'carbs'])
+        rollup.apply_grouped(changes)
+    logger.info("Bulk edit by user %s: %d updated, %d errors", request.user.username, len(updated), len(errors))
+    return JsonResponse({'success': bool(updated), 'updated': updated, 'errors': errors})
+
+
+@require_POST
+@login_required
+def api_bulk_delete_entries(request):
+    """
+    Dzēš vairākus ierakstus vienā pieprasījumā.
+
+    JSON: `[{"origin": "food" | "entry", "id": 1}, ...]` (vai `{"entries": [...]}`).
+    Tiek dzēsti tikai pieslēgtā lietotāja ieraksti — ar vienu `DELETE ... WHERE id IN`
+    katram modelim. Atgriež `deleted` un `errors`.
+    """
+    items = _bulk_items(request)
+    if items is None:
+        return JsonResponse({'success': False, 'error': 'invalid_json'}, status=400)
+    if len(items) > MAX_BULK_ENTRIES:
+        return JsonResponse({'success': False, 'error': 'too_many_entries', 'max': MAX_BULK_ENTRIES}, status=400)
+    targets, errors = _bulk_targets(items, with_amount=False)
+    foods, entries = _owned(request.user, targets)
+    errors.extend(_not_found(targets, foods, entries))
+
+    changes = [(fe.user_id, fe.created_at, tuple(-v for v in rollup.food_entry_values(fe)), -1) for fe in foods]
+    changes += [(ce.user_id, ce.created_at, tuple(-v for v in rollup.entry_values(ce)), -1) for ce in entries]
+    with transaction.atomic():
+        if foods:
+            FoodEntry.objects.filter(pk__in=[fe.pk for fe in foods]).delete()
+        if entries:
+            Entry.objects.filter(pk__in=[ce.pk for ce in entries]).delete()
+        rollup.apply_grouped(changes)
+    deleted = [{'origin': 'food', 'id': fe.pk} for fe in foods] + [{'origin': 'entry', 'id': ce.pk} for ce in entries]
+    logger.info("Bulk delete by user %s: %d deleted, %d errors", request.user.username, len(deleted), len(errors))
+    return JsonResponse({'success': bool(deleted), 'deleted': deleted, 'errors': errors})
+
 def api_product_lookup(request):
     """
-    Produkta meklēšana pēc svītrkoda OpenFoodFacts API.
+    Produkta meklēšana pēc svītrkoda: vispirms lokālajā katalogā, tad OpenFoodFacts API.
 
     GET parametrs: `barcode`. Ja produkts atrasts, atgriež pamatinformāciju
     (nosaukums, kcal, proteīns, tauki, ogļhidrāti, barcode). Ja neizdodas,
@@ -816,29 +1063,154 @@ def api_product_lookup(request):
     barcode = request.GET.get('barcode', '').strip()
     if not barcode:
         return JsonResponse({'error': 'Missing barcode'}, status=400)
-    url = f'https://world.openfoodfacts.org/api/v0/product/{barcode}.json'
+    # Vispirms lokālais katalogs (sk. `import_off_catalog`) — bez tīkla pieprasījuma
+    local = Product.objects.filter(barcode=barcode).first()
+    if local is not None:
+        return JsonResponse({'result': off.product_to_result(local)})
     try:
-        r = requests.get(url, timeout=6)
-        r.raise_for_status()
-        data = r.json()
-        product = data.get('product') or {}
-        status = data.get('status')
-        if status != 1:
-            return JsonResponse({'error': 'Product not found'}, status=404)
-        name = product.get('product_name') or product.get('generic_name') or product.get('brands') or ''
-        nutr = product.get('nutriments', {})
-        kcal = nutr.get('energy-kcal_100g') or nutr.get('energy_100g') or 0
-        protein = nutr.get('proteins_100g') or nutr.get('proteins') or 0
-        fat = nutr.get('fat_100g') or nutr.get('fat') or 0
-        carbs = nutr.get('carbohydrates_100g') or nutr.get('carbohydrates') or 0
-        result = {
-            'name': name,
-            'kcal': float(kcal) if kcal else 0.0,
-            'protein': float(protein) if protein else 0.0,
-            'fat': float(fat) if fat else 0.0,
-            'carbs': float(carbs) if carbs else 0.0,
-            'barcode': barcode,
-        }
-        return JsonResponse({'result': result})
+        payload, status, state = off_cache.get_or_fetch('barcode', barcode, lambda: _off_lookup(barcode))
+    except requests.RequestException:
+        return JsonResponse({'error': 'External lookup failed'}, status=502)
+    return _cached_json(payload, status, state)
+
+
+
+def _parse_barcodes(request):
+    # `?barcodes=1,2,3` un/vai atkārtots `?barcode=1&barcode=2`; dublikāti tiek izlaisti, secība saglabāta
+    raw = request.GET.getlist('barcode')
+    for chunk in request.GET.getlist('barcodes'):
+        raw.extend(chunk.split(','))
+    return list(dict.fromkeys(b.strip() for b in raw if b.strip()))
+
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+
+def _batch_executor():
+    """
+    Procesa kopīgais pavedienu pūls `api_product_lookup_batch` OFF pieprasījumiem.
+
+    Fiksēts izmērs (`OFF_BATCH_CONCURRENCY`) visām paketēm kopā: pēc termiņa
+    vēl strādājošie pieprasījumi aizņem pūla pavedienus, nevis rada jaunus.
+    """
+    global _batch_pool
+    if _batch_pool is None:
+        with _batch_pool_lock:
+            if _batch_pool is None:
+                _batch_pool = ThreadPoolExecutor(max_workers=getattr(settings, 'OFF_BATCH_CONCURRENCY', 8),
+                                                 thread_name_prefix='off-batch')
+    return _batch_pool
+
+
+def _lookup_remote(barcode):
+    # Viena svītrkoda pieprasījums pavedienā: kešatmiņa + single-flight + OFF klients
+    try:
+        payload, status, state = off_cache.get_or_fetch('barcode', barcode, lambda: _off_lookup(barcode))
+    except requests.RequestException:
+        return {'status': 502, 'error': 'External lookup failed'}
+    item = dict(payload, status=status)
+    if status == 200:
+        item['source'] = 'cache' if state in ('hit', 'stale') else 'off'
+    return item
+
+
+def api_product_lookup_batch(request):
+    """
+    Vairāku svītrkodu meklēšana vienā pieprasījumā (piem. viss iepirkumu grozs).
+
+    GET parametri: `barcodes` (ar komatiem atdalīts saraksts) vai atkārtots `barcode`,
+    ne vairāk kā `OFF_BATCH_MAX`. Lokālie produkti tiek atrasti ar vienu vaicājumu,
+    pārējie paralēli tiek pieprasīti OpenFoodFacts kopīgajā pūlā (`OFF_BATCH_CONCURRENCY`
+    pavedieni visām paketēm kopā), ne ilgāk par `OFF_BATCH_DEADLINE` sekundēm.
+
+    Atgriež `{"results": [...]}` ievades secībā; katrs elements satur `barcode`,
+    `status` un vai nu `result` (+ `source`: local / cache / off), vai `error`.
+    """
+    barcodes = _parse_barcodes(request)
+    if not barcodes:
+        return JsonResponse({'error': 'Missing barcodes'}, status=400)
+    limit = getattr(settings, 'OFF_BATCH_MAX', 50)
+    if len(barcodes) > limit:
+        return JsonResponse({'error': 'Too many barcodes', 'max': limit}, status=400)
+
+    items = {}
+    for product in Product.objects.filter(barcode__in=barcodes):
+        items[product.barcode] = {'status': 200, 'result': off.product_to_result(product), 'source': 'local'}
+
+    misses = [b for b in barcodes if b not in items]
+    if misses:
+        pool = _batch_executor()
+        # katram uzdevumam savs konteksta eksemplārs, lai OFF laiks nonāktu pieprasījuma Server-Timing
+        futures = {pool.submit(contextvars.copy_context().run, _lookup_remote, b): b for b in misses}
+        done, _pending = wait(futures, timeout=getattr(settings, 'OFF_BATCH_DEADLINE', 8))
+        for future, barcode in futures.items():
+            if future not in done:
+                # rindā gaidošie tiek atcelti; jau sāktie pabeigsies un aizpildīs kešatmiņu nākamajai reizei
+                future.cancel()
+                items[barcode] = {'status': 504, 'error': 'Lookup timed out'}
+                continue
+            try:
+                items[barcode] = future.result()
+            except Exception as ex:
+                # piem. kešatmiņas backend kļūda — tikai šis svītrkods, nevis visa pakete ar 500
+                logger.warning("Batch lookup for %s failed: %s", barcode, ex)
+                items[barcode] = {'status': 502, 'error': 'External lookup failed'}
+
+    return JsonResponse({'results': [dict(items[b], barcode=b) for b in barcodes]})
+
+
+async def _aoff_search(q):
+    """Asinhronā `_off_search` versija; bez `httpx` izpilda sinhrono klientu atsevišķā pavedienā."""
+    if off.httpx is None:
+        return await sync_to_async(_off_search, thread_sensitive=False)(q)
+    return {'results': await off.get_async_client().search(q, page_size=12)}, 200
+
+
+async def _aoff_lookup(barcode):
+    """Asinhronā `_off_lookup` versija."""
+    if off.httpx is None:
+        return await sync_to_async(_off_lookup, thread_sensitive=False)(barcode)
+    result = await off.get_async_client().product(barcode)
+    if result is None:
+        return {'error': 'Product not found'}, 404
+    return {'result': result}, 200
+
+
+async def api_product_search_async(request):
+    """
+    `api_product_search` asinhronā (ASGI) versija — tas pats atbilžu formāts.
+
+    Gaidot OpenFoodFacts, pavediens netiek bloķēts, tāpēc viens ASGI worker var
+    apkalpot simtiem vienlaicīgu pieprasījumu.
+    """
+    q = request.GET.get('q', '').strip()
+    if not q:
+        return JsonResponse({'results': []})
+    # FTS5 vaicājums ir `raw()` — tam nav async API, tāpēc izpilda ORM pavedienā
+    local = await sync_to_async(search.search_products)(q, limit=12)
+    if local:
+        return JsonResponse({'results': [off.product_to_result(p) for p in local], 'source': 'local'})
+    try:
+        payload, status, state = await off_cache.aget_or_fetch('search', q, lambda: _aoff_search(q))
+    except Exception as e:
+        return JsonResponse({'results': [], 'error': str(e)})
+    return _cached_json(payload, status, state)
+
+
+async def api_product_lookup_async(request):
+    """
+    `api_product_lookup` asinhronā (ASGI) versija: lokālais katalogs caur async ORM,
+    tad OpenFoodFacts ar asinhrono klientu.
+    """
+    barcode = request.GET.get('barcode', '').strip()
+    if not barcode:
+        return JsonResponse({'error': 'Missing barcode'}, status=400)
+    local = await Product.objects.filter(barcode=barcode).afirst()
+    if local is not None:
+        return JsonResponse({'result': off.product_to_result(local)})
+    try:
+        payload, status, state = await off_cache.aget_or_fetch('barcode', barcode, lambda: _aoff_lookup(barcode))
     except requests.RequestException:
         return JsonResponse({'error': 'External lookup failed'}, status=502)
+    return _cached_json(payload, status, state)